@@ -94,15 +94,16 @@ class AnomalyDetectionAgent:
                     })
             
             # 3. Volume-Price divergence anomalies
-            volume_price_anomalies = self._detect_volume_price_divergence(data)
+            columns = self._compute_detector_columns(data)
+            volume_price_anomalies = self._detect_volume_price_divergence(data, columns)
             anomalies['anomalies'].extend(volume_price_anomalies)
             
             # 4. Sudden spike detection
-            spike_anomalies = self._detect_price_spikes(data)
+            spike_anomalies = self._detect_price_spikes(data, columns)
             anomalies['anomalies'].extend(spike_anomalies)
             
             # 5. Pattern-based anomalies
-            pattern_anomalies = self._detect_pattern_anomalies(data)
+            pattern_anomalies = self._detect_pattern_anomalies(data, columns)
             anomalies['anomalies'].extend(pattern_anomalies)
             
             # Calculate severity scores
@@ -130,20 +131,23 @@ class AnomalyDetectionAgent:
                 'risk_level': 'low'
             }
             
+            # Shared columnar inputs for all detectors
+            columns = self._compute_detector_columns(data)
+            
             # 1. Pump and dump detection
-            pump_dump_signals = self._detect_pump_dump(data)
+            pump_dump_signals = self._detect_pump_dump(data, columns)
             manipulation_signals['signals'].extend(pump_dump_signals)
             
             # 2. Wash trading detection
-            wash_trading_signals = self._detect_wash_trading(data)
+            wash_trading_signals = self._detect_wash_trading(data, columns)
             manipulation_signals['signals'].extend(wash_trading_signals)
             
             # 3. Spoofing detection
-            spoofing_signals = self._detect_spoofing(data)
+            spoofing_signals = self._detect_spoofing(data, columns)
             manipulation_signals['signals'].extend(spoofing_signals)
             
             # 4. Coordinated trading detection
-            coordinated_signals = self._detect_coordinated_trading(data)
+            coordinated_signals = self._detect_coordinated_trading(data, columns)
             manipulation_signals['signals'].extend(coordinated_signals)
             
             # Calculate overall risk level
@@ -179,30 +183,9 @@ class AnomalyDetectionAgent:
             time_window = 10  # minutes
             
             # Find potential flash crashes
-            for i in range(len(data) - time_window):
-                window_data = data.iloc[i:i+time_window]
-                window_changes = price_changes.iloc[i:i+time_window]
-                
-                # Check for rapid decline
-                min_change = window_changes.min()
-                if min_change < crash_threshold:
-                    crash_idx = window_changes.idxmin()
-                    
-                    # Check for recovery
-                    post_crash_data = data.iloc[i+time_window:i+time_window*2]
-                    if len(post_crash_data) > 0:
-                        recovery = (post_crash_data['close'].max() - data['close'].iloc[crash_idx]) / data['close'].iloc[crash_idx]
-                        
-                        flash_events['events'].append({
-                            'type': 'flash_crash',
-                            'timestamp': crash_idx,
-                            'price_before': data['close'].iloc[i],
-                            'price_crash': data['close'].iloc[crash_idx],
-                            'crash_magnitude': min_change * 100,
-                            'recovery_percent': recovery * 100,
-                            'volume_spike': window_data['volume'].max() / window_data['volume'].mean(),
-                            'duration_minutes': time_window
-                        })
+            flash_events['events'] = self._scan_flash_crashes(
+                data, price_changes, crash_threshold, time_window
+            )
             
             return flash_events
             
@@ -210,6 +193,62 @@ class AnomalyDetectionAgent:
             logger.error(f"Error detecting flash crashes: {str(e)}")
             raise
     
+    def _scan_flash_crashes(self, data: pd.DataFrame, price_changes: pd.Series,
+                            crash_threshold: float, time_window: int) -> List[Dict]:
+        """
+        Vectorized flash crash scan over every window start i in [0, n - time_window).
+        Window minima come from a strided view of the returns, so Python work only
+        happens for windows that actually breach the threshold.
+        """
+        n = len(data)
+        n_windows = n - time_window
+        if n_windows <= 0:
+            return []
+        
+        close = data['close'].to_numpy(dtype=float)
+        volume = data['volume'].to_numpy(dtype=float)
+        changes = price_changes.to_numpy(dtype=float)
+        
+        # Rolling-window minimum of returns (NaN never wins, like Series.min)
+        filled_changes = np.where(np.isnan(changes), np.inf, changes)
+        change_windows = np.lib.stride_tricks.sliding_window_view(filled_changes, time_window)[:n_windows]
+        window_min = change_windows.min(axis=1)
+        
+        hits = np.flatnonzero(window_min < crash_threshold)
+        if len(hits) == 0:
+            return []
+        
+        # First position of the minimum inside each hit window (Series.idxmin)
+        crash_pos = hits + change_windows[hits].argmin(axis=1)
+        crash_price = close[crash_pos]
+        
+        # Forward-window max of close over [i + w, i + 2w), truncated at the end
+        padded_close = np.concatenate([np.where(np.isnan(close), -np.inf, close),
+                                       np.full(time_window, -np.inf)])
+        forward_windows = np.lib.stride_tricks.sliding_window_view(padded_close, time_window)
+        forward_max = forward_windows[hits + time_window].max(axis=1)
+        forward_max[np.isneginf(forward_max)] = np.nan
+        recovery = (forward_max - crash_price) / crash_price
+        
+        volume_windows = np.lib.stride_tricks.sliding_window_view(volume, time_window)[hits]
+        volume_spike = np.nanmax(volume_windows, axis=1) / np.nanmean(volume_windows, axis=1)
+        
+        index = data.index
+        events = []
+        for k, i in enumerate(hits):
+            events.append({
+                'type': 'flash_crash',
+                'timestamp': index[crash_pos[k]],
+                'price_before': close[i],
+                'price_crash': crash_price[k],
+                'crash_magnitude': window_min[i] * 100,
+                'recovery_percent': recovery[k] * 100,
+                'volume_spike': volume_spike[k],
+                'duration_minutes': time_window
+            })
+        
+        return events
+    
     def _prepare_anomaly_features(self, data: pd.DataFrame) -> np.ndarray:
         """Prepare features for multivariate anomaly detection"""
         features = []
@@ -234,259 +273,278 @@ class AnomalyDetectionAgent:
         
         return np.column_stack(features)
     
-    def _detect_volume_price_divergence(self, data: pd.DataFrame) -> List[Dict]:
+    def _compute_detector_columns(self, data: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Derive every series the rule-based detectors need in one columnar pass:
+        returns, volume changes, trailing rolling stats and candle geometry
+        """
+        close_series = data['close']
+        volume_series = data['volume']
+        price_changes = close_series.pct_change()
+        volume_changes = volume_series.pct_change()
+        
+        columns = {
+            'open': data['open'].to_numpy(dtype=float),
+            'high': data['high'].to_numpy(dtype=float),
+            'low': data['low'].to_numpy(dtype=float),
+            'close': close_series.to_numpy(dtype=float),
+            'volume': volume_series.to_numpy(dtype=float),
+            'price_change': price_changes.to_numpy(dtype=float),
+            'volume_change': volume_changes.to_numpy(dtype=float),
+            'rolling_mean_20': close_series.rolling(20).mean().to_numpy(),
+            'rolling_std_20': close_series.rolling(20).std().to_numpy(),
+        }
+        
+        # Stats over the 20 rows *preceding* each row (window i-20..i-1)
+        prev_close_mean = close_series.rolling(20).mean().shift(1).to_numpy()
+        columns['prev_volume_mean_20'] = volume_series.rolling(20).mean().shift(1).to_numpy()
+        columns['prev_price_volatility_20'] = close_series.rolling(20).std().shift(1).to_numpy() / prev_close_mean
+        
+        # Rolling corr skips NaN pairs like Series.corr, but treats inf as missing
+        # where Series.corr yields NaN, so mask windows holding an inf explicitly
+        correlation = price_changes.rolling(20, min_periods=2).corr(volume_changes).to_numpy(copy=True)
+        has_inf = (np.isinf(columns['price_change']) | np.isinf(columns['volume_change'])).astype(float)
+        correlation[pd.Series(has_inf).rolling(20, min_periods=1).max().to_numpy() > 0] = np.nan
+        columns['prev_price_volume_corr_20'] = np.concatenate([[np.nan], correlation[:-1]])
+        
+        # Candle geometry
+        open_, close = columns['open'], columns['close']
+        columns['body_size'] = np.abs(close - open_)
+        columns['upper_wick'] = columns['high'] - np.maximum(open_, close)
+        columns['lower_wick'] = np.minimum(open_, close) - columns['low']
+        columns['total_range'] = columns['high'] - columns['low']
+        
+        return columns
+    
+    @staticmethod
+    def _window_sums(values: np.ndarray, start: int, length: int, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+        """NaN-skipping sums and counts of values[i+start : i+start+length] for i in range(n_out)"""
+        windows = np.lib.stride_tricks.sliding_window_view(values, length)[start:start + n_out]
+        valid = ~np.isnan(windows)
+        return np.where(valid, windows, 0.0).sum(axis=1), valid.sum(axis=1)
+    
+    def _detect_volume_price_divergence(self, data: pd.DataFrame, columns: Dict = None) -> List[Dict]:
         """Detect volume-price divergence anomalies"""
-        anomalies = []
+        columns = columns or self._compute_detector_columns(data)
+        price_change = columns['price_change']
+        volume_change = columns['volume_change']
         
-        # Calculate price and volume changes
-        price_changes = data['close'].pct_change()
-        volume_changes = data['volume'].pct_change()
+        # Significant price increase with volume decrease, or decrease with volume increase
+        up_mask = (price_change > 0.02) & (volume_change < -0.3)
+        down_mask = (price_change < -0.02) & (volume_change > 0.5)
         
-        # Find divergences
-        for i in range(1, len(data)):
-            price_change = price_changes.iloc[i]
-            volume_change = volume_changes.iloc[i]
-            
-            # Significant price increase with volume decrease
-            if price_change > 0.02 and volume_change < -0.3:
-                anomalies.append({
-                    'type': 'volume_price_divergence',
-                    'subtype': 'price_up_volume_down',
-                    'timestamp': data.index[i],
-                    'price': data['close'].iloc[i],
-                    'price_change': price_change * 100,
-                    'volume_change': volume_change * 100,
-                    'severity': 'medium'
-                })
-            
-            # Significant price decrease with volume increase
-            elif price_change < -0.02 and volume_change > 0.5:
-                anomalies.append({
-                    'type': 'volume_price_divergence',
-                    'subtype': 'price_down_volume_up',
-                    'timestamp': data.index[i],
-                    'price': data['close'].iloc[i],
-                    'price_change': price_change * 100,
-                    'volume_change': volume_change * 100,
-                    'severity': 'high'
-                })
+        anomalies = []
+        for i in np.flatnonzero(up_mask | down_mask):
+            anomalies.append({
+                'type': 'volume_price_divergence',
+                'subtype': 'price_up_volume_down' if up_mask[i] else 'price_down_volume_up',
+                'timestamp': data.index[i],
+                'price': columns['close'][i],
+                'price_change': price_change[i] * 100,
+                'volume_change': volume_change[i] * 100,
+                'severity': 'medium' if up_mask[i] else 'high'
+            })
         
         return anomalies
     
-    def _detect_price_spikes(self, data: pd.DataFrame) -> List[Dict]:
+    def _detect_price_spikes(self, data: pd.DataFrame, columns: Dict = None) -> List[Dict]:
         """Detect sudden price spikes"""
-        anomalies = []
+        columns = columns or self._compute_detector_columns(data)
+        close = columns['close']
+        mean_price = columns['rolling_mean_20']
+        std_price = columns['rolling_std_20']
         
-        # Calculate rolling statistics
-        rolling_mean = data['close'].rolling(20).mean()
-        rolling_std = data['close'].rolling(20).std()
+        up_mask = close > mean_price + 3 * std_price
+        down_mask = close < mean_price - 3 * std_price
+        up_mask[:20] = False
+        down_mask[:20] = False
         
-        # Find spikes
-        for i in range(20, len(data)):
-            current_price = data['close'].iloc[i]
-            mean_price = rolling_mean.iloc[i]
-            std_price = rolling_std.iloc[i]
-            
-            # Check for upward spike
-            if current_price > mean_price + 3 * std_price:
-                anomalies.append({
-                    'type': 'price_spike',
-                    'subtype': 'upward_spike',
-                    'timestamp': data.index[i],
-                    'price': current_price,
-                    'deviation_factor': (current_price - mean_price) / std_price,
-                    'severity': 'high'
-                })
-            
-            # Check for downward spike
-            elif current_price < mean_price - 3 * std_price:
-                anomalies.append({
-                    'type': 'price_spike',
-                    'subtype': 'downward_spike',
-                    'timestamp': data.index[i],
-                    'price': current_price,
-                    'deviation_factor': (mean_price - current_price) / std_price,
-                    'severity': 'high'
-                })
+        anomalies = []
+        for i in np.flatnonzero(up_mask | down_mask):
+            anomalies.append({
+                'type': 'price_spike',
+                'subtype': 'upward_spike' if up_mask[i] else 'downward_spike',
+                'timestamp': data.index[i],
+                'price': close[i],
+                'deviation_factor': abs(close[i] - mean_price[i]) / std_price[i],
+                'severity': 'high'
+            })
         
         return anomalies
     
-    def _detect_pattern_anomalies(self, data: pd.DataFrame) -> List[Dict]:
+    def _detect_pattern_anomalies(self, data: pd.DataFrame, columns: Dict = None) -> List[Dict]:
         """Detect pattern-based anomalies"""
+        columns = columns or self._compute_detector_columns(data)
         anomalies = []
         
         # Detect gaps
-        gaps = self._detect_gaps(data)
+        gaps = self._detect_gaps(data, columns)
         anomalies.extend(gaps)
         
         # Detect unusual candlestick patterns
-        candlestick_anomalies = self._detect_candlestick_anomalies(data)
+        candlestick_anomalies = self._detect_candlestick_anomalies(data, columns)
         anomalies.extend(candlestick_anomalies)
         
         return anomalies
     
-    def _detect_gaps(self, data: pd.DataFrame) -> List[Dict]:
+    def _detect_gaps(self, data: pd.DataFrame, columns: Dict = None) -> List[Dict]:
         """Detect price gaps"""
-        anomalies = []
+        columns = columns or self._compute_detector_columns(data)
+        prev_close = columns['close'][:-1]
+        current_open = columns['open'][1:]
         
-        for i in range(1, len(data)):
-            prev_close = data['close'].iloc[i-1]
-            current_open = data['open'].iloc[i]
-            
-            gap_percent = (current_open - prev_close) / prev_close * 100
-            
-            if abs(gap_percent) > 2:  # 2% gap threshold
-                anomalies.append({
-                    'type': 'price_gap',
-                    'subtype': 'gap_up' if gap_percent > 0 else 'gap_down',
-                    'timestamp': data.index[i],
-                    'gap_percent': gap_percent,
-                    'prev_close': prev_close,
-                    'current_open': current_open,
-                    'severity': 'high' if abs(gap_percent) > 5 else 'medium'
-                })
+        gap_percent = (current_open - prev_close) / prev_close * 100
+        
+        anomalies = []
+        for k in np.flatnonzero(np.abs(gap_percent) > 2):  # 2% gap threshold
+            anomalies.append({
+                'type': 'price_gap',
+                'subtype': 'gap_up' if gap_percent[k] > 0 else 'gap_down',
+                'timestamp': data.index[k + 1],
+                'gap_percent': gap_percent[k],
+                'prev_close': prev_close[k],
+                'current_open': current_open[k],
+                'severity': 'high' if abs(gap_percent[k]) > 5 else 'medium'
+            })
         
         return anomalies
     
-    def _detect_candlestick_anomalies(self, data: pd.DataFrame) -> List[Dict]:
+    def _detect_candlestick_anomalies(self, data: pd.DataFrame, columns: Dict = None) -> List[Dict]:
         """Detect unusual candlestick patterns"""
-        anomalies = []
+        columns = columns or self._compute_detector_columns(data)
+        body_size = columns['body_size']
+        upper_wick = columns['upper_wick']
+        lower_wick = columns['lower_wick']
+        total_range = columns['total_range']
         
-        for i in range(len(data)):
-            open_price = data['open'].iloc[i]
-            high_price = data['high'].iloc[i]
-            low_price = data['low'].iloc[i]
-            close_price = data['close'].iloc[i]
-            
-            # Calculate body and wick sizes
-            body_size = abs(close_price - open_price)
-            upper_wick = high_price - max(open_price, close_price)
-            lower_wick = min(open_price, close_price) - low_price
-            total_range = high_price - low_price
-            
-            # Detect doji (very small body)
-            if body_size / total_range < 0.1 and total_range > 0:
+        body_ratio = body_size / total_range
+        
+        # Doji (very small body), otherwise hammer/hanging man (long lower wick)
+        doji_mask = (body_ratio < 0.1) & (total_range > 0)
+        hammer_mask = ~doji_mask & (lower_wick > 2 * body_size) & (upper_wick < body_size)
+        
+        anomalies = []
+        for i in np.flatnonzero(doji_mask | hammer_mask):
+            if doji_mask[i]:
                 anomalies.append({
                     'type': 'candlestick_pattern',
                     'subtype': 'doji',
                     'timestamp': data.index[i],
-                    'body_ratio': body_size / total_range,
+                    'body_ratio': body_ratio[i],
                     'severity': 'low'
                 })
-            
-            # Detect hammer/hanging man (long lower wick)
-            elif lower_wick > 2 * body_size and upper_wick < body_size:
+            else:
                 anomalies.append({
                     'type': 'candlestick_pattern',
                     'subtype': 'hammer_hanging_man',
                     'timestamp': data.index[i],
-                    'lower_wick_ratio': lower_wick / body_size,
+                    'lower_wick_ratio': lower_wick[i] / body_size[i],
                     'severity': 'medium'
                 })
         
         return anomalies
     
-    def _detect_pump_dump(self, data: pd.DataFrame) -> List[Dict]:
+    def _detect_pump_dump(self, data: pd.DataFrame, columns: Dict = None) -> List[Dict]:
         """Detect pump and dump patterns"""
-        signals = []
+        columns = columns or self._compute_detector_columns(data)
+        n_out = len(data) - 20
+        if n_out <= 0:
+            return []
         
-        # Look for rapid price increases followed by rapid decreases
-        price_changes = data['close'].pct_change()
-        volume_changes = data['volume'].pct_change()
+        # For i in [10, n-10): pump window i-5..i, dump window i+1..i+10
+        pump_sum, _ = self._window_sums(columns['price_change'], 5, 6, n_out)
+        volume_sum, volume_count = self._window_sums(columns['volume_change'], 5, 6, n_out)
+        dump_sum, _ = self._window_sums(columns['price_change'], 11, 10, n_out)
+        pump_volume = volume_sum / volume_count
         
-        for i in range(10, len(data) - 10):
-            # Check for pump phase
-            pump_window = price_changes.iloc[i-5:i+1]
-            pump_volume = volume_changes.iloc[i-5:i+1]
-            
-            if pump_window.sum() > 0.15 and pump_volume.mean() > 0.5:  # 15% price increase with high volume
-                # Check for dump phase
-                dump_window = price_changes.iloc[i+1:i+11]
-                
-                if dump_window.sum() < -0.1:  # 10% price decrease
-                    signals.append({
-                        'type': 'pump_dump',
-                        'pump_start': data.index[i-5],
-                        'pump_end': data.index[i],
-                        'dump_end': data.index[i+10],
-                        'pump_magnitude': pump_window.sum() * 100,
-                        'dump_magnitude': dump_window.sum() * 100,
-                        'volume_spike': pump_volume.mean() * 100,
-                        'severity': 'high'
-                    })
+        # 15% price increase with high volume, then a 10% price decrease
+        hits = np.flatnonzero((pump_sum > 0.15) & (pump_volume > 0.5) & (dump_sum < -0.1))
+        
+        signals = []
+        for k in hits:
+            i = k + 10
+            signals.append({
+                'type': 'pump_dump',
+                'pump_start': data.index[i-5],
+                'pump_end': data.index[i],
+                'dump_end': data.index[i+10],
+                'pump_magnitude': pump_sum[k] * 100,
+                'dump_magnitude': dump_sum[k] * 100,
+                'volume_spike': pump_volume[k] * 100,
+                'severity': 'high'
+            })
         
         return signals
     
-    def _detect_wash_trading(self, data: pd.DataFrame) -> List[Dict]:
+    def _detect_wash_trading(self, data: pd.DataFrame, columns: Dict = None) -> List[Dict]:
         """Detect potential wash trading patterns"""
-        signals = []
+        columns = columns or self._compute_detector_columns(data)
+        volume_current = columns['volume']
+        volume_mean = columns['prev_volume_mean_20']
+        price_volatility = columns['prev_price_volatility_20']
         
-        # Look for high volume with minimal price movement
-        for i in range(20, len(data)):
-            window_data = data.iloc[i-20:i]
-            
-            volume_mean = window_data['volume'].mean()
-            volume_current = data['volume'].iloc[i]
-            price_volatility = window_data['close'].std() / window_data['close'].mean()
-            
-            # High volume with low volatility
-            if volume_current > 3 * volume_mean and price_volatility < 0.01:
-                signals.append({
-                    'type': 'wash_trading',
-                    'timestamp': data.index[i],
-                    'volume_ratio': volume_current / volume_mean,
-                    'price_volatility': price_volatility,
-                    'severity': 'medium'
-                })
+        # High volume with low volatility over the preceding 20 rows
+        mask = (volume_current > 3 * volume_mean) & (price_volatility < 0.01)
+        mask[:20] = False
+        
+        signals = []
+        for i in np.flatnonzero(mask):
+            signals.append({
+                'type': 'wash_trading',
+                'timestamp': data.index[i],
+                'volume_ratio': volume_current[i] / volume_mean[i],
+                'price_volatility': price_volatility[i],
+                'severity': 'medium'
+            })
         
         return signals
     
-    def _detect_spoofing(self, data: pd.DataFrame) -> List[Dict]:
+    def _detect_spoofing(self, data: pd.DataFrame, columns: Dict = None) -> List[Dict]:
         """Detect potential spoofing patterns (simplified)"""
-        signals = []
+        columns = columns or self._compute_detector_columns(data)
+        n = len(data)
+        if n < 5:
+            return []
         
-        # Look for rapid volume spikes followed by immediate reversals
-        volume_changes = data['volume'].pct_change()
+        volume_change = columns['volume_change']
+        price_change = columns['price_change']
         
-        for i in range(2, len(data) - 2):
-            if (volume_changes.iloc[i] > 2 and  # Large volume spike
-                volume_changes.iloc[i+1] < -0.5 and  # Immediate volume drop
-                abs(data['close'].pct_change().iloc[i]) < 0.01):  # Minimal price impact
-                
-                signals.append({
-                    'type': 'spoofing',
-                    'timestamp': data.index[i],
-                    'volume_spike': volume_changes.iloc[i] * 100,
-                    'volume_drop': volume_changes.iloc[i+1] * 100,
-                    'price_impact': data['close'].pct_change().iloc[i] * 100,
-                    'severity': 'medium'
-                })
+        # Rapid volume spike, immediate volume drop, minimal price impact (i in [2, n-2))
+        mask = np.zeros(n, dtype=bool)
+        mask[2:n-2] = ((volume_change[2:n-2] > 2) &
+                       (volume_change[3:n-1] < -0.5) &
+                       (np.abs(price_change[2:n-2]) < 0.01))
+        
+        signals = []
+        for i in np.flatnonzero(mask):
+            signals.append({
+                'type': 'spoofing',
+                'timestamp': data.index[i],
+                'volume_spike': volume_change[i] * 100,
+                'volume_drop': volume_change[i+1] * 100,
+                'price_impact': price_change[i] * 100,
+                'severity': 'medium'
+            })
         
         return signals
     
-    def _detect_coordinated_trading(self, data: pd.DataFrame) -> List[Dict]:
+    def _detect_coordinated_trading(self, data: pd.DataFrame, columns: Dict = None) -> List[Dict]:
         """Detect coordinated trading patterns"""
-        signals = []
+        columns = columns or self._compute_detector_columns(data)
+        correlation = columns['prev_price_volume_corr_20']
         
-        # Look for synchronized volume and price movements
-        price_changes = data['close'].pct_change()
-        volume_changes = data['volume'].pct_change()
+        # High price/volume correlation over the preceding 20 rows might indicate coordination
+        mask = np.abs(correlation) > 0.8
+        mask[:20] = False
         
-        # Calculate correlation in rolling windows
-        for i in range(20, len(data)):
-            window_price = price_changes.iloc[i-20:i]
-            window_volume = volume_changes.iloc[i-20:i]
-            
-            correlation = window_price.corr(window_volume)
-            
-            # High correlation might indicate coordination
-            if abs(correlation) > 0.8:
-                signals.append({
-                    'type': 'coordinated_trading',
-                    'timestamp': data.index[i],
-                    'price_volume_correlation': correlation,
-                    'severity': 'low' if abs(correlation) < 0.9 else 'medium'
-                })
+        signals = []
+        for i in np.flatnonzero(mask):
+            signals.append({
+                'type': 'coordinated_trading',
+                'timestamp': data.index[i],
+                'price_volume_correlation': correlation[i],
+                'severity': 'low' if abs(correlation[i]) < 0.9 else 'medium'
+            })
         
         return signals
     
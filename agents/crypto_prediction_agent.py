@@ -6,19 +6,713 @@ Implements advanced ML models for cryptocurrency price forecasting
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future, FIRST_COMPLETED, wait
+from multiprocessing import shared_memory
+import multiprocessing
+import math
+import os
+import re
+import json
+import shutil
+import hashlib
+import time
+import uuid
 import logging
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.preprocessing import StandardScaler, MinMaxScaler
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import xgboost as xgb
 import lightgbm as lgb
+import joblib
 from prophet import Prophet
+from prophet.serialize import model_to_json, model_from_json
 import ta
 
 logger = logging.getLogger(__name__)
 
+
+class _RollingWindow:
+    """Fixed-size window with O(1) mean/std updates (Welford add/remove)"""
+    
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.nan_count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._dirty = False
+    
+    def push(self, value: float):
+        value = float(value)
+        self.values.append(value)
+        if math.isnan(value):
+            self.nan_count += 1
+        removed = self.values.popleft() if len(self.values) > self.window else None
+        if removed is not None and math.isnan(removed):
+            self.nan_count -= 1
+        
+        if self.nan_count > 0:
+            self._dirty = True
+            return
+        if self._dirty:
+            # Window just became NaN-free again, rebuild running moments once
+            self._recompute()
+            return
+        
+        n = len(self.values)
+        if removed is None:
+            delta = value - self.mean
+            self.mean += delta / n
+            self.m2 += delta * (value - self.mean)
+        else:
+            old_mean = self.mean
+            self.mean += (value - removed) / n
+            self.m2 += (value - removed) * (value - self.mean + removed - old_mean)
+    
+    def _recompute(self):
+        values = np.fromiter(self.values, dtype=float, count=len(self.values))
+        self.mean = float(values.mean())
+        self.m2 = float(((values - self.mean) ** 2).sum())
+        self._dirty = False
+    
+    @property
+    def ready(self) -> bool:
+        return len(self.values) == self.window and self.nan_count == 0
+    
+    def get_mean(self) -> float:
+        return self.mean if self.ready else np.nan
+    
+    def get_std(self, ddof: int = 1) -> float:
+        if not self.ready or self.window <= ddof:
+            return np.nan
+        return math.sqrt(max(self.m2, 0.0) / (self.window - ddof))
+
+
+class _RollingExtreme:
+    """Rolling min or max over a fixed window using a monotonic deque"""
+    
+    def __init__(self, window: int, mode: str = 'min'):
+        self.window = window
+        self.is_min = mode == 'min'
+        self.candidates = deque()  # (position, value), monotonic
+        self.nan_positions = deque()
+        self.position = -1
+    
+    def push(self, value: float):
+        self.position += 1
+        value = float(value)
+        expired = self.position - self.window
+        
+        while self.candidates and self.candidates[0][0] <= expired:
+            self.candidates.popleft()
+        while self.nan_positions and self.nan_positions[0] <= expired:
+            self.nan_positions.popleft()
+        
+        if math.isnan(value):
+            self.nan_positions.append(self.position)
+            return
+        
+        if self.is_min:
+            while self.candidates and self.candidates[-1][1] >= value:
+                self.candidates.pop()
+        else:
+            while self.candidates and self.candidates[-1][1] <= value:
+                self.candidates.pop()
+        self.candidates.append((self.position, value))
+    
+    def get(self) -> float:
+        if self.position + 1 < self.window or self.nan_positions or not self.candidates:
+            return np.nan
+        return self.candidates[0][1]
+
+
+class _EWMState:
+    """Exponentially weighted mean matching pandas ewm(adjust=False)"""
+    
+    def __init__(self, alpha: float, min_periods: int):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = np.nan
+        self.count = 0
+    
+    def push(self, value: float) -> float:
+        if not math.isnan(value):
+            if self.count == 0:
+                self.value = value
+            else:
+                self.value = self.alpha * value + (1 - self.alpha) * self.value
+            self.count += 1
+        return self.get()
+    
+    def get(self) -> float:
+        return self.value if self.count >= self.min_periods else np.nan
+
+
+class _SymbolFeatureState:
+    """Rolling state needed to emit one feature row per appended candle"""
+    
+    def __init__(self, use_time_features: bool):
+        self.use_time_features = use_time_features
+        self.prev_close = np.nan
+        self.closes = deque(maxlen=31)   # momentum up to 30 periods back
+        self.volumes = deque(maxlen=8)   # lags up to 7
+        self.rsis = deque(maxlen=8)
+        
+        self.sma = {p: _RollingWindow(p) for p in IncrementalFeatureEngine.MA_PERIODS}
+        self.ema = {p: _EWMState(2 / (p + 1), p) for p in IncrementalFeatureEngine.MA_PERIODS}
+        
+        self.rsi_up = _EWMState(1 / 14, 14)
+        self.rsi_down = _EWMState(1 / 14, 14)
+        
+        self.macd_fast = _EWMState(2 / 13, 12)
+        self.macd_slow = _EWMState(2 / 27, 26)
+        self.macd_signal = _EWMState(2 / 10, 9)
+        
+        self.bollinger = _RollingWindow(20)
+        self.stoch_low = _RollingExtreme(14, 'min')
+        self.stoch_high = _RollingExtreme(14, 'max')
+        self.stoch_k = _RollingWindow(3)
+        
+        self.volume_sma = _RollingWindow(20)
+        self.volatility_ratio = _RollingWindow(50)
+        self.support = _RollingExtreme(20, 'min')
+        self.resistance = _RollingExtreme(20, 'max')
+        
+        self.close_windows = {w: _RollingWindow(w) for w in IncrementalFeatureEngine.ROLLING_WINDOWS}
+        self.close_min = {w: _RollingExtreme(w, 'min') for w in IncrementalFeatureEngine.ROLLING_WINDOWS}
+        self.close_max = {w: _RollingExtreme(w, 'max') for w in IncrementalFeatureEngine.ROLLING_WINDOWS}
+        self.volume_windows = {w: _RollingWindow(w) for w in IncrementalFeatureEngine.ROLLING_WINDOWS}
+
+
+class IncrementalFeatureEngine:
+    """
+    Stateful per-symbol feature engine producing the same features as
+    CryptoPredictionAgent.prepare_features, one candle at a time
+    """
+    
+    MA_PERIODS = [7, 14, 21, 50, 100, 200]
+    MOMENTUM_PERIODS = [1, 3, 7, 14, 30]
+    LAGS = [1, 2, 3, 5, 7]
+    ROLLING_WINDOWS = [7, 14, 30]
+    
+    def __init__(self):
+        self.states = {}
+    
+    @classmethod
+    def get_feature_columns(cls, use_time_features: bool = True) -> List[str]:
+        """Feature column order, identical to the batch path"""
+        columns = ['price_change', 'price_change_abs', 'high_low_ratio', 'open_close_ratio']
+        for period in cls.MA_PERIODS:
+            columns += [f'sma_{period}', f'ema_{period}']
+        columns += [
+            'rsi', 'macd', 'macd_signal', 'macd_histogram',
+            'bb_upper', 'bb_lower', 'bb_middle', 'bb_width', 'bb_position',
+            'stoch_k', 'stoch_d', 'volume_sma', 'volume_ratio',
+            'volatility', 'volatility_ratio'
+        ]
+        columns += [f'momentum_{period}' for period in cls.MOMENTUM_PERIODS]
+        columns += ['support', 'resistance', 'support_distance', 'resistance_distance']
+        if use_time_features:
+            columns += ['hour', 'day_of_week', 'day_of_month', 'month', 'quarter']
+        for lag in cls.LAGS:
+            columns += [f'close_lag_{lag}', f'volume_lag_{lag}', f'rsi_lag_{lag}']
+        for window in cls.ROLLING_WINDOWS:
+            columns += [
+                f'close_mean_{window}', f'close_std_{window}', f'close_min_{window}',
+                f'close_max_{window}', f'volume_mean_{window}'
+            ]
+        return columns
+    
+    def reset(self, symbol: str = None):
+        """Drop rolling state for one symbol, or for all symbols"""
+        if symbol is None:
+            self.states.clear()
+        else:
+            self.states.pop(symbol, None)
+    
+    def warm_up(self, symbol: str, df: pd.DataFrame) -> Optional[Dict]:
+        """Rebuild a symbol's state from OHLCV history and return the last feature row"""
+        self.reset(symbol)
+        features = None
+        for candle in df.to_dict('records'):
+            features = self.update(symbol, candle)
+        return features
+    
+    def update(self, symbol: str, candle: Dict) -> Optional[Dict]:
+        """
+        Append one OHLCV candle and return its feature row, or None while the
+        rolling windows are still warming up (rows the batch path drops)
+        """
+        state = self.states.get(symbol)
+        if state is None:
+            state = _SymbolFeatureState(candle.get('timestamp') is not None)
+            self.states[symbol] = state
+        
+        open_ = float(candle['open'])
+        high = float(candle['high'])
+        low = float(candle['low'])
+        close = float(candle['close'])
+        volume = float(candle['volume'])
+        
+        row = {}
+        prev_close = state.prev_close
+        diff = close - prev_close
+        row['price_change'] = self._safe_div(close, prev_close) - 1
+        row['price_change_abs'] = abs(row['price_change'])
+        row['high_low_ratio'] = self._safe_div(high, low)
+        row['open_close_ratio'] = self._safe_div(open_, close)
+        
+        # Moving averages
+        for period in self.MA_PERIODS:
+            state.sma[period].push(close)
+            row[f'sma_{period}'] = state.sma[period].get_mean()
+            row[f'ema_{period}'] = state.ema[period].push(close)
+        
+        # RSI (first diff is NaN, which ta maps to a zero move)
+        emaup = state.rsi_up.push(diff if diff > 0 else 0.0)
+        emadn = state.rsi_down.push(-diff if diff < 0 else 0.0)
+        row['rsi'] = 100.0 if emadn == 0 else 100 - (100 / (1 + emaup / emadn))
+        
+        # MACD
+        macd = state.macd_fast.push(close) - state.macd_slow.push(close)
+        macd_signal = state.macd_signal.push(macd)
+        row['macd'] = macd
+        row['macd_signal'] = macd_signal
+        row['macd_histogram'] = macd - macd_signal
+        
+        # Bollinger Bands
+        state.bollinger.push(close)
+        bb_middle = state.bollinger.get_mean()
+        bb_std = state.bollinger.get_std(ddof=0)
+        row['bb_upper'] = bb_middle + 2 * bb_std
+        row['bb_lower'] = bb_middle - 2 * bb_std
+        row['bb_middle'] = bb_middle
+        row['bb_width'] = self._safe_div(row['bb_upper'] - row['bb_lower'], bb_middle)
+        row['bb_position'] = self._safe_div(close - row['bb_lower'], row['bb_upper'] - row['bb_lower'])
+        
+        # Stochastic Oscillator
+        state.stoch_low.push(low)
+        state.stoch_high.push(high)
+        smin = state.stoch_low.get()
+        smax = state.stoch_high.get()
+        stoch_k = self._safe_div(100 * (close - smin), smax - smin)
+        state.stoch_k.push(stoch_k)
+        row['stoch_k'] = stoch_k
+        row['stoch_d'] = state.stoch_k.get_mean()
+        
+        # Volume indicators
+        state.volume_sma.push(volume)
+        row['volume_sma'] = state.volume_sma.get_mean()
+        row['volume_ratio'] = self._safe_div(volume, row['volume_sma'])
+        
+        # Volatility (ratio window only counts rows where volatility exists)
+        volatility = state.bollinger.get_std(ddof=1)
+        if not math.isnan(volatility):
+            state.volatility_ratio.push(volatility)
+        row['volatility'] = volatility
+        row['volatility_ratio'] = self._safe_div(volatility, state.volatility_ratio.get_mean())
+        
+        # Price momentum
+        state.closes.append(close)
+        for period in self.MOMENTUM_PERIODS:
+            past = state.closes[-period - 1] if len(state.closes) > period else np.nan
+            row[f'momentum_{period}'] = self._safe_div(close, past) - 1
+        
+        # Support and resistance levels
+        state.support.push(low)
+        state.resistance.push(high)
+        row['support'] = state.support.get()
+        row['resistance'] = state.resistance.get()
+        row['support_distance'] = self._safe_div(close - row['support'], close)
+        row['resistance_distance'] = self._safe_div(row['resistance'] - close, close)
+        
+        # Time-based features
+        if state.use_time_features:
+            timestamp = pd.Timestamp(candle['timestamp'])
+            row['hour'] = timestamp.hour
+            row['day_of_week'] = timestamp.dayofweek
+            row['day_of_month'] = timestamp.day
+            row['month'] = timestamp.month
+            row['quarter'] = timestamp.quarter
+        
+        # Lag features
+        state.volumes.append(volume)
+        state.rsis.append(row['rsi'])
+        for lag in self.LAGS:
+            row[f'close_lag_{lag}'] = self._lag(state.closes, lag)
+            row[f'volume_lag_{lag}'] = self._lag(state.volumes, lag)
+            row[f'rsi_lag_{lag}'] = self._lag(state.rsis, lag)
+        
+        # Rolling statistics
+        for window in self.ROLLING_WINDOWS:
+            state.close_windows[window].push(close)
+            state.close_min[window].push(close)
+            state.close_max[window].push(close)
+            state.volume_windows[window].push(volume)
+            row[f'close_mean_{window}'] = state.close_windows[window].get_mean()
+            row[f'close_std_{window}'] = state.close_windows[window].get_std()
+            row[f'close_min_{window}'] = state.close_min[window].get()
+            row[f'close_max_{window}'] = state.close_max[window].get()
+            row[f'volume_mean_{window}'] = state.volume_windows[window].get_mean()
+        
+        state.prev_close = close
+        
+        if any(isinstance(v, float) and math.isnan(v) for v in row.values()):
+            return None
+        return row
+    
+    @staticmethod
+    def _lag(history: deque, lag: int) -> float:
+        return history[-lag - 1] if len(history) > lag else np.nan
+    
+    @staticmethod
+    def _safe_div(numerator: float, denominator: float) -> float:
+        """Division with pandas semantics (x/0 -> +/-inf, 0/0 -> NaN)"""
+        if denominator == 0:
+            if numerator == 0 or math.isnan(numerator):
+                return np.nan
+            return math.copysign(np.inf, numerator)
+        return numerator / denominator
+
+
+
+MODEL_CLASSES = {
+    'xgboost': xgb.XGBRegressor,
+    'lightgbm': lgb.LGBMRegressor,
+    'random_forest': RandomForestRegressor,
+    'gradient_boosting': GradientBoostingRegressor
+}
+
+# Constructor argument controlling each model's native thread pool
+MODEL_THREAD_PARAMS = {
+    'xgboost': 'n_jobs',
+    'lightgbm': 'n_jobs',
+    'random_forest': 'n_jobs'
+}
+
+
+def _share_array(array: np.ndarray) -> Tuple[shared_memory.SharedMemory, Dict]:
+    """Copy an array into a new shared memory block and return it with its spec"""
+    array = np.ascontiguousarray(array)
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block, {'name': block.name, 'shape': array.shape, 'dtype': array.dtype.str}
+
+
+def _fit_model_worker(name: str, params: Dict, train_spec: Dict, y_train: np.ndarray,
+                      val_spec: Dict) -> Tuple[str, object, np.ndarray]:
+    """Fit one model in a pool worker on matrices attached from shared memory"""
+    train_block = shared_memory.SharedMemory(name=train_spec['name'])
+    val_block = shared_memory.SharedMemory(name=val_spec['name'])
+    try:
+        X_train = np.ndarray(train_spec['shape'], dtype=train_spec['dtype'], buffer=train_block.buf)
+        X_val = np.ndarray(val_spec['shape'], dtype=val_spec['dtype'], buffer=val_block.buf)
+        
+        model = MODEL_CLASSES[name](**params)
+        model.fit(X_train, y_train)
+        predictions = model.predict(X_val)
+        
+        # Drop views into the shared buffers before detaching
+        del X_train, X_val
+        return name, model, predictions
+    finally:
+        train_block.close()
+        val_block.close()
+
+
+class ModelRegistry:
+    """
+    On-disk registry of trained ensembles keyed by symbol, horizon and
+    feature-schema hash. Boosters use their native formats (XGBoost UBJ,
+    LightGBM text) and sklearn estimators use joblib. mmap_mode only helps
+    plain numpy arrays inside those pickles: sklearn trees copy their node
+    arrays when unpickled, so forests are always loaded into memory.
+    
+    Layout: <root>/<symbol>/h<horizon>/<schema_hash> is a symlink to the
+    current <schema_hash>.<version> directory (manifest.json + model files),
+    so a save swaps versions atomically and never leaves the entry missing.
+    """
+    
+    MODEL_FILES = {
+        'xgboost': 'xgboost.ubj',
+        'lightgbm': 'lightgbm.txt',
+        'random_forest': 'random_forest.joblib',
+        'gradient_boosting': 'gradient_boosting.joblib'
+    }
+    
+    def __init__(self, root_dir: str, mmap_mode: Optional[str] = 'r'):
+        self.root_dir = root_dir
+        self.mmap_mode = mmap_mode
+    
+    @staticmethod
+    def schema_hash(feature_columns: List[str]) -> str:
+        """Stable short hash of the ordered feature column list"""
+        return hashlib.sha256(json.dumps(list(feature_columns)).encode()).hexdigest()[:16]
+    
+    def _horizon_dir(self, symbol: str, horizon: int) -> str:
+        safe_symbol = re.sub(r'[^A-Za-z0-9_.-]', '_', symbol)
+        return os.path.join(self.root_dir, safe_symbol, f'h{horizon}')
+    
+    def save(self, symbol: str, horizon: int, entry: Dict) -> str:
+        """Persist a trained ensemble (models, scaler, feature columns, metrics)"""
+        schema = self.schema_hash(entry['feature_columns'])
+        final_dir = os.path.join(self._horizon_dir(symbol, horizon), schema)
+        version_dir = f"{final_dir}.{time.time_ns()}"
+        tmp_dir = f"{final_dir}.tmp-{uuid.uuid4().hex}"
+        
+        os.makedirs(tmp_dir)
+        try:
+            model_files = {}
+            for name, model in entry['models'].items():
+                filename = self.MODEL_FILES.get(name, f'{name}.joblib')
+                path = os.path.join(tmp_dir, filename)
+                if name == 'xgboost':
+                    model.save_model(path)
+                elif name == 'lightgbm':
+                    getattr(model, 'booster_', model).save_model(path)
+                else:
+                    joblib.dump(model, path)
+                model_files[name] = filename
+            
+            joblib.dump(entry['scaler'], os.path.join(tmp_dir, 'scaler.joblib'))
+            
+            manifest = {
+                'symbol': symbol,
+                'horizon': horizon,
+                'schema_hash': schema,
+                'feature_columns': list(entry['feature_columns']),
+                'model_files': model_files,
+                'metrics': entry.get('metrics', {}),
+                'trained_at': entry.get('trained_at', datetime.now().isoformat())
+            }
+            with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+                json.dump(manifest, f, default=float)
+            
+            os.rename(tmp_dir, version_dir)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        
+        self._swap_current(final_dir, version_dir)
+        return final_dir
+    
+    @staticmethod
+    def _swap_current(final_dir: str, version_dir: str):
+        """Atomically point final_dir at version_dir, keeping the previous version for in-flight readers"""
+        previous = os.path.realpath(final_dir) if os.path.islink(final_dir) else None
+        if os.path.isdir(final_dir) and not os.path.islink(final_dir):
+            # Entry saved before versioned directories: move it aside to become the previous version
+            previous = f"{final_dir}.0"
+            os.rename(final_dir, previous)
+        
+        # Unique per save so concurrent savers (threads or processes) never share a temp link
+        link_tmp = f"{final_dir}.link-{uuid.uuid4().hex}"
+        os.symlink(os.path.basename(version_dir), link_tmp)
+        os.replace(link_tmp, final_dir)
+        
+        if previous is None:
+            return
+        
+        # Prune only versions older than both the new and the replaced one; newer ones may
+        # belong to a concurrent save that has not swapped its link in yet
+        parent, schema = os.path.split(final_dir)
+        oldest_kept = min(int(os.path.basename(path).split('.', 1)[1]) for path in (previous, version_dir))
+        for name in os.listdir(parent):
+            version = name[len(schema) + 1:] if name.startswith(f'{schema}.') else ''
+            if version.isdigit() and int(version) < oldest_kept:
+                shutil.rmtree(os.path.join(parent, name), ignore_errors=True)
+    
+    def _read_manifests(self, symbol: str, horizon: int) -> List[Dict]:
+        horizon_dir = self._horizon_dir(symbol, horizon)
+        if not os.path.isdir(horizon_dir):
+            return []
+        
+        manifests = []
+        for schema in os.listdir(horizon_dir):
+            if '.' in schema:
+                continue  # versioned, temporary or link-in-progress entries
+            manifest_path = os.path.join(horizon_dir, schema, 'manifest.json')
+            if os.path.isfile(manifest_path):
+                with open(manifest_path) as f:
+                    manifest = json.load(f)
+                manifest['path'] = os.path.dirname(manifest_path)
+                manifests.append(manifest)
+        return manifests
+    
+    def load(self, symbol: str, horizon: int, schema_hash: str = None) -> Optional[Dict]:
+        """
+        Load an ensemble for symbol/horizon: the one trained on schema_hash when
+        given, otherwise the most recently trained schema. Returns None if absent,
+        including when only other feature schemas are stored (retrain instead).
+        """
+        manifests = self._read_manifests(symbol, horizon)
+        if schema_hash is not None:
+            manifests = [m for m in manifests if m['schema_hash'] == schema_hash]
+        if not manifests:
+            return None
+        
+        manifest = max(manifests, key=lambda m: m['trained_at'])
+        path = manifest['path']
+        
+        models = {}
+        for name, filename in manifest['model_files'].items():
+            model_path = os.path.join(path, filename)
+            if name == 'xgboost':
+                model = xgb.XGBRegressor()
+                model.load_model(model_path)
+            elif name == 'lightgbm':
+                model = lgb.Booster(model_file=model_path)
+            else:
+                model = joblib.load(model_path, mmap_mode=self.mmap_mode)
+            models[name] = model
+        
+        return {
+            'models': models,
+            'scaler': joblib.load(os.path.join(path, 'scaler.joblib')),
+            'feature_columns': manifest['feature_columns'],
+            'metrics': manifest['metrics'],
+            'trained_at': manifest['trained_at']
+        }
+    
+    def list_entries(self) -> List[Dict]:
+        """Manifests of every persisted ensemble (without loading any models)"""
+        entries = []
+        if not os.path.isdir(self.root_dir):
+            return entries
+        
+        for symbol_dir in sorted(os.listdir(self.root_dir)):
+            symbol_path = os.path.join(self.root_dir, symbol_dir)
+            if not os.path.isdir(symbol_path):
+                continue
+            for horizon_dir in sorted(os.listdir(symbol_path)):
+                for schema in sorted(os.listdir(os.path.join(symbol_path, horizon_dir))):
+                    if '.' in schema:
+                        continue
+                    manifest_path = os.path.join(symbol_path, horizon_dir, schema, 'manifest.json')
+                    if os.path.isfile(manifest_path):
+                        with open(manifest_path) as f:
+                            manifest = json.load(f)
+                        entries.append({key: manifest[key] for key in ('symbol', 'horizon', 'schema_hash', 'trained_at')})
+        return entries
+
+
+def _prepare_prophet_frame(data: pd.DataFrame) -> pd.DataFrame:
+    """ds/y (plus volume regressor when present) frame for Prophet"""
+    prophet_data = data[['timestamp', 'close']].copy()
+    prophet_data.columns = ['ds', 'y']
+    prophet_data['ds'] = pd.to_datetime(prophet_data['ds'])
+    
+    if 'volume' in data.columns:
+        prophet_data['volume'] = data['volume'].values
+    
+    return prophet_data.reset_index(drop=True)
+
+
+def _fingerprint_frame(df: pd.DataFrame) -> str:
+    """Content hash of a frame's values (index ignored)"""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.sha256(row_hashes.tobytes()).hexdigest()
+
+
+def _prophet_warm_start_params(model: Prophet) -> Dict:
+    """Fitted MAP parameters in the shape Prophet.fit(init=...) expects"""
+    params = {name: model.params[name][0][0] for name in ['k', 'm', 'sigma_obs']}
+    for name in ['delta', 'beta']:
+        params[name] = model.params[name][0]
+    return params
+
+
+def _prophet_components(forecast: pd.DataFrame) -> pd.DataFrame:
+    """
+    Forecast summary with the seasonalities collapsed into one column and the
+    volume regressor reported on its own, so trend + seasonal + volume == yhat
+    """
+    components = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper', 'trend']].copy()
+    regressors = forecast.get('extra_regressors_additive', 0.0)
+    components['seasonal'] = forecast['additive_terms'] - regressors
+    if 'volume' in forecast.columns:
+        components['volume'] = forecast['volume']
+    return components
+
+
+def _fit_prophet(prophet_params: Dict, prophet_data: pd.DataFrame, init: Optional[Dict],
+                 periods: int) -> Tuple[Prophet, pd.DataFrame, bool]:
+    """Fit Prophet (warm-started from init when given) and forecast periods hours ahead"""
+    def build_model():
+        model = Prophet(**prophet_params)
+        if 'volume' in prophet_data.columns:
+            model.add_regressor('volume')
+        return model
+    
+    model = build_model()
+    warm_started = init is not None
+    try:
+        model.fit(prophet_data, init=init) if warm_started else model.fit(prophet_data)
+    except Exception as e:
+        if not warm_started:
+            raise
+        # e.g. parameter shapes changed; fall back to a cold fit
+        logger.warning(f"Prophet warm start failed, refitting from scratch: {str(e)}")
+        model = build_model()
+        model.fit(prophet_data)
+        warm_started = False
+    
+    # Make future predictions
+    future = model.make_future_dataframe(periods=periods, freq='h')
+    if 'volume' in prophet_data.columns:
+        # Use last known volume for future predictions
+        future['volume'] = prophet_data['volume'].iloc[-1]
+    
+    return model, model.predict(future), warm_started
+
+
+def _fit_prophet_job(prophet_params: Dict, prophet_data: pd.DataFrame, init: Optional[Dict],
+                     periods: int) -> Tuple[str, pd.DataFrame, bool]:
+    """Pool worker for _fit_prophet; the model travels back as Prophet JSON"""
+    model, forecast, warm_started = _fit_prophet(prophet_params, prophet_data, init, periods)
+    return model_to_json(model), forecast, warm_started
+
+
+def _run_inline(func, *args) -> Future:
+    """Run func in this process and wrap the outcome in a completed Future"""
+    future = Future()
+    try:
+        future.set_result(func(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def _train_horizon_job(config: Dict, model_configs: Dict, symbol: str, horizon: int,
+                       matrix_spec: Dict, feature_columns: List[str]) -> Dict:
+    """Train one symbol x horizon ensemble from a feature matrix in shared memory"""
+    block = shared_memory.SharedMemory(name=matrix_spec['name'])
+    try:
+        matrix = np.ndarray(matrix_spec['shape'], dtype=matrix_spec['dtype'], buffer=block.buf)
+        data = pd.DataFrame(matrix.copy(), columns=feature_columns + ['close'])
+        del matrix
+    finally:
+        block.close()
+    
+    agent = CryptoPredictionAgent(config)
+    agent.model_configs = model_configs
+    agent.feature_columns = feature_columns
+    result = agent.train_models(data, horizon, parallel=False)
+    
+    return {
+        'symbol': symbol,
+        'horizon': horizon,
+        'models': result['models'],
+        'scaler': agent.scalers[horizon],
+        'feature_columns': feature_columns,
+        'metrics': result['metrics'],
+        'feature_importance': result['feature_importance']
+    }
+
+
 class CryptoPredictionAgent:
     """
     Advanced cryptocurrency price prediction agent using multiple ML models
@@ -30,6 +724,28 @@ class CryptoPredictionAgent:
         self.scalers = {}
         self.feature_columns = []
         self.target_column = 'close'
+        self.feature_engine = IncrementalFeatureEngine()
+        
+        # Prophet settings and per-symbol fit cache (fingerprint, rows, model, forecast)
+        self.prophet_config = {
+            'daily_seasonality': True,
+            'weekly_seasonality': True,
+            'yearly_seasonality': True,
+            'changepoint_prior_scale': 0.05,
+            'seasonality_prior_scale': 10.0
+        }
+        self.prophet_forecast_periods = 30
+        self.prophet_cache = {}
+        
+        # Per-symbol model registry: symbol -> horizon -> trained ensemble,
+        # backed by an optional on-disk registry that is read lazily on predict
+        self.symbol_models = {}
+        self.model_registry = None
+        if self.config.get('model_registry_dir'):
+            self.model_registry = ModelRegistry(
+                self.config['model_registry_dir'],
+                mmap_mode=self.config.get('model_registry_mmap_mode', 'r')
+            )
         
         # Model configurations
         self.model_configs = {
@@ -112,7 +828,7 @@ class CryptoPredictionAgent:
             data['stoch_d'] = stoch.stoch_signal()
             
             # Volume indicators
-            data['volume_sma'] = ta.volume.volume_sma(data['close'], data['volume'], window=20)
+            data['volume_sma'] = data['volume'].rolling(window=20).mean()
             data['volume_ratio'] = data['volume'] / data['volume_sma']
             
             # Volatility
@@ -166,11 +882,58 @@ class CryptoPredictionAgent:
             logger.error(f"Error preparing features: {str(e)}")
             raise
     
-    def train_models(self, data: pd.DataFrame, target_horizon: int = 1) -> Dict:
+    def warm_up_features(self, symbol: str, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        Seed the incremental feature state for a symbol from OHLCV history
+        """
+        try:
+            required_columns = ['open', 'high', 'low', 'close', 'volume']
+            if not all(col in df.columns for col in required_columns):
+                raise ValueError(f"Missing required columns: {required_columns}")
+            
+            columns = required_columns + (['timestamp'] if 'timestamp' in df.columns else [])
+            features = self.feature_engine.warm_up(symbol, df[columns])
+            self.feature_columns = IncrementalFeatureEngine.get_feature_columns('timestamp' in df.columns)
+            
+            logger.info(f"Warmed up incremental features for {symbol} from {len(df)} candles")
+            if features is None:
+                return None
+            return pd.DataFrame([{**df[columns].iloc[-1].to_dict(), **features}])
+            
+        except Exception as e:
+            logger.error(f"Error warming up features for {symbol}: {str(e)}")
+            raise
+    
+    def update_features(self, symbol: str, candle: Dict) -> Optional[pd.DataFrame]:
+        """
+        Append one candle to a symbol's incremental feature state and return
+        its feature row (same columns as prepare_features), or None while the
+        rolling windows are still warming up
+        """
+        try:
+            features = self.feature_engine.update(symbol, candle)
+            self.feature_columns = IncrementalFeatureEngine.get_feature_columns(
+                self.feature_engine.states[symbol].use_time_features
+            )
+            if features is None:
+                return None
+            return pd.DataFrame([{**candle, **features}])
+            
+        except Exception as e:
+            logger.error(f"Error updating features for {symbol}: {str(e)}")
+            raise
+    
+    def train_models(self, data: pd.DataFrame, target_horizon: int = 1, parallel: bool = None) -> Dict:
         """
         Train multiple ML models for price prediction
+        
+        With parallel=True (or config 'parallel_training') the four models are
+        fitted concurrently in a process pool; see _fit_models_parallel.
         """
         try:
+            if parallel is None:
+                parallel = self.config.get('parallel_training', False)
+            
             # Prepare target variable (future price)
             data[f'target_{target_horizon}'] = data['close'].shift(-target_horizon)
             data = data.dropna()
@@ -192,46 +955,19 @@ class CryptoPredictionAgent:
             self.scalers[target_horizon] = scaler
             
             # Train models
-            models = {}
-            metrics = {}
-            
-            # XGBoost
-            xgb_model = xgb.XGBRegressor(**self.model_configs['xgboost'])
-            xgb_model.fit(X_train_scaled, y_train)
-            xgb_pred = xgb_model.predict(X_val_scaled)
-            
-            models['xgboost'] = xgb_model
-            metrics['xgboost'] = self._calculate_metrics(y_val, xgb_pred)
-            
-            # LightGBM
-            lgb_model = lgb.LGBMRegressor(**self.model_configs['lightgbm'])
-            lgb_model.fit(X_train_scaled, y_train)
-            lgb_pred = lgb_model.predict(X_val_scaled)
-            
-            models['lightgbm'] = lgb_model
-            metrics['lightgbm'] = self._calculate_metrics(y_val, lgb_pred)
-            
-            # Random Forest
-            rf_model = RandomForestRegressor(**self.model_configs['random_forest'])
-            rf_model.fit(X_train_scaled, y_train)
-            rf_pred = rf_model.predict(X_val_scaled)
-            
-            models['random_forest'] = rf_model
-            metrics['random_forest'] = self._calculate_metrics(y_val, rf_pred)
-            
-            # Gradient Boosting
-            gb_model = GradientBoostingRegressor(**self.model_configs['gradient_boosting'])
-            gb_model.fit(X_train_scaled, y_train)
-            gb_pred = gb_model.predict(X_val_scaled)
+            if parallel:
+                models, predictions = self._fit_models_parallel(X_train_scaled, y_train, X_val_scaled)
+            else:
+                models, predictions = self._fit_models_sequential(X_train_scaled, y_train, X_val_scaled)
             
-            models['gradient_boosting'] = gb_model
-            metrics['gradient_boosting'] = self._calculate_metrics(y_val, gb_pred)
+            metrics = {name: self._calculate_metrics(y_val, predictions[name]) for name in models}
             
             # Store models
             self.models[target_horizon] = models
             
             # Create ensemble prediction
-            ensemble_pred = (xgb_pred + lgb_pred + rf_pred + gb_pred) / 4
+            ensemble_pred = (predictions['xgboost'] + predictions['lightgbm'] +
+                             predictions['random_forest'] + predictions['gradient_boosting']) / 4
             metrics['ensemble'] = self._calculate_metrics(y_val, ensemble_pred)
             
             logger.info(f"Trained models for {target_horizon}-step prediction")
@@ -247,19 +983,220 @@ class CryptoPredictionAgent:
             logger.error(f"Error training models: {str(e)}")
             raise
     
-    def predict(self, data: pd.DataFrame, target_horizon: int = 1, model_type: str = 'ensemble') -> Dict:
+    def _fit_models_sequential(self, X_train_scaled: np.ndarray, y_train: pd.Series,
+                               X_val_scaled: np.ndarray) -> Tuple[Dict, Dict]:
+        """Fit every configured model one after another in this process"""
+        models = {}
+        predictions = {}
+        
+        for name, model_class in MODEL_CLASSES.items():
+            model = model_class(**self.model_configs[name])
+            model.fit(X_train_scaled, y_train)
+            models[name] = model
+            predictions[name] = model.predict(X_val_scaled)
+        
+        return models, predictions
+    
+    def _get_training_budget(self) -> Tuple[int, int]:
+        """Worker count and per-model thread budget for parallel training"""
+        cpu_count = os.cpu_count() or 1
+        workers = self.config.get('training_workers') or min(len(MODEL_CLASSES), cpu_count)
+        workers = max(1, min(int(workers), len(MODEL_CLASSES)))
+        threads_per_model = self.config.get('threads_per_model') or max(1, cpu_count // workers)
+        return workers, int(threads_per_model)
+    
+    def _fit_models_parallel(self, X_train_scaled: np.ndarray, y_train: pd.Series,
+                             X_val_scaled: np.ndarray) -> Tuple[Dict, Dict]:
+        """
+        Fit every configured model concurrently in a process pool. The scaled
+        matrices are placed in shared memory once instead of being pickled per
+        model, and each model's thread count is capped so workers x threads
+        stays within the CPU count.
+        """
+        workers, threads_per_model = self._get_training_budget()
+        mp_context = multiprocessing.get_context(self.config.get('training_start_method'))
+        
+        train_block, train_spec = _share_array(X_train_scaled)
+        val_block, val_spec = _share_array(X_val_scaled)
+        
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as executor:
+                futures = []
+                for name in MODEL_CLASSES:
+                    params = dict(self.model_configs[name])
+                    if name in MODEL_THREAD_PARAMS:
+                        params[MODEL_THREAD_PARAMS[name]] = threads_per_model
+                    futures.append(executor.submit(
+                        _fit_model_worker, name, params, train_spec, np.asarray(y_train), val_spec
+                    ))
+                
+                results = [future.result() for future in futures]
+        finally:
+            for block in (train_block, val_block):
+                block.close()
+                block.unlink()
+        
+        logger.info(f"Fitted {len(results)} models with {workers} workers x {threads_per_model} threads")
+        
+        models = {name: model for name, model, _ in results}
+        predictions = {name: pred for name, _, pred in results}
+        return models, predictions
+    
+    def train_batch(self, symbol_data: Dict[str, pd.DataFrame], horizons: List[int] = [1, 6, 24, 168],
+                    max_workers: int = None) -> Dict:
+        """
+        Train ensembles for many symbols and horizons. Features are computed once
+        per symbol, symbol x horizon jobs run on a process pool, and results land
+        in the per-symbol registry (self.symbol_models).
+        
+        Memory stays bounded: only 'batch_max_open_symbols' feature matrices are
+        materialized (in shared memory) at a time, and each is released as soon
+        as all of its horizons finish.
+        """
+        try:
+            start_time = datetime.now()
+            batch_results = {
+                'timestamp': start_time.isoformat(),
+                'symbols': len(symbol_data),
+                'horizons': list(horizons),
+                'trained': {},
+                'errors': {}
+            }
+            
+            cpu_count = os.cpu_count() or 1
+            workers = max(1, int(max_workers or self.config.get('batch_workers') or cpu_count))
+            max_open_symbols = max(1, int(self.config.get('batch_max_open_symbols') or workers))
+            
+            # One thread per model by default so workers x threads <= cores
+            threads_per_model = self.config.get('threads_per_model') or max(1, cpu_count // workers)
+            model_configs = {name: dict(params) for name, params in self.model_configs.items()}
+            for name, param in MODEL_THREAD_PARAMS.items():
+                model_configs[name][param] = int(threads_per_model)
+            
+            mp_context = multiprocessing.get_context(self.config.get('training_start_method'))
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) if workers > 1 else None
+            
+            symbols = iter(symbol_data.items())
+            open_symbols = {}  # symbol -> {'block', 'remaining'}
+            pending = {}       # future -> (symbol, horizon)
+            exhausted = False
+            
+            try:
+                while True:
+                    # Materialize more symbols while under the memory bound
+                    while not exhausted and len(open_symbols) < max_open_symbols:
+                        try:
+                            symbol, df = next(symbols)
+                        except StopIteration:
+                            exhausted = True
+                            break
+                        
+                        try:
+                            features = self.prepare_features(df)
+                            feature_columns = list(self.feature_columns)
+                            matrix = features[feature_columns + ['close']].to_numpy(dtype=float)
+                            block, spec = _share_array(matrix)
+                            del features, matrix
+                        except Exception as e:
+                            logger.warning(f"Error preparing features for {symbol}: {str(e)}")
+                            batch_results['errors'][symbol] = str(e)
+                            continue
+                        
+                        open_symbols[symbol] = {'block': block, 'remaining': len(horizons)}
+                        for horizon in horizons:
+                            args = (self.config, model_configs, symbol, horizon, spec, feature_columns)
+                            if executor is None:
+                                job = _run_inline(_train_horizon_job, *args)
+                            else:
+                                job = executor.submit(_train_horizon_job, *args)
+                            pending[job] = (symbol, horizon)
+                    
+                    if not pending:
+                        break
+                    
+                    done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                    for job in done:
+                        symbol, horizon = pending.pop(job)
+                        try:
+                            result = job.result()
+                            self._register_symbol_model(result)
+                            batch_results['trained'].setdefault(symbol, {})[horizon] = result['metrics']['ensemble']
+                        except Exception as e:
+                            logger.warning(f"Error training {symbol} horizon {horizon}: {str(e)}")
+                            batch_results['errors'][f'{symbol}_{horizon}'] = str(e)
+                        
+                        open_symbols[symbol]['remaining'] -= 1
+                        if open_symbols[symbol]['remaining'] == 0:
+                            block = open_symbols.pop(symbol)['block']
+                            block.close()
+                            block.unlink()
+            finally:
+                if executor is not None:
+                    executor.shutdown(cancel_futures=True)
+                for entry in open_symbols.values():
+                    entry['block'].close()
+                    entry['block'].unlink()
+            
+            batch_results['duration_seconds'] = (datetime.now() - start_time).total_seconds()
+            logger.info(f"Batch trained {sum(len(h) for h in batch_results['trained'].values())} "
+                        f"symbol-horizon ensembles in {batch_results['duration_seconds']:.1f}s "
+                        f"({len(batch_results['errors'])} errors)")
+            return batch_results
+            
+        except Exception as e:
+            logger.error(f"Error in batch training: {str(e)}")
+            raise
+    
+    def _register_symbol_model(self, result: Dict):
+        """Store one trained symbol x horizon ensemble in the per-symbol registry"""
+        entry = {
+            'models': result['models'],
+            'scaler': result['scaler'],
+            'feature_columns': result['feature_columns'],
+            'metrics': result['metrics'],
+            'trained_at': datetime.now().isoformat()
+        }
+        self.symbol_models.setdefault(result['symbol'], {})[result['horizon']] = entry
+        
+        if self.model_registry is not None:
+            try:
+                self.model_registry.save(result['symbol'], result['horizon'], entry)
+            except Exception as e:
+                logger.warning(f"Error persisting models for {result['symbol']} horizon {result['horizon']}: {str(e)}")
+    
+    def _get_symbol_model(self, symbol: str, target_horizon: int) -> Optional[Dict]:
+        """Registered ensemble for symbol/horizon, loading it from disk on first use"""
+        entry = self.symbol_models.get(symbol, {}).get(target_horizon)
+        if entry is None and self.model_registry is not None:
+            schema_hash = ModelRegistry.schema_hash(self.feature_columns) if self.feature_columns else None
+            entry = self.model_registry.load(symbol, target_horizon, schema_hash)
+            if entry is not None:
+                self.symbol_models.setdefault(symbol, {})[target_horizon] = entry
+                logger.info(f"Loaded persisted models for {symbol} horizon {target_horizon}")
+        return entry
+    
+    def _resolve_models(self, target_horizon: int, symbol: str = None) -> Tuple[Dict, StandardScaler, List[str]]:
+        """Look up models, scaler and feature columns for a horizon (per symbol when registered)"""
+        entry = self._get_symbol_model(symbol, target_horizon) if symbol is not None else None
+        if entry is not None:
+            return entry['models'], entry['scaler'], entry['feature_columns']
+        
+        if target_horizon not in self.models:
+            raise ValueError(f"No trained model for horizon {target_horizon}")
+        return self.models[target_horizon], self.scalers[target_horizon], self.feature_columns
+    
+    def predict(self, data: pd.DataFrame, target_horizon: int = 1, model_type: str = 'ensemble',
+                symbol: str = None) -> Dict:
         """
         Make price predictions using trained models
         """
         try:
-            if target_horizon not in self.models:
-                raise ValueError(f"No trained model for horizon {target_horizon}")
+            models, scaler, feature_columns = self._resolve_models(target_horizon, symbol)
             
             # Prepare features
-            features = data[self.feature_columns].iloc[-1:].values
-            features_scaled = self.scalers[target_horizon].transform(features)
+            features = data[feature_columns].iloc[-1:].values
+            features_scaled = scaler.transform(features)
             
-            models = self.models[target_horizon]
             predictions = {}
             
             # Get predictions from all models
@@ -300,6 +1237,87 @@ class CryptoPredictionAgent:
             logger.error(f"Error making prediction: {str(e)}")
             raise
     
+    def predict_batch(self, latest_rows: Union[pd.DataFrame, Dict[str, pd.DataFrame]], target_horizon: int = 1,
+                      model_type: str = 'ensemble') -> Dict[str, Dict]:
+        """
+        Low-latency predictions for many symbols at once. Takes either a frame of
+        latest feature rows indexed by symbol, or a symbol -> feature frame mapping
+        (last row used). Symbols sharing an ensemble are scaled as one matrix and
+        each model is called once per group; results match predict() per symbol.
+        """
+        try:
+            if isinstance(latest_rows, dict):
+                symbols = list(latest_rows.keys())
+                frames = [latest_rows[symbol] for symbol in symbols]
+            else:
+                symbols = list(latest_rows.index)
+                frames = None
+            
+            # Group symbols by the ensemble that serves them
+            groups = {}
+            for position, symbol in enumerate(symbols):
+                models, scaler, feature_columns = self._resolve_models(target_horizon, symbol)
+                group = groups.setdefault(id(models), {
+                    'models': models, 'scaler': scaler, 'feature_columns': feature_columns, 'positions': []
+                })
+                group['positions'].append(position)
+            
+            timestamp = datetime.now().isoformat()
+            results = {}
+            
+            for group in groups.values():
+                positions = group['positions']
+                feature_columns = group['feature_columns']
+                
+                if frames is None:
+                    rows = latest_rows.iloc[positions]
+                    features = rows[feature_columns].to_numpy(dtype=float)
+                    current_prices = rows['close'].to_numpy(dtype=float)
+                else:
+                    features = np.vstack([frames[p][feature_columns].to_numpy(dtype=float)[-1] for p in positions])
+                    current_prices = np.array([frames[p]['close'].iloc[-1] for p in positions], dtype=float)
+                
+                # One scaling call for the whole group
+                features_scaled = group['scaler'].transform(features)
+                
+                model_names = list(group['models'].keys())
+                model_preds = np.column_stack([
+                    np.asarray(group['models'][name].predict(features_scaled), dtype=float) for name in model_names
+                ])
+                
+                ensemble_preds = model_preds.mean(axis=1)
+                pred_stds = np.column_stack([model_preds, ensemble_preds]).std(axis=1)
+                price_changes = (ensemble_preds - current_prices) / current_prices * 100
+                
+                for k, position in enumerate(positions):
+                    predictions = dict(zip(model_names, model_preds[k]))
+                    ensemble_pred = ensemble_preds[k]
+                    predictions['ensemble'] = ensemble_pred
+                    pred_std = pred_stds[k]
+                    
+                    results[symbols[position]] = {
+                        'current_price': current_prices[k],
+                        'predicted_price': ensemble_pred if model_type == 'ensemble' else predictions[model_type],
+                        'price_change_percent': price_changes[k],
+                        'confidence_interval': {
+                            'lower_95': ensemble_pred - 1.96 * pred_std,
+                            'upper_95': ensemble_pred + 1.96 * pred_std,
+                            'lower_80': ensemble_pred - 1.28 * pred_std,
+                            'upper_80': ensemble_pred + 1.28 * pred_std
+                        },
+                        'all_predictions': predictions,
+                        'prediction_horizon': target_horizon,
+                        'timestamp': timestamp
+                    }
+            
+            logger.info(f"Generated batched predictions for {len(results)} symbols "
+                        f"({len(groups)} model groups, {target_horizon}-step horizon)")
+            return {symbol: results[symbol] for symbol in symbols}
+            
+        except Exception as e:
+            logger.error(f"Error making batch prediction: {str(e)}")
+            raise
+    
     def _calculate_metrics(self, y_true: np.ndarray, y_pred: np.ndarray) -> Dict:
         """Calculate prediction metrics"""
         return {
@@ -324,53 +1342,115 @@ class CryptoPredictionAgent:
     def train_prophet_model(self, data: pd.DataFrame, symbol: str) -> Dict:
         """
         Train Facebook Prophet model for time series forecasting
+        
+        Fits are cached per symbol by a fingerprint of the input rows: identical
+        data returns the cached fit, and data that only appends rows to the
+        cached history warm-starts from the previous fit's parameters.
         """
         try:
-            # Prepare data for Prophet
-            prophet_data = data[['timestamp', 'close']].copy()
-            prophet_data.columns = ['ds', 'y']
-            prophet_data['ds'] = pd.to_datetime(prophet_data['ds'])
-            
-            # Initialize and fit Prophet model
-            model = Prophet(
-                daily_seasonality=True,
-                weekly_seasonality=True,
-                yearly_seasonality=True,
-                changepoint_prior_scale=0.05,
-                seasonality_prior_scale=10.0
-            )
+            prophet_data = _prepare_prophet_frame(data)
+            cached, init = self._lookup_prophet_cache(symbol, prophet_data)
+            if cached is not None:
+                return cached
             
-            # Add custom regressors if available
-            if 'volume' in data.columns:
-                prophet_data['volume'] = data['volume'].values
-                model.add_regressor('volume')
-            
-            model.fit(prophet_data)
-            
-            # Make future predictions
-            future = model.make_future_dataframe(periods=30, freq='H')
-            if 'volume' in prophet_data.columns:
-                # Use last known volume for future predictions
-                future['volume'] = prophet_data['volume'].iloc[-1]
+            model, forecast, warm_started = _fit_prophet(
+                self.prophet_config, prophet_data, init, self.prophet_forecast_periods
+            )
+            return self._store_prophet_fit(symbol, prophet_data, model, forecast, warm_started)
             
-            forecast = model.predict(future)
+        except Exception as e:
+            logger.error(f"Error training Prophet model: {str(e)}")
+            raise
+    
+    def train_prophet_models(self, symbol_data: Dict[str, pd.DataFrame], max_workers: int = None) -> Dict[str, Dict]:
+        """
+        Fit Prophet for many symbols in parallel processes, with the same
+        caching and warm-start behaviour as train_prophet_model
+        """
+        try:
+            results = {}
+            jobs = {}
+            for symbol, data in symbol_data.items():
+                prophet_data = _prepare_prophet_frame(data)
+                cached, init = self._lookup_prophet_cache(symbol, prophet_data)
+                if cached is not None:
+                    results[symbol] = cached
+                else:
+                    jobs[symbol] = (prophet_data, init)
             
-            # Store model
-            self.models[f'prophet_{symbol}'] = model
+            if jobs:
+                workers = max(1, int(max_workers or self.config.get('prophet_workers') or os.cpu_count() or 1))
+                mp_context = multiprocessing.get_context(self.config.get('training_start_method'))
+                with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=mp_context) as executor:
+                    futures = {
+                        symbol: executor.submit(_fit_prophet_job, self.prophet_config, prophet_data, init,
+                                                self.prophet_forecast_periods)
+                        for symbol, (prophet_data, init) in jobs.items()
+                    }
+                    for symbol, future in futures.items():
+                        try:
+                            model_json, forecast, warm_started = future.result()
+                            results[symbol] = self._store_prophet_fit(
+                                symbol, jobs[symbol][0], model_from_json(model_json), forecast, warm_started
+                            )
+                        except Exception as e:
+                            logger.warning(f"Error training Prophet model for {symbol}: {str(e)}")
+                            results[symbol] = {'error': str(e)}
             
-            return {
-                'model': model,
-                'forecast': forecast,
-                'components': model.predict(future)[['ds', 'yhat', 'yhat_lower', 'yhat_upper', 'trend', 'seasonal']]
-            }
+            logger.info(f"Prophet models ready for {len(results)} symbols ({len(jobs)} fitted)")
+            return results
             
         except Exception as e:
-            logger.error(f"Error training Prophet model: {str(e)}")
+            logger.error(f"Error training Prophet models: {str(e)}")
             raise
     
-    def get_prediction_summary(self, symbol: str, timeframes: List[int] = [1, 6, 24, 168]) -> Dict:
+    def _lookup_prophet_cache(self, symbol: str, prophet_data: pd.DataFrame) -> Tuple[Optional[Dict], Optional[Dict]]:
         """
-        Get comprehensive prediction summary for multiple timeframes
+        Return (cached result, None) on an exact data match, (None, warm-start
+        params) when rows were only appended, and (None, None) otherwise
+        """
+        entry = self.prophet_cache.get(symbol)
+        if entry is None or len(prophet_data) < entry['n_rows']:
+            return None, None
+        
+        if len(prophet_data) == entry['n_rows']:
+            if _fingerprint_frame(prophet_data) == entry['fingerprint']:
+                logger.info(f"Prophet cache hit for {symbol}")
+                return self._prophet_result(entry['model'], entry['forecast'], 'cached'), None
+            return None, None
+        
+        if _fingerprint_frame(prophet_data.iloc[:entry['n_rows']]) == entry['fingerprint']:
+            return None, _prophet_warm_start_params(entry['model'])
+        return None, None
+    
+    def _store_prophet_fit(self, symbol: str, prophet_data: pd.DataFrame, model: Prophet,
+                           forecast: pd.DataFrame, warm_started: bool) -> Dict:
+        """Cache a fresh Prophet fit and register it as the symbol's model"""
+        self.prophet_cache[symbol] = {
+            'fingerprint': _fingerprint_frame(prophet_data),
+            'n_rows': len(prophet_data),
+            'model': model,
+            'forecast': forecast
+        }
+        
+        # Store model
+        self.models[f'prophet_{symbol}'] = model
+        
+        return self._prophet_result(model, forecast, 'warm_start' if warm_started else 'cold')
+    
+    def _prophet_result(self, model: Prophet, forecast: pd.DataFrame, fit_mode: str) -> Dict:
+        return {
+            'model': model,
+            'forecast': forecast,
+            'components': _prophet_components(forecast),
+            'fit_mode': fit_mode
+        }
+    
+    def get_prediction_summary(self, symbol: str, timeframes: List[int] = [1, 6, 24, 168],
+                               data: pd.DataFrame = None) -> Dict:
+        """
+        Get comprehensive prediction summary for multiple timeframes, using the
+        symbol's registered models when available
         """
         try:
             summary = {
@@ -381,10 +1461,13 @@ class CryptoPredictionAgent:
                 'trend_analysis': {}
             }
             
+            if data is None:
+                raise ValueError("Feature data is required for prediction summary")
+            
             for horizon in timeframes:
-                if horizon in self.models:
+                if self._get_symbol_model(symbol, horizon) is not None or horizon in self.models:
                     # Get prediction for this timeframe
-                    pred_result = self.predict(data, horizon)
+                    pred_result = self.predict(data, horizon, symbol=symbol)
                     summary['predictions'][f'{horizon}h'] = pred_result
                     
                     # Calculate confidence score based on model agreement
@@ -6,10 +6,17 @@ Provides comprehensive risk analysis for cryptocurrency investments
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import threading
 import logging
+import time
+import os
 from scipy import stats
+from scipy.linalg.blas import dger
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 import warnings
@@ -17,6 +24,750 @@ warnings.filterwarnings('ignore')
 
 logger = logging.getLogger(__name__)
 
+
+# Monte Carlo model shared with pool workers through the initializer, so the
+# loadings matrix is pickled once per worker rather than once per chunk
+_MC_MODEL = None
+
+
+def _init_monte_carlo_worker(model: Dict):
+    global _MC_MODEL
+    _MC_MODEL = model
+
+
+# Agent and price data shared with batch assessment workers through the
+# initializer (inherited without pickling under fork), caches already warm
+_BATCH_AGENT = None
+_BATCH_PRICE_DATA = None
+
+
+def _init_batch_worker(agent, price_data: Dict):
+    global _BATCH_AGENT, _BATCH_PRICE_DATA
+    _BATCH_AGENT = agent
+    _BATCH_PRICE_DATA = price_data
+
+
+def _assess_portfolio_chunk(portfolios: List[Dict]) -> List[Dict]:
+    return [_BATCH_AGENT.assess_portfolio_risk(portfolio, _BATCH_PRICE_DATA) for portfolio in portfolios]
+
+
+def _simulate_portfolio_chunk(n_paths: int, seed: np.random.SeedSequence, model: Optional[Dict] = None) -> np.ndarray:
+    """
+    Simulate n_paths correlated asset-return vectors from a Cholesky or factor
+    model and return the portfolio return of each path
+    """
+    model = model if model is not None else _MC_MODEL
+    rng = np.random.default_rng(seed)
+    loadings = model['loadings']
+
+    shocks = rng.standard_normal((n_paths, loadings.shape[1])) @ loadings.T
+    if model['residual_sd'] is not None:
+        shocks += rng.standard_normal((n_paths, len(model['residual_sd']))) * model['residual_sd']
+    if model['df'] is not None:
+        # Multivariate Student-t: one chi-square mixing draw per path, scaled to keep the covariance
+        df = model['df']
+        shocks *= np.sqrt((df - 2) / rng.chisquare(df, n_paths))[:, None]
+
+    return model['portfolio_mean'] + shocks @ model['weights']
+
+
+class ReturnsMatrix:
+    """
+    Simple returns of several assets on a common time axis (rows = periods,
+    columns = symbols). Built by ReturnsCache and shared read-only by every
+    metric computed for a request.
+    """
+
+    def __init__(self, symbols: List[str], values: np.ndarray, timestamps: Optional[pd.DatetimeIndex], aligned_on: str):
+        self.symbols = symbols
+        self.values = values
+        self.timestamps = timestamps
+        self.aligned_on = aligned_on  # 'timestamp' or 'tail'
+        self.index = {symbol: i for i, symbol in enumerate(symbols)}
+        self.derived = {}
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+    def column(self, symbol: str) -> np.ndarray:
+        return self.values[:, self.index[symbol]]
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.values, columns=self.symbols, index=self.timestamps)
+
+    def memo(self, name: str, compute):
+        """Result of compute() computed once per matrix (a racing duplicate computation is discarded)"""
+        if name not in self.derived:
+            self.derived.setdefault(name, compute())
+        return self.derived[name]
+
+
+class ReturnsCache:
+    """
+    Memoizes per-asset returns and aligned multi-asset return matrices, keyed
+    by the identity of each price list (holding a reference so the id cannot
+    be recycled, and its length so appends invalidate the entry).
+    Series with a 'timestamp' on every point are aligned on common
+    timestamps; otherwise returns are aligned on their most recent periods.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._series = OrderedDict()
+        self._matrices = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict):
+        # Re-key on the ids the unpickled price lists now have
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._series = OrderedDict((self._key(entry['source']), entry) for entry in self._series.values())
+        self._matrices = OrderedDict(
+            (tuple((symbol, *self._key(prices)) for (symbol, *_), prices in zip(key, entry[0])), entry)
+            for key, entry in self._matrices.items()
+        )
+
+    @staticmethod
+    def _key(prices: List[Dict]) -> Tuple[int, int]:
+        return id(prices), len(prices)
+
+    def _remember(self, table: OrderedDict, key, value):
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > self.max_entries:
+            table.popitem(last=False)
+
+    def series(self, prices: List[Dict]) -> Dict:
+        """Price array, returns and (optional) timestamps for one price list"""
+        key = self._key(prices)
+        with self._lock:
+            entry = self._series.get(key)
+            if entry is not None and entry['source'] is prices:
+                self._series.move_to_end(key)
+                return entry
+
+        price_array = np.array([p['price'] for p in prices], dtype=float)
+        returns = np.diff(price_array) / price_array[:-1] if len(price_array) >= 2 else np.array([])
+        timestamps = None
+        if prices and all(p.get('timestamp') is not None for p in prices):
+            timestamps = self._parse_timestamps([p['timestamp'] for p in prices])
+        for array in (price_array, returns):
+            array.setflags(write=False)
+
+        entry = {'source': prices, 'prices': price_array, 'returns': returns, 'timestamps': timestamps, 'derived': {}}
+        with self._lock:
+            self._remember(self._series, key, entry)
+        return entry
+
+    @staticmethod
+    def _parse_timestamps(values: List) -> Optional[pd.DatetimeIndex]:
+        """ISO strings, datetimes or unix epochs (seconds or milliseconds); None if unparseable"""
+        try:
+            if isinstance(values[0], str):
+                return pd.DatetimeIndex(pd.to_datetime(values, format='ISO8601', utc=True))
+            if isinstance(values[0], (int, float, np.number)):
+                unit = 'ms' if abs(values[0]) > 1e11 else 's'
+                return pd.DatetimeIndex(pd.to_datetime(values, unit=unit, utc=True))
+            return pd.DatetimeIndex(pd.to_datetime(values, utc=True))
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Unparseable price timestamps, aligning on the latest periods: {str(e)}")
+            return None
+
+    def returns(self, prices: List[Dict]) -> np.ndarray:
+        return self.series(prices)['returns']
+
+    def derived(self, prices: List[Dict], name: str, compute):
+        """Result of compute() memoized alongside the returns of one price list"""
+        derived = self.series(prices)['derived']
+        if name not in derived:
+            derived.setdefault(name, compute())
+        return derived[name]
+
+    def matrix(self, symbols: List[str], price_data: Dict) -> ReturnsMatrix:
+        """Aligned returns for the symbols that have any return data, in the given order"""
+        sources = [price_data.get(symbol, {}).get('prices', []) for symbol in symbols]
+        key = tuple((symbol, *self._key(prices)) for symbol, prices in zip(symbols, sources))
+        with self._lock:
+            entry = self._matrices.get(key)
+            if entry is not None and all(a is b for a, b in zip(entry[0], sources)):
+                self._matrices.move_to_end(key)
+                return entry[1]
+
+        series = {}
+        for symbol, prices in zip(symbols, sources):
+            data = self.series(prices)
+            if len(data['returns']) > 0:
+                series[symbol] = data
+        matrix = self._align(list(series), list(series.values()))
+
+        with self._lock:
+            self._remember(self._matrices, key, (sources, matrix))
+        return matrix
+
+    @staticmethod
+    def _align(symbols: List[str], series: List[Dict]) -> ReturnsMatrix:
+        if not symbols:
+            return ReturnsMatrix([], np.empty((0, 0)), None, 'tail')
+
+        if all(data['timestamps'] is not None for data in series):
+            frame = pd.concat(
+                [
+                    pd.Series(data['prices'], index=data['timestamps'])
+                    .pipe(lambda s: s[~s.index.duplicated(keep='last')])
+                    for data in series
+                ],
+                axis=1, join='inner'
+            ).sort_index()
+            prices = frame.to_numpy()
+            values = np.diff(prices, axis=0) / prices[:-1]
+            values.setflags(write=False)
+            return ReturnsMatrix(symbols, values, frame.index[1:], 'timestamp')
+
+        min_length = min(len(data['returns']) for data in series)
+        values = np.column_stack([data['returns'][-min_length:] for data in series])
+        values.setflags(write=False)
+        return ReturnsMatrix(symbols, values, None, 'tail')
+
+
+class CovarianceEstimator:
+    """
+    Incrementally updated covariance of asset returns, O(n^2) per new return
+    vector. method='rolling' keeps a Welford mean/co-moment over the last
+    `window` observations (all of them if window is None); method='ewma'
+    is the RiskMetrics estimator (zero-mean, decay lambda) normalized by the
+    accumulated weight. shrinkage='ledoit_wolf' shrinks towards a scaled
+    identity with the Ledoit-Wolf intensity.
+    """
+
+    def __init__(self, symbols: List[str], method: str = 'rolling', window: Optional[int] = None,
+                 decay: float = 0.94, shrinkage: Optional[str] = None):
+        if method not in ('rolling', 'ewma'):
+            raise ValueError(f"Unknown covariance method {method}")
+        if shrinkage not in (None, 'ledoit_wolf'):
+            raise ValueError(f"Unknown covariance shrinkage {shrinkage}")
+
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.method = method
+        self.window = window
+        self.decay = decay
+        self.shrinkage = shrinkage
+        self.count = 0
+
+        n_assets = len(self.symbols)
+        self._mean = np.zeros(n_assets)
+        self._comoment = np.zeros((n_assets, n_assets), order='F')  # Fortran order so BLAS dger updates it in place
+        self._observations = deque()  # rolling window, needed for removals and the shrinkage intensity
+        self._weight = 0.0     # EWMA: sum of decayed weights
+        self._weight_sq = 0.0  # EWMA: sum of squared weights, for the effective sample size
+        self._fourth = 0.0     # EWMA: decayed sum of ||x||^4
+        self._version = 0
+        self._cached = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def update(self, returns: np.ndarray):
+        """Add one return vector (ordered as self.symbols)"""
+        x = np.asarray(returns, dtype=float)
+        with self._lock:
+            if self.method == 'rolling':
+                self._add(x)
+                self._observations.append(x)
+                if self.window is not None and len(self._observations) > self.window:
+                    self._remove(self._observations.popleft())
+            else:
+                self._weight = self.decay * self._weight + 1
+                self._weight_sq = self.decay ** 2 * self._weight_sq + 1
+                self._mean += (x - self._mean) / self._weight
+                self._comoment *= self.decay
+                self._rank_one_update(1.0, x, x)
+                self._fourth = self.decay * self._fourth + (x @ x) ** 2
+                self.count += 1
+            self._version += 1
+
+    def update_many(self, returns: np.ndarray):
+        for row in np.atleast_2d(returns):
+            self.update(row)
+
+    def _add(self, x: np.ndarray):
+        self.count += 1
+        delta = x - self._mean
+        self._mean += delta / self.count
+        self._rank_one_update(1.0, delta, x - self._mean)
+
+    def _remove(self, x: np.ndarray):
+        self.count -= 1
+        delta = x - self._mean
+        self._mean -= delta / self.count
+        self._rank_one_update(-1.0, delta, x - self._mean)
+
+    def _rank_one_update(self, alpha: float, x: np.ndarray, y: np.ndarray):
+        self._comoment = dger(alpha, x, y, a=self._comoment, overwrite_a=1)
+
+    @property
+    def mean(self) -> np.ndarray:
+        with self._lock:
+            return self._mean.copy()
+
+    def covariance(self) -> np.ndarray:
+        """Current covariance matrix (ddof=1 for the unshrunk rolling estimate), cached until the next update"""
+        with self._lock:
+            if self._cached is not None and self._cached[0] == self._version:
+                return self._cached[1]
+
+            if self.method == 'rolling':
+                if self.count < 2:
+                    return np.full(self._comoment.shape, np.nan)
+                if self.shrinkage is None:
+                    covariance = self._comoment / (self.count - 1)
+                else:
+                    centered = np.array(self._observations) - self._mean
+                    covariance = self._shrink(self._comoment / self.count,
+                                              ((centered ** 2).sum(axis=1) ** 2).mean(), self.count)
+            else:
+                if self.count == 0:
+                    return np.full(self._comoment.shape, np.nan)
+                covariance = self._comoment / self._weight
+                if self.shrinkage is not None:
+                    covariance = self._shrink(covariance, self._fourth / self._weight,
+                                              self._weight ** 2 / self._weight_sq)
+
+            covariance.setflags(write=False)
+            self._cached = (self._version, covariance)
+            return covariance
+
+    @staticmethod
+    def _shrink(sample: np.ndarray, mean_fourth: float, n_samples: float) -> np.ndarray:
+        """Ledoit-Wolf shrinkage of a (biased) sample covariance towards mu * I"""
+        n_assets = len(sample)
+        mu = np.trace(sample) / n_assets
+        target_distance = ((sample - mu * np.eye(n_assets)) ** 2).sum()
+        if target_distance == 0:
+            return sample
+        estimation_error = (mean_fourth - (sample ** 2).sum()) / n_samples
+        intensity = min(max(estimation_error, 0.0), target_distance) / target_distance
+        return (1 - intensity) * sample + intensity * mu * np.eye(n_assets)
+
+    def volatilities(self) -> np.ndarray:
+        return np.sqrt(np.diag(self.covariance()))
+
+    def weight_vector(self, assets: List[Dict]) -> np.ndarray:
+        """Portfolio weights ordered as self.symbols (repeated symbols summed, untracked ones dropped)"""
+        weights = np.zeros(len(self.symbols))
+        for asset in assets:
+            if asset['symbol'] in self.index:
+                weights[self.index[asset['symbol']]] += asset['weight']
+        return weights
+
+    def portfolio_volatility(self, weights: np.ndarray) -> float:
+        return float(np.sqrt(max(weights @ self.covariance() @ weights, 0.0)))
+
+    def diversification_ratio(self, weights: np.ndarray) -> float:
+        portfolio_volatility = self.portfolio_volatility(weights)
+        return float(weights @ self.volatilities() / portfolio_volatility) if portfolio_volatility > 0 else 1.0
+
+    def parametric_var(self, weights: np.ndarray, confidence_levels: List[float]) -> Dict[float, float]:
+        """Normal VaR of the portfolio return at each confidence level"""
+        portfolio_mean = float(self.mean @ weights)
+        portfolio_volatility = self.portfolio_volatility(weights)
+        return {
+            confidence: portfolio_mean + stats.norm.ppf(1 - confidence) * portfolio_volatility
+            for confidence in confidence_levels
+        }
+
+
+class CorrelationEngine:
+    """
+    Pearson correlations of a returns matrix (rows = periods, columns =
+    assets) as one BLAS product of standardized columns. For universes too
+    large to hold the full matrix, scan() walks it in square blocks of the
+    upper triangle, keeping only summary statistics and the pairs above a
+    threshold.
+    """
+
+    def __init__(self, dtype: str = 'float64', block_size: int = 1024):
+        self.dtype = np.dtype(dtype)
+        self.block_size = max(1, int(block_size))
+
+    def standardize(self, values: np.ndarray) -> np.ndarray:
+        """Centered columns scaled so that z.T @ z is the correlation matrix (constant columns become NaN)"""
+        values = np.asarray(values, dtype=float)
+        centered = values - values.mean(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = centered / np.sqrt((centered ** 2).sum(axis=0))
+        return z.astype(self.dtype, copy=False)
+
+    def matrix(self, values: np.ndarray) -> np.ndarray:
+        z = self.standardize(values)
+        corr = z.T @ z
+        np.clip(corr, -1, 1, out=corr)
+        diagonal = np.diag_indices_from(corr)
+        corr[diagonal] = np.where(np.isnan(corr[diagonal]), np.nan, 1.0)
+        return corr
+
+    @staticmethod
+    def upper_triangle(corr: np.ndarray) -> np.ndarray:
+        return corr[np.triu_indices_from(corr, k=1)]
+
+    @staticmethod
+    def find_pairs(corr: np.ndarray, threshold: float, max_pairs: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Row, column and value of upper-triangle entries with |corr| >= threshold, strongest first"""
+        rows, cols = np.nonzero(np.triu(np.abs(corr) >= threshold, k=1))
+        return CorrelationEngine._rank_pairs(rows, cols, corr[rows, cols], max_pairs)
+
+    @staticmethod
+    def _rank_pairs(rows: np.ndarray, cols: np.ndarray, values: np.ndarray,
+                    max_pairs: Optional[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        strength = np.abs(values)
+        if max_pairs is not None and len(values) > max_pairs:
+            keep = np.argpartition(-strength, max_pairs - 1)[:max_pairs] if max_pairs > 0 else np.array([], dtype=int)
+            rows, cols, values, strength = rows[keep], cols[keep], values[keep], strength[keep]
+        # Strongest first, ties in row-major order
+        order = np.lexsort((cols, rows, -strength))
+        return rows[order], cols[order], values[order]
+
+    def scan(self, values: np.ndarray, threshold: float, max_pairs: Optional[int] = None) -> Dict:
+        """
+        Mean/max/min of the upper triangle and the pairs above threshold,
+        computed block by block without materializing the full matrix
+        """
+        z = self.standardize(values)
+        n_assets = z.shape[1]
+        total, count = 0.0, 0
+        highest, lowest = -np.inf, np.inf
+        found_rows, found_cols, found_values = [], [], []
+
+        for row_start in range(0, n_assets, self.block_size):
+            row_block = z[:, row_start:row_start + self.block_size]
+            for col_start in range(row_start, n_assets, self.block_size):
+                block = np.clip(row_block.T @ z[:, col_start:col_start + self.block_size], -1, 1)
+                if col_start == row_start:
+                    upper = self.upper_triangle(block)
+                    hit_rows, hit_cols = np.nonzero(np.triu(np.abs(block) >= threshold, k=1))
+                else:
+                    upper = block.ravel()
+                    hit_rows, hit_cols = np.nonzero(np.abs(block) >= threshold)
+                if upper.size == 0:
+                    continue
+
+                total += upper.sum(dtype=np.float64)
+                count += upper.size
+                highest = np.maximum(highest, upper.max())
+                lowest = np.minimum(lowest, upper.min())
+                found_rows.append(hit_rows + row_start)
+                found_cols.append(hit_cols + col_start)
+                found_values.append(block[hit_rows, hit_cols])
+
+            if max_pairs is not None and found_values:
+                # Bound memory on dense universes by pruning after every row block
+                ranked = self._rank_pairs(np.concatenate(found_rows), np.concatenate(found_cols),
+                                          np.concatenate(found_values), max_pairs)
+                found_rows, found_cols, found_values = ([part] for part in ranked)
+
+        if found_values:
+            pairs = self._rank_pairs(np.concatenate(found_rows), np.concatenate(found_cols),
+                                     np.concatenate(found_values), max_pairs)
+        else:
+            pairs = (np.array([], dtype=int), np.array([], dtype=int), np.array([]))
+
+        return {
+            'average': total / count if count else np.nan,
+            'max': highest if count else np.nan,
+            'min': lowest if count else np.nan,
+            'pairs': pairs
+        }
+
+
+class StressScenarioEngine:
+    """
+    Evaluates stress scenarios as a shock matrix (scenarios x assets) against
+    holding values (portfolios x assets), so every scenario/portfolio pair is
+    priced in a single matrix product. Shocks resolve per asset as 'all',
+    then the symbol itself, then its sector (e.g. 'DeFi'), then 'others'.
+    """
+
+    def __init__(self, asset_sectors: Dict[str, str]):
+        self.asset_sectors = asset_sectors
+
+    def shock_matrix(self, symbols: List[str], scenarios: List[Dict]) -> np.ndarray:
+        """Fractional price shock of every symbol under every scenario"""
+        positions = {}
+        for i, symbol in enumerate(symbols):
+            positions.setdefault(symbol, []).append(i)
+        sectors = {}
+        for i, symbol in enumerate(symbols):
+            sector = self.asset_sectors.get(symbol)
+            if sector is not None:
+                sectors.setdefault(sector, []).append(i)
+
+        shocks = np.zeros((len(scenarios), len(symbols)))
+        for row, scenario in zip(shocks, scenarios):
+            spec = scenario['shocks']
+            if 'all' in spec:
+                row[:] = spec['all']
+                continue
+            row[:] = spec.get('others', 0.0)
+            # Sector shocks first so an explicit symbol shock always wins
+            for key, shock in spec.items():
+                if key in sectors and key not in positions:
+                    row[sectors[key]] = shock
+            for key, shock in spec.items():
+                if key in positions:
+                    row[positions[key]] = shock
+        return shocks
+
+    @staticmethod
+    def evaluate(values: np.ndarray, shocks: np.ndarray) -> Dict:
+        """
+        Price every scenario against every portfolio. values is
+        (portfolios x assets) or a single value vector; every result array
+        is (portfolios x scenarios) apart from the per-portfolio summaries.
+        """
+        values = np.atleast_2d(np.asarray(values, dtype=float))
+        value_before = values.sum(axis=1)
+        value_after = value_before[:, None] + values @ shocks.T
+        absolute_loss = value_before[:, None] - value_after
+        percentage_loss = np.divide(absolute_loss * 100, value_before[:, None],
+                                    out=np.zeros_like(absolute_loss), where=value_before[:, None] != 0)
+
+        return {
+            'value_before': value_before,
+            'value_after': value_after,
+            'absolute_loss': absolute_loss,
+            'percentage_loss': percentage_loss,
+            'worst_case_index': value_after.argmin(axis=1) if shocks.shape[0] else np.zeros(len(values), dtype=int),
+            'resilience_score': np.maximum(0, 100 - percentage_loss.mean(axis=1)) if shocks.shape[0] else np.full(len(values), 100.0)
+        }
+
+
+class MomentAccumulator:
+    """
+    Count, mean and central moment sums (M2..M4) of a stream, updated a
+    chunk at a time and mergeable in any order (Chan/Pebay pairwise formulas)
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+
+    def update(self, values: np.ndarray) -> 'MomentAccumulator':
+        values = np.asarray(values, dtype=float)
+        if len(values) == 0:
+            return self
+        chunk = MomentAccumulator()
+        chunk.count = len(values)
+        chunk.mean = values.mean()
+        deviations = values - chunk.mean
+        squared = deviations ** 2
+        chunk.m2 = squared.sum()
+        chunk.m3 = (squared * deviations).sum()
+        chunk.m4 = (squared ** 2).sum()
+        return self.merge(chunk)
+
+    def merge(self, other: 'MomentAccumulator') -> 'MomentAccumulator':
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.__dict__.update(other.__dict__)
+            return self
+
+        na, nb = self.count, other.count
+        n = na + nb
+        delta = other.mean - self.mean
+        m2 = self.m2 + other.m2 + delta ** 2 * na * nb / n
+        m3 = (self.m3 + other.m3 + delta ** 3 * na * nb * (na - nb) / n ** 2
+              + 3 * delta * (na * other.m2 - nb * self.m2) / n)
+        m4 = (self.m4 + other.m4 + delta ** 4 * na * nb * (na ** 2 - na * nb + nb ** 2) / n ** 3
+              + 6 * delta ** 2 * (na ** 2 * other.m2 + nb ** 2 * self.m2) / n ** 2
+              + 4 * delta * (na * other.m3 - nb * self.m3) / n)
+
+        self.count = n
+        self.mean = self.mean + delta * nb / n
+        self.m2, self.m3, self.m4 = m2, m3, m4
+        return self
+
+    def std(self, ddof: int = 0) -> float:
+        return float(np.sqrt(self.m2 / (self.count - ddof))) if self.count > ddof else 0.0
+
+    def skewness(self) -> float:
+        """Biased sample skewness (scipy.stats.skew default)"""
+        return float(np.sqrt(self.count) * self.m3 / self.m2 ** 1.5) if self.m2 > 0 else float('nan')
+
+    def kurtosis(self) -> float:
+        """Biased excess kurtosis (scipy.stats.kurtosis default)"""
+        return float(self.count * self.m4 / self.m2 ** 2 - 3) if self.m2 > 0 else float('nan')
+
+
+class DrawdownAccumulator:
+    """
+    Maximum drawdown of a return stream with the same semantics as
+    _calculate_portfolio_max_drawdown, updated a chunk at a time.
+
+    Besides growth, peak and drawdown, each accumulator keeps a compressed
+    staircase of (running-max record, lowest level before the next record)
+    so an accumulator built for a later chunk can be merged exactly after
+    this one; the staircase only grows when new lows are followed by new
+    highs, so it stays tiny for real price paths.
+    """
+
+    chunk_size = 1 << 16
+
+    def __init__(self):
+        self.count = 0
+        self.growth = 1.0
+        self.peak = None
+        self.max_drawdown = 0.0
+        self.records = np.empty(0)
+        self.floors = np.empty(0)
+
+    def update(self, returns: np.ndarray) -> 'DrawdownAccumulator':
+        returns = np.asarray(returns, dtype=float)
+        for start in range(0, len(returns), self.chunk_size):
+            self.merge(self._from_returns(returns[start:start + self.chunk_size]))
+        return self
+
+    @classmethod
+    def _from_returns(cls, returns: np.ndarray) -> 'DrawdownAccumulator':
+        chunk = cls()
+        cumulative = np.cumprod(1 + returns)
+        running_max = np.maximum.accumulate(cumulative)
+        record_index = np.flatnonzero(np.r_[True, cumulative[1:] > running_max[:-1]])
+        running_min = np.minimum.accumulate(cumulative)
+        floors = np.r_[running_min[record_index[1:] - 1], running_min[-1]]
+        keep = np.r_[True, floors[1:] < floors[:-1]]
+
+        chunk.count = len(returns)
+        chunk.growth = cumulative[-1]
+        chunk.peak = running_max[-1]
+        chunk.max_drawdown = float(np.max((running_max - cumulative) / running_max))
+        chunk.records = cumulative[record_index][keep]
+        chunk.floors = floors[keep]
+        return chunk
+
+    def merge(self, other: 'DrawdownAccumulator') -> 'DrawdownAccumulator':
+        """Append an accumulator covering the returns that follow this one"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.__dict__.update(other.__dict__)
+            return self
+
+        # Other's levels in this accumulator's units, measured against our peak
+        records = other.records * self.growth
+        floors = other.floors * self.growth
+        below = np.searchsorted(records, self.peak, side='right') - 1
+        lowest = self.floors[-1]
+        self_floors = self.floors.copy()
+        if below >= 0:
+            self_floors[-1] = min(lowest, floors[below])
+            cross_drawdown = (self.peak - floors[below]) / self.peak
+        else:
+            cross_drawdown = 0.0
+
+        above = records > self.peak
+        merged_floors = np.r_[self_floors, np.minimum(lowest, floors[above])]
+        keep = np.r_[True, merged_floors[1:] < merged_floors[:-1]]
+
+        self.max_drawdown = float(max(self.max_drawdown, other.max_drawdown, cross_drawdown))
+        self.records = np.r_[self.records, records[above]][keep]
+        self.floors = merged_floors[keep]
+        self.peak = max(self.peak, other.peak * self.growth)
+        self.growth *= other.growth
+        self.count += other.count
+        return self
+
+
+class StreamingRiskMetrics:
+    """
+    O(1)-memory risk metrics over a price or return stream: mean/volatility,
+    Sharpe and Sortino (as computed by the agent), downside deviation,
+    skewness, kurtosis and maximum drawdown. Fed chunk by chunk (e.g. from
+    iter_parquet_prices) and mergeable with the metrics of the chunk that
+    follows, so chunks can also be processed independently.
+    """
+
+    def __init__(self):
+        self.moments = MomentAccumulator()
+        self.downside = MomentAccumulator()
+        self.drawdown = DrawdownAccumulator()
+        self.first_price = None
+        self.last_price = None
+
+    def update_prices(self, prices: np.ndarray) -> 'StreamingRiskMetrics':
+        prices = np.asarray(prices, dtype=float)
+        if len(prices) == 0:
+            return self
+        if self.last_price is None:
+            self.first_price = prices[0]
+        else:
+            prices = np.r_[self.last_price, prices]
+        self.last_price = prices[-1]
+        return self.update_returns(np.diff(prices) / prices[:-1])
+
+    def update_returns(self, returns: np.ndarray) -> 'StreamingRiskMetrics':
+        returns = np.asarray(returns, dtype=float)
+        self.moments.update(returns)
+        self.downside.update(returns[returns < 0])
+        self.drawdown.update(returns)
+        return self
+
+    def merge(self, other: 'StreamingRiskMetrics') -> 'StreamingRiskMetrics':
+        """Append the metrics of the prices that follow this stream"""
+        if self.last_price is not None and other.first_price is not None:
+            # The return across the chunk boundary belongs to neither side
+            self.update_returns([(other.first_price - self.last_price) / self.last_price])
+        self.moments.merge(other.moments)
+        self.downside.merge(other.downside)
+        self.drawdown.merge(other.drawdown)
+        if self.first_price is None:
+            self.first_price = other.first_price
+        if other.last_price is not None:
+            self.last_price = other.last_price
+        return self
+
+    def result(self, risk_free_rate: float = 0.02, periods_per_year: int = 365) -> Dict:
+        volatility = self.moments.std()
+        excess_return = self.moments.mean - risk_free_rate / periods_per_year
+        downside_std = self.downside.std() if self.downside.count > 0 else volatility
+        downside_square_sum = self.downside.m2 + self.downside.count * self.downside.mean ** 2
+        return {
+            'observations': self.moments.count,
+            'mean_return': float(self.moments.mean),
+            'volatility': volatility,
+            'annual_volatility': float(volatility * np.sqrt(periods_per_year)),
+            'sharpe_ratio': float(excess_return / volatility) if volatility > 0 else 0.0,
+            'sortino_ratio': float(excess_return / downside_std) if downside_std > 0 else 0.0,
+            'downside_deviation': float(np.sqrt(downside_square_sum / self.moments.count)) if self.moments.count else 0.0,
+            'skewness': self.moments.skewness(),
+            'kurtosis': self.moments.kurtosis(),
+            'max_drawdown': self.drawdown.max_drawdown
+        }
+
+
+def iter_parquet_prices(path: str, column: str = 'price', batch_size: int = 1_000_000) -> Iterator[np.ndarray]:
+    """Stream one numeric column of a Parquet file in record batches (requires pyarrow)"""
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=[column]):
+        yield batch.column(0).to_numpy(zero_copy_only=False)
+
+
 class RiskAssessmentAgent:
     """
     Advanced risk assessment for cryptocurrency portfolios and individual assets
@@ -42,6 +793,29 @@ class RiskAssessmentAgent:
             'high': 0.8,
             'very_high': 1.0
         }
+        
+        # Correlation analysis; universes above correlation_matrix_max_assets are scanned in blocks
+        self.correlation_engine = CorrelationEngine(
+            self.config.get('correlation_dtype', 'float64'),
+            self.config.get('correlation_block_size', 1024)
+        )
+        
+        # Live covariance of a tracked universe, updated incrementally from intraday prices
+        self.live_covariance = None
+        self._live_prices = {}
+        
+        # Sector of each asset, matched against sector keys in stress scenarios
+        self.asset_sectors = {
+            'UNI': 'DeFi', 'AAVE': 'DeFi', 'MKR': 'DeFi', 'COMP': 'DeFi', 'CRV': 'DeFi',
+            'SUSHI': 'DeFi', 'SNX': 'DeFi', 'YFI': 'DeFi', 'LDO': 'DeFi', 'BAL': 'DeFi',
+            '1INCH': 'DeFi', 'CAKE': 'DeFi', 'LINK': 'Oracle',
+            'USDT': 'Stablecoin', 'USDC': 'Stablecoin', 'DAI': 'Stablecoin'
+        }
+        self.asset_sectors.update(self.config.get('asset_sectors', {}))
+        self.stress_engine = StressScenarioEngine(self.asset_sectors)
+        
+        # Memoized per-asset returns and aligned multi-asset return matrices
+        self.returns_cache = ReturnsCache(self.config.get('returns_cache_size', 256))
     
     def assess_portfolio_risk(self, portfolio: Dict, price_data: Dict) -> Dict:
         """
@@ -97,6 +871,45 @@ class RiskAssessmentAgent:
             logger.error(f"Error assessing portfolio risk: {str(e)}")
             return {'error': str(e)}
     
+    def assess_portfolio_risks(self, portfolios: List[Dict], price_data: Dict, workers: Optional[int] = None) -> List[Dict]:
+        """
+        Assess many portfolios against one shared price_data, in input order.
+        
+        Per-asset statistics, aligned returns and correlation summaries are
+        computed once per price history / asset set and shared by every
+        portfolio, so each result matches assess_portfolio_risk for that
+        portfolio. Batches of at least batch_pool_threshold portfolios fan out
+        over batch_workers processes, which inherit the warmed caches.
+        """
+        workers = workers or self.config.get('batch_workers', os.cpu_count() or 1)
+        workers = max(1, min(int(workers), len(portfolios)))
+        if workers == 1 or len(portfolios) < self.config.get('batch_pool_threshold', 200):
+            return [self.assess_portfolio_risk(portfolio, price_data) for portfolio in portfolios]
+        
+        self._warm_shared_statistics(portfolios, price_data)
+        chunk_size = -(-len(portfolios) // (workers * 4))
+        chunks = [portfolios[i:i + chunk_size] for i in range(0, len(portfolios), chunk_size)]
+        mp_context = multiprocessing.get_context(self.config.get('batch_start_method'))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context,
+                                 initializer=_init_batch_worker, initargs=(self, price_data)) as executor:
+            return [result for chunk in executor.map(_assess_portfolio_chunk, chunks) for result in chunk]
+    
+    def _warm_shared_statistics(self, portfolios: List[Dict], price_data: Dict):
+        """Compute the per-asset and per-asset-set parts of the assessment before fanning out"""
+        asset_sets = {}
+        for portfolio in portfolios:
+            symbols = [holding['symbol'] for holding in portfolio.get('holdings', [])]
+            asset_sets.setdefault(tuple(symbols), True)
+        
+        for symbol in {symbol for symbols in asset_sets for symbol in symbols}:
+            self._assess_asset_risk({'symbol': symbol, 'weight': 0.0}, price_data.get(symbol, {}))
+        for symbols in asset_sets:
+            if len(symbols) >= 2:
+                # The weights only enter after the shared correlation summary
+                self._analyze_portfolio_correlations(
+                    {'assets': [{'symbol': symbol, 'weight': 0.0} for symbol in symbols]}, price_data
+                )
+    
     def assess_asset_risk(self, symbol: str, price_data: Dict) -> Dict:
         """
         Detailed risk assessment for individual cryptocurrency
@@ -141,11 +954,18 @@ class RiskAssessmentAgent:
             logger.error(f"Error assessing asset risk for {symbol}: {str(e)}")
             return {'error': str(e)}
     
-    def calculate_var(self, portfolio: Dict, price_data: Dict, confidence_levels: List[float] = [0.95, 0.99]) -> Dict:
+    def calculate_var(self, portfolio: Dict, price_data: Dict, confidence_levels: List[float] = [0.95, 0.99],
+                      method: Optional[str] = None, simulations: Optional[int] = None, seed: Optional[int] = None,
+                      workers: Optional[int] = None, model: str = 'cholesky', distribution: str = 'normal') -> Dict:
         """
         Calculate Value at Risk (VaR) for portfolio
+        
+        method='monte_carlo' replaces the historical estimates with VaR/ES from
+        simulated correlated asset returns (see _monte_carlo_var); the
+        parametric estimate is reported either way.
         """
         try:
+            method = method or self.config.get('var_method', 'historical')
             var_results = {
                 'timestamp': datetime.now().isoformat(),
                 'confidence_levels': confidence_levels,
@@ -154,42 +974,69 @@ class RiskAssessmentAgent:
                 'methodology': 'historical_simulation'
             }
             
+            # Accept raw portfolios (holdings) as well as prepared portfolio data (assets with weights)
+            portfolio_data = portfolio if 'assets' in portfolio else self._prepare_portfolio_data(portfolio, price_data)
+            total_value = portfolio_data.get('total_value', 0)
+            
             # Prepare portfolio returns
-            portfolio_returns = self._calculate_portfolio_returns(portfolio, price_data)
+            portfolio_returns = self._calculate_portfolio_returns(portfolio_data, price_data)
             
             if len(portfolio_returns) < 30:
                 return {'error': 'Insufficient data for VaR calculation'}
             
+            if method == 'monte_carlo':
+                simulation = self._monte_carlo_var(
+                    portfolio_data, price_data, confidence_levels,
+                    simulations or self.config.get('mc_simulations', 100000),
+                    seed, workers, model, distribution
+                )
+                var_results['methodology'] = 'monte_carlo'
+                var_results['confidence_intervals'] = {}
+                var_results['simulation'] = simulation['simulation']
+            elif method != 'historical':
+                return {'error': f'Unknown VaR method {method}'}
+            
             # Calculate VaR for each confidence level
             for confidence in confidence_levels:
-                # Historical VaR
-                var_percentile = (1 - confidence) * 100
-                var_value = np.percentile(portfolio_returns, var_percentile)
+                label = f'{confidence:.0%}'
                 
-                # Expected Shortfall (Conditional VaR)
-                tail_returns = portfolio_returns[portfolio_returns <= var_value]
-                expected_shortfall = np.mean(tail_returns) if len(tail_returns) > 0 else var_value
+                if method == 'monte_carlo':
+                    var_value = simulation['var'][confidence]
+                    expected_shortfall = simulation['es'][confidence]
+                    var_results['confidence_intervals'][label] = simulation['intervals'][confidence]
+                else:
+                    # Historical VaR
+                    var_percentile = (1 - confidence) * 100
+                    var_value = np.percentile(portfolio_returns, var_percentile)
+                    
+                    # Expected Shortfall (Conditional VaR)
+                    tail_returns = portfolio_returns[portfolio_returns <= var_value]
+                    expected_shortfall = np.mean(tail_returns) if len(tail_returns) > 0 else var_value
                 
-                var_results['var_estimates'][f'{confidence:.0%}'] = {
+                var_results['var_estimates'][label] = {
                     'var_absolute': var_value,
                     'var_percentage': var_value * 100,
-                    'var_dollar': var_value * portfolio.get('total_value', 0)
+                    'var_dollar': var_value * total_value
                 }
                 
-                var_results['expected_shortfall'][f'{confidence:.0%}'] = {
+                var_results['expected_shortfall'][label] = {
                     'es_absolute': expected_shortfall,
                     'es_percentage': expected_shortfall * 100,
-                    'es_dollar': expected_shortfall * portfolio.get('total_value', 0)
+                    'es_dollar': expected_shortfall * total_value
                 }
             
-            # Parametric VaR (assuming normal distribution)
+            # Parametric VaR (assuming normal distribution), from the live covariance when available
+            live = self._live_covariance_for([asset['symbol'] for asset in portfolio_data['assets']])
+            if live is not None:
+                live_var = live.parametric_var(live.weight_vector(portfolio_data['assets']), confidence_levels)
             returns_mean = np.mean(portfolio_returns)
             returns_std = np.std(portfolio_returns)
             
             var_results['parametric_var'] = {}
+            var_results['parametric_source'] = 'live_covariance' if live is not None else 'sample'
             for confidence in confidence_levels:
                 z_score = stats.norm.ppf(1 - confidence)
-                parametric_var = returns_mean + z_score * returns_std
+                parametric_var = live_var[confidence] if live is not None else returns_mean + z_score * returns_std
                 
                 var_results['parametric_var'][f'{confidence:.0%}'] = {
                     'var_absolute': parametric_var,
@@ -204,7 +1051,7 @@ class RiskAssessmentAgent:
     
     def perform_stress_test(self, portfolio: Dict, price_data: Dict, scenarios: List[Dict] = None) -> Dict:
         """
-        Perform stress testing on portfolio
+        Perform stress testing on portfolio (raw holdings or prepared portfolio data)
         """
         try:
             if scenarios is None:
@@ -217,38 +1064,41 @@ class RiskAssessmentAgent:
                 'portfolio_resilience_score': 0.0
             }
             
-            portfolio_value = portfolio.get('total_value', 0)
+            symbols, quantities, prices = self._holding_arrays(portfolio, price_data)
+            values = quantities * prices
+            shocks = self.stress_engine.shock_matrix(symbols, scenarios)
+            results = self.stress_engine.evaluate(values, shocks)
+            portfolio_value = float(results['value_before'][0])
             
-            for scenario in scenarios:
-                scenario_name = scenario['name']
-                scenario_shocks = scenario['shocks']
-                
-                # Apply shocks to portfolio
-                scenario_result = self._apply_stress_scenario(portfolio, scenario_shocks, price_data)
-                
-                stress_results['scenarios'][scenario_name] = {
+            for k, scenario in enumerate(scenarios):
+                new_prices = prices * (1 + shocks[k])
+                value_changes = values * shocks[k]
+                stress_results['scenarios'][scenario['name']] = {
                     'description': scenario.get('description', ''),
                     'portfolio_value_before': portfolio_value,
-                    'portfolio_value_after': scenario_result['new_value'],
-                    'absolute_loss': portfolio_value - scenario_result['new_value'],
-                    'percentage_loss': ((portfolio_value - scenario_result['new_value']) / portfolio_value) * 100,
-                    'asset_impacts': scenario_result['asset_impacts']
+                    'portfolio_value_after': float(results['value_after'][0, k]),
+                    'absolute_loss': float(results['absolute_loss'][0, k]),
+                    'percentage_loss': float(results['percentage_loss'][0, k]),
+                    'asset_impacts': {
+                        symbol: {
+                            'original_price': float(prices[i]),
+                            'new_price': float(new_prices[i]),
+                            'shock_applied': float(shocks[k, i]),
+                            'value_change': float(value_changes[i])
+                        }
+                        for i, symbol in enumerate(symbols)
+                    }
                 }
             
             # Find worst case scenario
-            worst_scenario = min(
-                stress_results['scenarios'].items(),
-                key=lambda x: x[1]['portfolio_value_after']
-            )
+            worst_name = scenarios[int(results['worst_case_index'][0])]['name']
             stress_results['worst_case_scenario'] = {
-                'scenario_name': worst_scenario[0],
-                'details': worst_scenario[1]
+                'scenario_name': worst_name,
+                'details': stress_results['scenarios'][worst_name]
             }
             
-            # Calculate portfolio resilience score
-            avg_loss = np.mean([s['percentage_loss'] for s in stress_results['scenarios'].values()])
-            resilience_score = max(0, 100 - avg_loss)  # Higher score = more resilient
-            stress_results['portfolio_resilience_score'] = resilience_score
+            # Higher score = more resilient
+            stress_results['portfolio_resilience_score'] = float(results['resilience_score'][0])
             
             return stress_results
             
@@ -256,6 +1106,136 @@ class RiskAssessmentAgent:
             logger.error(f"Error performing stress test: {str(e)}")
             return {'error': str(e)}
     
+    def stress_test_portfolios(self, portfolios: List[Dict], price_data: Dict, scenarios: List[Dict] = None) -> Dict:
+        """
+        Stress test many portfolios against many scenarios in one pass.
+        Returns per-portfolio losses (ordered as scenario_names), worst case
+        and resilience score, without the per-asset breakdown of perform_stress_test.
+        """
+        try:
+            if scenarios is None:
+                scenarios = self._get_default_stress_scenarios()
+            
+            # Union of held symbols as the shared asset axis
+            columns = {}
+            rows, cols, cells = [], [], []
+            for row, portfolio in enumerate(portfolios):
+                symbols, quantities, prices = self._holding_arrays(portfolio, price_data)
+                rows.extend([row] * len(symbols))
+                cols.extend(columns.setdefault(symbol, len(columns)) for symbol in symbols)
+                cells.append(quantities * prices)
+            
+            values = np.zeros((len(portfolios), len(columns)))
+            if rows:
+                np.add.at(values, (np.array(rows), np.array(cols)), np.concatenate(cells))
+            
+            shocks = self.stress_engine.shock_matrix(list(columns), scenarios)
+            results = self.stress_engine.evaluate(values, shocks)
+            scenario_names = [scenario['name'] for scenario in scenarios]
+            
+            portfolio_results = []
+            for row, portfolio in enumerate(portfolios):
+                worst = int(results['worst_case_index'][row])
+                portfolio_results.append({
+                    'portfolio_id': portfolio.get('id', row),
+                    'portfolio_value': float(results['value_before'][row]),
+                    'percentage_losses': results['percentage_loss'][row].tolist(),
+                    'worst_case_scenario': {
+                        'scenario_name': scenario_names[worst] if scenario_names else None,
+                        'portfolio_value_after': float(results['value_after'][row, worst]) if scenario_names else None,
+                        'absolute_loss': float(results['absolute_loss'][row, worst]) if scenario_names else 0.0,
+                        'percentage_loss': float(results['percentage_loss'][row, worst]) if scenario_names else 0.0
+                    },
+                    'portfolio_resilience_score': float(results['resilience_score'][row])
+                })
+            
+            return {
+                'timestamp': datetime.now().isoformat(),
+                'scenario_names': scenario_names,
+                'portfolio_count': len(portfolios),
+                'scenario_count': len(scenarios),
+                'portfolios': portfolio_results,
+                'average_resilience_score': float(results['resilience_score'].mean()) if portfolios else 0.0
+            }
+            
+        except Exception as e:
+            logger.error(f"Error performing batch stress test: {str(e)}")
+            return {'error': str(e)}
+    
+    def calculate_streaming_risk_metrics(self, price_chunks: Iterable, periods_per_year: int = 365) -> Dict:
+        """
+        Risk metrics over a price history delivered in chunks (arrays, lists
+        or Series, e.g. iter_parquet_prices(path)), in O(1) memory beyond the
+        current chunk
+        """
+        try:
+            metrics = StreamingRiskMetrics()
+            chunk_count = 0
+            for chunk in price_chunks:
+                metrics.update_prices(np.asarray(chunk, dtype=float))
+                chunk_count += 1
+            
+            if metrics.moments.count == 0:
+                return {'error': 'No return data available'}
+            
+            return {
+                'timestamp': datetime.now().isoformat(),
+                'chunks': chunk_count,
+                **metrics.result(self.risk_free_rate, periods_per_year)
+            }
+            
+        except Exception as e:
+            logger.error(f"Error calculating streaming risk metrics: {str(e)}")
+            return {'error': str(e)}
+    
+    def start_live_covariance(self, symbols: List[str], price_data: Dict) -> CovarianceEstimator:
+        """
+        Seed a live covariance estimator for a universe of symbols from their
+        price history. Portfolio volatility, diversification ratio and
+        parametric VaR then read from it for portfolios within the universe.
+        """
+        returns_matrix = self._get_returns_matrix(symbols, price_data)
+        method = self.config.get('covariance_method', 'rolling')
+        window = self.config.get('covariance_window', 90)
+        estimator = CovarianceEstimator(
+            returns_matrix.symbols, method, window,
+            self.config.get('ewma_decay', 0.94),
+            self.config.get('covariance_shrinkage')
+        )
+        history = returns_matrix.values[-window:] if method == 'rolling' and window else returns_matrix.values
+        estimator.update_many(history)
+        
+        self._live_prices = {
+            symbol: price_data[symbol]['prices'][-1]['price'] for symbol in returns_matrix.symbols
+        }
+        self.live_covariance = estimator
+        return estimator
+    
+    def update_live_prices(self, prices: Dict[str, float]) -> bool:
+        """Feed the latest price of every tracked symbol; returns False if any is missing"""
+        estimator = self.live_covariance
+        if estimator is None:
+            return False
+        
+        missing = [symbol for symbol in estimator.symbols if symbol not in prices]
+        if missing:
+            logger.warning(f"Live covariance update skipped, missing prices for {', '.join(missing[:5])}")
+            return False
+        
+        latest = np.array([prices[symbol] for symbol in estimator.symbols], dtype=float)
+        previous = np.array([self._live_prices[symbol] for symbol in estimator.symbols], dtype=float)
+        estimator.update(latest / previous - 1)
+        self._live_prices = dict(zip(estimator.symbols, latest.tolist()))
+        return True
+    
+    def _holding_arrays(self, portfolio: Dict, price_data: Dict) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """Symbols, quantities and current prices from raw holdings or prepared portfolio data"""
+        holdings = portfolio['assets'] if 'assets' in portfolio else portfolio.get('holdings', [])
+        symbols = [holding['symbol'] for holding in holdings]
+        quantities = np.array([holding['quantity'] for holding in holdings], dtype=float)
+        prices = np.array([price_data.get(symbol, {}).get('current_price', 0) for symbol in symbols], dtype=float)
+        return symbols, quantities, prices
+    
     def _prepare_portfolio_data(self, portfolio: Dict, price_data: Dict) -> Dict:
         """Prepare portfolio data for analysis"""
         assets = []
@@ -289,14 +1269,18 @@ class RiskAssessmentAgent:
     
     def _assess_asset_risk(self, asset: Dict, price_data: Dict) -> Dict:
         """Assess risk for individual asset"""
-        return {
-            'symbol': asset['symbol'],
-            'weight': asset['weight'],
+        # Statistics depend only on the price history, so they are computed once per price list
+        statistics = self.returns_cache.derived(price_data.get('prices', []), 'asset_risk', lambda: {
             'volatility': self._calculate_volatility(price_data),
             'max_drawdown': self._calculate_max_drawdown(price_data),
             'beta': self._calculate_beta(price_data),
-            'sharpe_ratio': self._calculate_sharpe_ratio(price_data),
-            'risk_contribution': asset['weight'] * self._calculate_volatility(price_data)
+            'sharpe_ratio': self._calculate_sharpe_ratio(price_data)
+        })
+        return {
+            'symbol': asset['symbol'],
+            'weight': asset['weight'],
+            **statistics,
+            'risk_contribution': asset['weight'] * statistics['volatility']
         }
     
     def _calculate_portfolio_risk_metrics(self, portfolio_data: Dict, price_data: Dict) -> Dict:
@@ -348,53 +1332,81 @@ class RiskAssessmentAgent:
             if len(symbols) < 2:
                 return {'message': 'Need at least 2 assets for correlation analysis'}
             
-            # Prepare return data for all assets
-            returns_data = {}
-            min_length = float('inf')
+            # Aligned return data for all assets
+            returns_matrix = self._get_returns_matrix(symbols, price_data)
             
-            for symbol in symbols:
-                returns = self._calculate_returns(price_data.get(symbol, {}))
-                if len(returns) > 0:
-                    returns_data[symbol] = returns
-                    min_length = min(min_length, len(returns))
-            
-            if len(returns_data) < 2 or min_length < 10:
+            if len(returns_matrix.symbols) < 2 or len(returns_matrix) < 10:
                 return {'error': 'Insufficient data for correlation analysis'}
             
-            # Align return series
-            aligned_returns = {}
-            for symbol, returns in returns_data.items():
-                aligned_returns[symbol] = returns[-min_length:]
-            
-            # Calculate correlation matrix
-            returns_df = pd.DataFrame(aligned_returns)
-            correlation_matrix = returns_df.corr()
+            values = returns_matrix.values
+            symbols = returns_matrix.symbols
+            threshold = self.config.get('correlation_threshold', 0.8)
+            max_pairs = self.config.get('correlation_max_pairs')
+            max_assets = self.config.get('correlation_matrix_max_assets', 2000)
             
-            # Calculate portfolio diversification metrics
-            avg_correlation = correlation_matrix.values[np.triu_indices_from(correlation_matrix.values, k=1)].mean()
-            max_correlation = correlation_matrix.values[np.triu_indices_from(correlation_matrix.values, k=1)].max()
-            min_correlation = correlation_matrix.values[np.triu_indices_from(correlation_matrix.values, k=1)].min()
+            # Weight-independent part, computed once per returns matrix and shared across portfolios
+            summary = returns_matrix.memo(
+                ('correlation', threshold, max_pairs, max_assets),
+                lambda: self._summarize_correlations(returns_matrix, threshold, max_pairs, max_assets)
+            )
             
-            # Diversification ratio
-            weights = np.array([asset['weight'] for asset in portfolio_data['assets'] if asset['symbol'] in symbols])
-            portfolio_volatility = self._calculate_portfolio_volatility(weights, correlation_matrix, returns_df)
-            weighted_avg_volatility = sum(weights[i] * returns_df.iloc[:, i].std() for i in range(len(weights)))
-            diversification_ratio = weighted_avg_volatility / portfolio_volatility if portfolio_volatility > 0 else 1
+            # Diversification ratio, from the live covariance when it covers the portfolio
+            live = self._live_covariance_for(symbols)
+            if live is not None:
+                diversification_ratio = live.diversification_ratio(live.weight_vector(portfolio_data['assets']))
+            else:
+                asset_weights = {asset['symbol']: asset['weight'] for asset in portfolio_data['assets']}
+                weights = np.array([asset_weights[symbol] for symbol in symbols])
+                portfolio_volatility = self._calculate_portfolio_volatility(weights, values)
+                weighted_avg_volatility = weights @ summary['volatilities']
+                diversification_ratio = weighted_avg_volatility / portfolio_volatility if portfolio_volatility > 0 else 1
             
+            # Copies, so callers can modify one result without touching the shared summary
+            correlation_matrix = summary['correlation_matrix']
             return {
-                'correlation_matrix': correlation_matrix.to_dict(),
-                'average_correlation': avg_correlation,
-                'max_correlation': max_correlation,
-                'min_correlation': min_correlation,
-                'diversification_ratio': diversification_ratio,
-                'diversification_level': self._categorize_diversification(avg_correlation),
-                'highly_correlated_pairs': self._find_highly_correlated_pairs(correlation_matrix)
+                'correlation_matrix': {column: dict(rows) for column, rows in correlation_matrix.items()}
+                                      if correlation_matrix is not None else None,
+                'average_correlation': summary['average_correlation'],
+                'max_correlation': summary['max_correlation'],
+                'min_correlation': summary['min_correlation'],
+                'diversification_ratio': float(diversification_ratio),
+                'diversification_level': self._categorize_diversification(summary['average_correlation']),
+                'volatility_source': 'live_covariance' if live is not None else 'sample',
+                'highly_correlated_pairs': [dict(pair) for pair in summary['highly_correlated_pairs']]
             }
             
         except Exception as e:
             logger.error(f"Error analyzing correlations: {str(e)}")
             return {'error': str(e)}
     
+    def _summarize_correlations(self, returns_matrix: ReturnsMatrix, threshold: float,
+                                max_pairs: Optional[int], max_assets: int) -> Dict:
+        """Correlation statistics, pairs and per-asset volatilities of a returns matrix"""
+        values = returns_matrix.values
+        symbols = returns_matrix.symbols
+        
+        # Full matrix for reporting, or a blocked scan for very large universes
+        correlation_matrix = None
+        if len(symbols) <= max_assets:
+            corr = self.correlation_engine.matrix(values)
+            upper = self.correlation_engine.upper_triangle(corr)
+            avg_correlation, max_correlation, min_correlation = upper.mean(), upper.max(), upper.min()
+            correlation_matrix = pd.DataFrame(corr, index=symbols, columns=symbols)
+            pairs = self._find_highly_correlated_pairs(correlation_matrix, threshold)
+        else:
+            scan = self.correlation_engine.scan(values, threshold, max_pairs)
+            avg_correlation, max_correlation, min_correlation = scan['average'], scan['max'], scan['min']
+            pairs = self._format_correlated_pairs(symbols, scan['pairs'])
+        
+        return {
+            'correlation_matrix': correlation_matrix.to_dict() if correlation_matrix is not None else None,
+            'average_correlation': float(avg_correlation),
+            'max_correlation': float(max_correlation),
+            'min_correlation': float(min_correlation),
+            'highly_correlated_pairs': pairs,
+            'volatilities': values.std(axis=0, ddof=1)
+        }
+    
     def _calculate_var(self, portfolio_data: Dict, price_data: Dict) -> Dict:
         """Calculate Value at Risk for portfolio"""
         return self.calculate_var(portfolio_data, price_data)
@@ -500,14 +1512,12 @@ class RiskAssessmentAgent:
         return recommendations if recommendations else ["Portfolio risk appears to be within acceptable levels"]
     
     def _calculate_returns(self, price_data: Dict) -> np.ndarray:
-        """Calculate returns from price data"""
-        prices = price_data.get('prices', [])
-        if len(prices) < 2:
-            return np.array([])
-        
-        prices_array = np.array([p['price'] for p in prices])
-        returns = np.diff(prices_array) / prices_array[:-1]
-        return returns
+        """Calculate returns from price data (memoized, read-only)"""
+        return self.returns_cache.returns(price_data.get('prices', []))
+    
+    def _get_returns_matrix(self, symbols: List[str], price_data: Dict) -> ReturnsMatrix:
+        """Aligned returns matrix for the symbols with return data, shared by all portfolio metrics"""
+        return self.returns_cache.matrix(symbols, price_data)
     
     def _calculate_volatility(self, price_data: Dict, window: int = 30) -> float:
         """Calculate volatility from price data"""
@@ -519,16 +1529,7 @@ class RiskAssessmentAgent:
     
     def _calculate_max_drawdown(self, price_data: Dict) -> float:
         """Calculate maximum drawdown"""
-        prices = price_data.get('prices', [])
-        if len(prices) < 2:
-            return 0.0
-        
-        prices_array = np.array([p['price'] for p in prices])
-        cumulative = np.cumprod(1 + np.diff(prices_array) / prices_array[:-1])
-        running_max = np.maximum.accumulate(cumulative)
-        drawdown = (cumulative - running_max) / running_max
-        
-        return abs(np.min(drawdown))
+        return self._calculate_portfolio_max_drawdown(self._calculate_returns(price_data))
     
     def _calculate_beta(self, price_data: Dict, market_data: Dict = None) -> float:
         """Calculate beta relative to market (simplified)"""
@@ -565,57 +1566,169 @@ class RiskAssessmentAgent:
     
     def _calculate_portfolio_returns(self, portfolio_data: Dict, price_data: Dict) -> np.ndarray:
         """Calculate portfolio returns"""
-        # Simplified portfolio return calculation
-        # In practice, would need aligned time series data
-        
-        portfolio_returns = []
-        min_length = float('inf')
-        
-        # Get returns for each asset
-        asset_returns = {}
-        for asset in portfolio_data['assets']:
-            symbol = asset['symbol']
-            returns = self._calculate_returns(price_data.get(symbol, {}))
-            if len(returns) > 0:
-                asset_returns[symbol] = returns
-                min_length = min(min_length, len(returns))
-        
-        if not asset_returns or min_length == 0:
+        # Get aligned returns for each asset
+        returns_matrix = self._get_returns_matrix([asset['symbol'] for asset in portfolio_data['assets']], price_data)
+        
+        if not returns_matrix.symbols or len(returns_matrix) == 0:
             return np.array([])
         
-        # Calculate weighted portfolio returns
-        for i in range(min_length):
-            portfolio_return = 0
-            for asset in portfolio_data['assets']:
-                symbol = asset['symbol']
-                if symbol in asset_returns:
-                    portfolio_return += asset['weight'] * asset_returns[symbol][-(min_length-i)]
-            portfolio_returns.append(portfolio_return)
+        # Weighted portfolio returns as one matrix-vector product
+        return returns_matrix.values @ self._weight_vector(portfolio_data['assets'], returns_matrix)
+    
+    def _weight_vector(self, assets: List[Dict], returns_matrix: ReturnsMatrix) -> np.ndarray:
+        """Portfolio weights in returns-matrix column order; repeated holdings of a symbol are summed"""
+        weights = np.zeros(len(returns_matrix.symbols))
+        for asset in assets:
+            column = returns_matrix.index.get(asset['symbol'])
+            if column is not None:
+                weights[column] += asset['weight']
+        return weights
+    
+    def _live_covariance_for(self, symbols: List[str]) -> Optional[CovarianceEstimator]:
+        """The live estimator if it covers every symbol and has enough observations"""
+        estimator = self.live_covariance
+        if estimator is None or estimator.count < 2:
+            return None
+        return estimator if all(symbol in estimator.index for symbol in symbols) else None
+    
+    def _monte_carlo_var(self, portfolio_data: Dict, price_data: Dict, confidence_levels: List[float],
+                         simulations: int, seed: Optional[int], workers: Optional[int],
+                         model: str, distribution: str) -> Dict:
+        """
+        Monte Carlo VaR/ES from simulated one-period asset returns.
+        
+        Asset returns are drawn from N(mu, cov) of the aligned returns matrix,
+        via a Cholesky factor of the covariance (model='cholesky') or a
+        principal-component factor model with idiosyncratic noise
+        (model='factor', mc_factors components), optionally with
+        multivariate Student-t tails (distribution='t', mc_t_df degrees of freedom).
+        Paths are generated in chunks of at most mc_chunk_bytes of draws, each
+        from its own child seed, so results depend only on the seed and not on
+        the number of pool workers. Confidence intervals for VaR are
+        distribution-free order-statistic bounds; ES intervals use the
+        standard error of the tail mean.
+        """
+        start = time.perf_counter()
+        returns_matrix = self._get_returns_matrix([asset['symbol'] for asset in portfolio_data['assets']], price_data)
+        weights = self._weight_vector(portfolio_data['assets'], returns_matrix)
+        mc_model = self._build_monte_carlo_model(returns_matrix.values, weights, model, distribution)
+        
+        n_assets = len(weights)
+        draws_per_path = mc_model['loadings'].shape[1] + (n_assets if mc_model['residual_sd'] is not None else 0)
+        chunk_size = max(1000, int(self.config.get('mc_chunk_bytes', 64 * 2 ** 20) // (8 * max(draws_per_path, n_assets))))
+        chunk_sizes = [min(chunk_size, simulations - start_path) for start_path in range(0, simulations, chunk_size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
         
-        return np.array(portfolio_returns)
+        workers = workers or self.config.get('mc_workers', 1)
+        workers = max(1, min(int(workers), len(chunk_sizes), os.cpu_count() or 1))
+        
+        if workers > 1:
+            mp_context = multiprocessing.get_context(self.config.get('mc_start_method'))
+            with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context,
+                                     initializer=_init_monte_carlo_worker, initargs=(mc_model,)) as executor:
+                chunks = list(executor.map(_simulate_portfolio_chunk, chunk_sizes, seeds))
+        else:
+            chunks = [_simulate_portfolio_chunk(n, chunk_seed, mc_model) for n, chunk_seed in zip(chunk_sizes, seeds)]
+        simulated = np.concatenate(chunks)
+        simulation_seconds = time.perf_counter() - start
+        
+        n = len(simulated)
+        z = stats.norm.ppf(0.975)
+        result = {'var': {}, 'es': {}, 'intervals': {}}
+        for confidence in confidence_levels:
+            alpha = 1 - confidence
+            var_value = float(np.percentile(simulated, alpha * 100))
+            tail = simulated[simulated <= var_value]
+            expected_shortfall = float(tail.mean()) if len(tail) else var_value
+            es_error = float(tail.std(ddof=1) / np.sqrt(len(tail))) if len(tail) > 1 else 0.0
+            
+            half_width = z * np.sqrt(n * alpha * (1 - alpha))
+            lower_rank = int(np.clip(np.floor(n * alpha - half_width), 0, n - 1))
+            upper_rank = int(np.clip(np.ceil(n * alpha + half_width), 0, n - 1))
+            # Partition for just the two order statistics instead of a full sort
+            bounds = np.partition(simulated, [lower_rank, upper_rank])[[lower_rank, upper_rank]]
+            
+            result['var'][confidence] = var_value
+            result['es'][confidence] = expected_shortfall
+            result['intervals'][confidence] = {
+                'level': 0.95,
+                'var_lower': float(bounds[0]),
+                'var_upper': float(bounds[1]),
+                'es_lower': expected_shortfall - z * es_error,
+                'es_upper': expected_shortfall + z * es_error
+            }
+        
+        result['simulation'] = {
+            'paths': n,
+            'model': mc_model['kind'],
+            'distribution': distribution,
+            'assets': n_assets,
+            'observations': len(returns_matrix),
+            'chunks': len(chunk_sizes),
+            'chunk_size': chunk_size,
+            'workers': workers,
+            'seed': seed,
+            'simulation_seconds': simulation_seconds,
+            'total_seconds': time.perf_counter() - start,
+            'paths_per_second': n / simulation_seconds if simulation_seconds > 0 else float('inf')
+        }
+        return result
+    
+    def _build_monte_carlo_model(self, returns: np.ndarray, weights: np.ndarray, model: str, distribution: str) -> Dict:
+        """Mean, loadings (and residual volatility for the factor model) fitted to a returns matrix"""
+        mu = returns.mean(axis=0)
+        residual_sd = None
+        
+        if model == 'factor':
+            # Principal components of the centered returns as factors
+            centered = returns - mu
+            _, singular_values, components = np.linalg.svd(centered, full_matrices=False)
+            k = max(1, min(self.config.get('mc_factors', 5), len(singular_values)))
+            factor_sd = singular_values[:k] / np.sqrt(max(len(returns) - 1, 1))
+            loadings = components[:k].T * factor_sd
+            total_var = centered.var(axis=0, ddof=1)
+            residual_sd = np.sqrt(np.clip(total_var - (loadings ** 2).sum(axis=1), 0, None))
+        elif model == 'cholesky':
+            covariance = np.atleast_2d(np.cov(returns, rowvar=False))
+            try:
+                loadings = np.linalg.cholesky(covariance)
+            except np.linalg.LinAlgError:
+                # Singular covariance (e.g. more assets than observations): use the PSD square root
+                eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+                loadings = eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+        else:
+            raise ValueError(f'Unknown Monte Carlo model {model}')
+        
+        df = None
+        if distribution == 't':
+            df = float(self.config.get('mc_t_df', 5))
+            if df <= 2:
+                raise ValueError('mc_t_df must be greater than 2')
+        elif distribution != 'normal':
+            raise ValueError(f'Unknown Monte Carlo distribution {distribution}')
+        
+        return {
+            'kind': model,
+            'portfolio_mean': float(mu @ weights),
+            'weights': weights,
+            'loadings': loadings,
+            'residual_sd': residual_sd,
+            'df': df
+        }
     
     def _calculate_portfolio_max_drawdown(self, returns: np.ndarray) -> float:
         """Calculate portfolio maximum drawdown"""
         if len(returns) == 0:
             return 0.0
         
-        cumulative = np.cumprod(1 + returns)
-        running_max = np.maximum.accumulate(cumulative)
-        drawdown = (cumulative - running_max) / running_max
-        
-        return abs(np.min(drawdown))
+        # Chunked, so temporaries stay bounded on long histories
+        return DrawdownAccumulator().update(returns).max_drawdown
     
-    def _calculate_portfolio_volatility(self, weights: np.ndarray, correlation_matrix: pd.DataFrame, returns_df: pd.DataFrame) -> float:
-        """Calculate portfolio volatility"""
+    def _calculate_portfolio_volatility(self, weights: np.ndarray, returns: np.ndarray) -> float:
+        """Calculate portfolio volatility (w' Cov w as the variance of the weighted return series)"""
         try:
-            # Calculate covariance matrix
-            cov_matrix = returns_df.cov()
-            
-            # Portfolio variance
-            portfolio_variance = np.dot(weights, np.dot(cov_matrix, weights))
-            
-            return np.sqrt(portfolio_variance)
-        except:
+            return float(np.std(returns @ weights, ddof=1))
+        except Exception:
             return 0.0
     
     def _categorize_diversification(self, avg_correlation: float) -> str:
@@ -633,19 +1746,16 @@ class RiskAssessmentAgent:
     
     def _find_highly_correlated_pairs(self, correlation_matrix: pd.DataFrame, threshold: float = 0.8) -> List[Dict]:
         """Find highly correlated asset pairs"""
-        pairs = []
-        
-        for i in range(len(correlation_matrix.columns)):
-            for j in range(i+1, len(correlation_matrix.columns)):
-                correlation = correlation_matrix.iloc[i, j]
-                if abs(correlation) >= threshold:
-                    pairs.append({
-                        'asset1': correlation_matrix.columns[i],
-                        'asset2': correlation_matrix.columns[j],
-                        'correlation': correlation
-                    })
-        
-        return sorted(pairs, key=lambda x: abs(x['correlation']), reverse=True)
+        pairs = self.correlation_engine.find_pairs(correlation_matrix.to_numpy(), threshold,
+                                                   self.config.get('correlation_max_pairs'))
+        return self._format_correlated_pairs(list(correlation_matrix.columns), pairs)
+    
+    def _format_correlated_pairs(self, symbols: List[str], pairs: Tuple[np.ndarray, np.ndarray, np.ndarray]) -> List[Dict]:
+        rows, cols, values = pairs
+        return [
+            {'asset1': symbols[i], 'asset2': symbols[j], 'correlation': float(correlation)}
+            for i, j, correlation in zip(rows.tolist(), cols.tolist(), values.tolist())
+        ]
     
     def _get_default_stress_scenarios(self) -> List[Dict]:
         """Get default stress test scenarios"""
@@ -676,39 +1786,3 @@ class RiskAssessmentAgent:
                 'shocks': {'all': -0.4}  # 40% drop across all assets
             }
         ]
-    
-    def _apply_stress_scenario(self, portfolio: Dict, shocks: Dict, price_data: Dict) -> Dict:
-        """Apply stress scenario to portfolio"""
-        new_value = 0
-        asset_impacts = {}
-        
-        for holding in portfolio.get('holdings', []):
-            symbol = holding['symbol']
-            quantity = holding['quantity']
-            current_price = price_data.get(symbol, {}).get('current_price', 0)
-            
-            # Determine shock to apply
-            shock = 0
-            if 'all' in shocks:
-                shock = shocks['all']
-            elif symbol in shocks:
-                shock = shocks[symbol]
-            elif 'others' in shocks:
-                shock = shocks['others']
-            
-            # Apply shock
-            new_price = current_price * (1 + shock)
-            new_asset_value = quantity * new_price
-            new_value += new_asset_value
-            
-            asset_impacts[symbol] = {
-                'original_price': current_price,
-                'new_price': new_price,
-                'shock_applied': shock,
-                'value_change': new_asset_value - (quantity * current_price)
-            }
-        
-        return {
-            'new_value': new_value,
-            'asset_impacts': asset_impacts
-        }
@@ -8,7 +8,10 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+import threading
 import logging
+import time
 import requests
 import re
 from textblob import TextBlob
@@ -28,7 +31,29 @@ class SentimentAnalysisAgent:
         self.config = config
         self.vader_analyzer = SentimentIntensityAnalyzer()
         
+        # Concurrent source fan-out for get_comprehensive_sentiment, with per-source deadlines (seconds)
+        self.source_timeouts = {
+            'twitter': 15.0,
+            'reddit': 15.0,
+            'news': 10.0,
+            'fear_greed_index': 5.0
+        }
+        self.source_timeouts.update(self.config.get('sentiment_source_timeouts', {}))
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(len(self.source_timeouts), self.config.get('sentiment_max_workers', 8)),
+            thread_name_prefix='sentiment'
+        )
+        self._overdue = {}  # source -> fan-out calls still running past their deadline
+        self._overdue_lock = threading.Lock()
+        
         # Initialize API clients
+        self._reddit_local = threading.local()  # PRAW is not thread safe: one client per subreddit worker
+        # Long-lived so each worker keeps its PRAW client (and its OAuth token) across calls
+        self._reddit_workers = self.config.get('reddit_max_workers', 5)
+        self._reddit_executor = ThreadPoolExecutor(
+            max_workers=max(1, self._reddit_workers),
+            thread_name_prefix='reddit'
+        )
         self._init_twitter_client()
         self._init_reddit_client()
         self._init_news_client()
@@ -61,7 +86,13 @@ class SentimentAnalysisAgent:
                     self.config['twitter_access_token'],
                     self.config['twitter_access_token_secret']
                 )
-                self.twitter_client = tweepy.API(auth, wait_on_rate_limit=True)
+                # A rate-limit wait can last 15 minutes, far past the source deadline, so it is
+                # opt-in; requests are also cut off at the deadline instead of tweepy's 60s
+                self.twitter_client = tweepy.API(
+                    auth,
+                    wait_on_rate_limit=self.config.get('twitter_wait_on_rate_limit', False),
+                    timeout=self.source_timeouts['twitter']
+                )
                 logger.info("Twitter client initialized successfully")
             else:
                 self.twitter_client = None
@@ -74,11 +105,7 @@ class SentimentAnalysisAgent:
         """Initialize Reddit API client"""
         try:
             if all(key in self.config for key in ['reddit_client_id', 'reddit_client_secret']):
-                self.reddit_client = praw.Reddit(
-                    client_id=self.config['reddit_client_id'],
-                    client_secret=self.config['reddit_client_secret'],
-                    user_agent='XplainCrypto Sentiment Analyzer 1.0'
-                )
+                self.reddit_client = self._create_reddit_client()
                 logger.info("Reddit client initialized successfully")
             else:
                 self.reddit_client = None
@@ -87,6 +114,20 @@ class SentimentAnalysisAgent:
             logger.error(f"Error initializing Reddit client: {str(e)}")
             self.reddit_client = None
     
+    def _create_reddit_client(self):
+        return praw.Reddit(
+            client_id=self.config['reddit_client_id'],
+            client_secret=self.config['reddit_client_secret'],
+            user_agent='XplainCrypto Sentiment Analyzer 1.0'
+        )
+    
+    def _thread_reddit_client(self):
+        """Reddit client owned by the current thread"""
+        client = getattr(self._reddit_local, 'client', None)
+        if client is None:
+            client = self._reddit_local.client = self._create_reddit_client()
+        return client
+    
     def _init_news_client(self):
         """Initialize News API client"""
         try:
@@ -182,34 +223,18 @@ class SentimentAnalysisAgent:
             all_posts = []
             sentiments = []
             
-            for subreddit_name in subreddits:
-                try:
-                    subreddit = self.reddit_client.subreddit(subreddit_name)
-                    
-                    # Search for posts mentioning the symbol
-                    for post in subreddit.search(symbol, limit=20):
-                        # Analyze post title and content
-                        text = f"{post.title} {post.selftext}"
-                        text = self._clean_text(text)
-                        
-                        if len(text) > 10:  # Skip very short posts
-                            sentiment_scores = self._analyze_text_sentiment(text)
-                            sentiments.append(sentiment_scores)
-                            
-                            all_posts.append({
-                                'id': post.id,
-                                'title': post.title,
-                                'text': post.selftext[:200],  # First 200 chars
-                                'subreddit': subreddit_name,
-                                'score': post.score,
-                                'upvote_ratio': post.upvote_ratio,
-                                'num_comments': post.num_comments,
-                                'created_at': datetime.fromtimestamp(post.created_utc),
-                                'sentiment': sentiment_scores
-                            })
-                except Exception as e:
-                    logger.warning(f"Error processing subreddit {subreddit_name}: {str(e)}")
-                    continue
+            # Subreddit searches are independent network round trips, so run them side by side
+            if min(len(subreddits), self._reddit_workers) > 1:
+                subreddit_posts = list(self._reddit_executor.map(
+                    lambda name: self._search_subreddit(name, symbol, self._thread_reddit_client()), subreddits
+                ))
+            else:
+                subreddit_posts = [self._search_subreddit(name, symbol, self.reddit_client) for name in subreddits]
+            
+            for posts in subreddit_posts:
+                for post in posts:
+                    sentiments.append(post['sentiment'])
+                    all_posts.append(post)
             
             # Calculate aggregate sentiment
             if sentiments:
@@ -244,6 +269,34 @@ class SentimentAnalysisAgent:
             logger.error(f"Error analyzing Reddit sentiment: {str(e)}")
             return {'error': str(e)}
     
+    def _search_subreddit(self, subreddit_name: str, symbol: str, client) -> List[Dict]:
+        """Analyzed posts mentioning the symbol in one subreddit (empty on failure)"""
+        posts = []
+        try:
+            subreddit = client.subreddit(subreddit_name)
+            
+            # Search for posts mentioning the symbol
+            for post in subreddit.search(symbol, limit=20):
+                # Analyze post title and content
+                text = f"{post.title} {post.selftext}"
+                text = self._clean_text(text)
+                
+                if len(text) > 10:  # Skip very short posts
+                    posts.append({
+                        'id': post.id,
+                        'title': post.title,
+                        'text': post.selftext[:200],  # First 200 chars
+                        'subreddit': subreddit_name,
+                        'score': post.score,
+                        'upvote_ratio': post.upvote_ratio,
+                        'num_comments': post.num_comments,
+                        'created_at': datetime.fromtimestamp(post.created_utc),
+                        'sentiment': self._analyze_text_sentiment(text)
+                    })
+        except Exception as e:
+            logger.warning(f"Error processing subreddit {subreddit_name}: {str(e)}")
+        return posts
+    
     def analyze_news_sentiment(self, symbol: str, days: int = 7) -> Dict:
         """Analyze news sentiment for a cryptocurrency"""
         try:
@@ -546,37 +599,52 @@ class SentimentAnalysisAgent:
         
         return daily_averages
     
-    def get_comprehensive_sentiment(self, symbol: str) -> Dict:
-        """Get comprehensive sentiment analysis from all sources"""
+    def get_comprehensive_sentiment(self, symbol: str, concurrent: Optional[bool] = None) -> Dict:
+        """
+        Get comprehensive sentiment analysis from all sources
+        
+        With concurrent=True (default: sentiment_concurrent config, on) the
+        sources are queried in parallel and each gets its own deadline
+        (source_timeouts), counted from when its call starts. Sources that
+        miss it are left out and marked as timed out; a source whose previous
+        call is still running is skipped rather than queried again. Either
+        way the result is partial. source_status reports the status and
+        latency of every source in both modes.
+        """
         try:
             results = {
                 'symbol': symbol,
                 'timestamp': datetime.now().isoformat(),
                 'sources': {},
+                'source_status': {},
+                'partial': False,
                 'overall_sentiment': {},
                 'sentiment_score': 0.0,
                 'confidence': 0.0
             }
             
-            # Analyze Twitter sentiment
-            twitter_result = self.analyze_twitter_sentiment(symbol)
-            if 'error' not in twitter_result:
-                results['sources']['twitter'] = twitter_result
-            
-            # Analyze Reddit sentiment
-            reddit_result = self.analyze_reddit_sentiment(symbol)
-            if 'error' not in reddit_result:
-                results['sources']['reddit'] = reddit_result
+            fetchers = {
+                'twitter': lambda: self.analyze_twitter_sentiment(symbol),
+                'reddit': lambda: self.analyze_reddit_sentiment(symbol),
+                'news': lambda: self.analyze_news_sentiment(symbol),
+                'fear_greed_index': self.get_fear_greed_index
+            }
             
-            # Analyze news sentiment
-            news_result = self.analyze_news_sentiment(symbol)
-            if 'error' not in news_result:
-                results['sources']['news'] = news_result
+            if concurrent is None:
+                concurrent = self.config.get('sentiment_concurrent', True)
+            if concurrent:
+                source_results = self._fan_out(fetchers)
+            else:
+                source_results = {name: self._timed_source_call(fetch) for name, fetch in fetchers.items()}
             
-            # Get Fear & Greed Index
-            fg_index = self.get_fear_greed_index()
-            if 'error' not in fg_index:
-                results['sources']['fear_greed_index'] = fg_index
+            # Keep the fixed source order so the overall sentiment does not depend on completion order
+            for name in fetchers:
+                source_result, status = source_results[name]
+                results['source_status'][name] = status
+                if status['status'] == 'ok':
+                    results['sources'][name] = source_result
+                elif status['status'] in ('timeout', 'skipped'):
+                    results['partial'] = True
             
             # Calculate overall sentiment
             if results['sources']:
@@ -590,6 +658,73 @@ class SentimentAnalysisAgent:
             logger.error(f"Error getting comprehensive sentiment: {str(e)}")
             return {'error': str(e)}
     
+    def _timed_source_call(self, fetch) -> Tuple[Dict, Dict]:
+        """Run one source and describe its outcome and latency"""
+        start = time.perf_counter()
+        result = fetch()
+        status = {'status': 'error' if 'error' in result else 'ok',
+                  'latency_seconds': round(time.perf_counter() - start, 3)}
+        if 'error' in result:
+            status['error'] = result['error']
+        return result, status
+    
+    def _fan_out(self, fetchers: Dict) -> Dict[str, Tuple[Optional[Dict], Dict]]:
+        """
+        Run every source on the shared pool, waiting for each until its own deadline
+        after the call starts. A source with an earlier call still running past its
+        deadline is skipped, so a hung source holds at most one pool thread while
+        healthy concurrent callers never hold each other back.
+        """
+        default_timeout = max(self.source_timeouts.values())
+        started = {name: threading.Event() for name in fetchers}
+        start_times = {}
+        
+        def run(name, fetch):
+            start_times[name] = time.perf_counter()
+            started[name].set()
+            return self._timed_source_call(fetch)
+        
+        def release(name):
+            with self._overdue_lock:
+                self._overdue[name] -= 1
+                if not self._overdue[name]:
+                    del self._overdue[name]
+        
+        collected, futures = {}, {}
+        for name, fetch in fetchers.items():
+            with self._overdue_lock:
+                busy = name in self._overdue
+            if busy:
+                logger.warning(f"Sentiment source {name} skipped: an earlier call is still running past its deadline")
+                collected[name] = (None, {'status': 'skipped', 'error': 'earlier call still running past its deadline',
+                                          'latency_seconds': 0.0})
+            else:
+                futures[name] = self._executor.submit(run, name, fetch)
+        
+        submitted = time.perf_counter()
+        for name in sorted(futures, key=lambda source: self.source_timeouts.get(source, default_timeout)):
+            timeout = self.source_timeouts.get(name, default_timeout)
+            # Each source has its own thread, so this only waits if the pool is shared with other callers
+            started[name].wait(max(0.0, submitted + timeout - time.perf_counter()))
+            start = start_times.get(name, submitted)
+            try:
+                collected[name] = futures[name].result(timeout=max(0.0, start + timeout - time.perf_counter()))
+            except FuturesTimeoutError:
+                # The call keeps running in the background; its result is discarded and
+                # the source is skipped by later fan-outs until it finishes
+                if not futures[name].cancel():
+                    with self._overdue_lock:
+                        self._overdue[name] = self._overdue.get(name, 0) + 1
+                    futures[name].add_done_callback(lambda _future, name=name: release(name))
+                logger.warning(f"Sentiment source {name} missed its deadline")
+                collected[name] = (None, {'status': 'timeout',
+                                          'latency_seconds': round(time.perf_counter() - start, 3)})
+            except Exception as e:
+                collected[name] = (None, {'status': 'error', 'error': str(e),
+                                          'latency_seconds': round(time.perf_counter() - start, 3)})
+        
+        return collected
+    
     def _calculate_overall_sentiment(self, sources: Dict) -> Dict:
         """Calculate overall sentiment from multiple sources"""
         sentiments = []
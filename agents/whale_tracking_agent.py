@@ -6,15 +6,716 @@ Monitors large transactions and whale wallet activities
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Iterator, AsyncIterator, Callable, Iterable, Union
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import logging
 import requests
 from web3 import Web3
+from web3.datastructures import AttributeDict
+from hexbytes import HexBytes
+from requests.adapters import HTTPAdapter
 import time
+import os
+import re
+import json
+import gzip
+import codecs
+import itertools
+import queue
+import sqlite3
+import asyncio
+import threading
 
 logger = logging.getLogger(__name__)
 
+
+class TokenBucket:
+    """
+    Async token-bucket rate limiter shared by concurrent RPC workers.
+    Allows bursts of up to `capacity` requests, refilling at `rate` per second;
+    one bucket may be shared by scans running on different event loops.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    async def acquire(self, tokens: float = 1.0):
+        """Wait until `tokens` are available and consume them"""
+        if self.rate <= 0:
+            return
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+
+            await asyncio.sleep(wait)
+
+
+class JsonRpcError(Exception):
+    """Error object returned by a JSON-RPC node for a single call"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"JSON-RPC error {code}: {message}")
+        self.code = code
+        self.message = message
+
+
+class _BatchRejected(Exception):
+    """Raised when a provider refuses JSON-RPC batch requests"""
+
+
+class JsonRpcBatchClient:
+    """
+    Minimal JSON-RPC client that packs block, balance and receipt reads into
+    batch requests over a pooled keep-alive session. Providers that reject
+    batches are detected on first use and served with single requests instead.
+    """
+
+    BLOCK_QUANTITIES = ('number', 'timestamp', 'gasLimit', 'gasUsed', 'size', 'baseFeePerGas',
+                        'difficulty', 'totalDifficulty')
+    TX_QUANTITIES = ('blockNumber', 'transactionIndex', 'value', 'gas', 'gasPrice', 'nonce', 'type',
+                     'chainId', 'v', 'maxFeePerGas', 'maxPriorityFeePerGas')
+    RECEIPT_QUANTITIES = ('blockNumber', 'transactionIndex', 'cumulativeGasUsed', 'gasUsed',
+                          'effectiveGasPrice', 'status', 'type')
+    REJECTED_STATUS = (400, 405, 413, 501)
+
+    def __init__(self, url: str, batch_size: int = 20, pool_size: int = 16, timeout: float = 30.0):
+        self.url = url
+        self.batch_size = max(1, batch_size)
+        self.timeout = timeout
+        self.batch_supported = self.batch_size > 1
+        self.request_count = 0
+        self._ids = itertools.count(1)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def call(self, method: str, params: list):
+        """Send a single JSON-RPC request and return its result"""
+        payload = {'jsonrpc': '2.0', 'id': next(self._ids), 'method': method, 'params': params}
+        response = self._post(payload)
+        response.raise_for_status()
+        return self._unwrap(response.json())
+
+    def batch(self, calls: List[Tuple[str, list]], single_fallback: bool = True) -> List:
+        """
+        Run (method, params) calls in batches of batch_size. Returns one entry per
+        call, in order: the result, or the exception raised for that call.
+        Once the provider rejects batches the remaining calls are sent one by one;
+        with single_fallback=False they are returned as _BatchRejected errors
+        instead, so a rate-limited caller can re-issue them itself.
+        """
+        results = []
+        for start in range(0, len(calls), self.batch_size):
+            chunk = calls[start:start + self.batch_size]
+            if self.batch_supported and len(chunk) > 1:
+                try:
+                    results.extend(self._send_batch(chunk))
+                    continue
+                except _BatchRejected as e:
+                    logger.info(f"Provider rejected JSON-RPC batches ({str(e)}), using single requests")
+                    self.batch_supported = False
+            if not single_fallback:
+                results.extend(_BatchRejected('batch requests not supported') for _ in calls[start:])
+                break
+            results.extend(self._send_single(method, params) for method, params in chunk)
+        return results
+
+    def get_blocks(self, block_numbers: List[int], full_transactions: bool = True,
+                   single_fallback: bool = True) -> List:
+        """Blocks in the same shape web3.eth.get_block returns"""
+        results = self.batch([('eth_getBlockByNumber', [hex(n), full_transactions]) for n in block_numbers],
+                             single_fallback)
+        return [self._format_block(r) if isinstance(r, dict) else r for r in results]
+
+    def get_balances(self, addresses: List[str], block: str = 'latest') -> List:
+        """Balances in wei"""
+        results = self.batch([('eth_getBalance', [address, block]) for address in addresses])
+        return [int(r, 16) if isinstance(r, str) else r for r in results]
+
+    def get_receipts(self, tx_hashes: List[str]) -> List:
+        """Transaction receipts with quantities decoded"""
+        results = self.batch([('eth_getTransactionReceipt', [h]) for h in tx_hashes])
+        return [
+            AttributeDict.recursive(self._decode(r, self.RECEIPT_QUANTITIES)) if isinstance(r, dict) else r
+            for r in results
+        ]
+
+    def _post(self, payload) -> requests.Response:
+        self.request_count += 1
+        return self.session.post(self.url, json=payload, timeout=self.timeout)
+
+    def _send_batch(self, chunk: List[Tuple[str, list]]) -> List:
+        ids = [next(self._ids) for _ in chunk]
+        payload = [
+            {'jsonrpc': '2.0', 'id': call_id, 'method': method, 'params': params}
+            for call_id, (method, params) in zip(ids, chunk)
+        ]
+        response = self._post(payload)
+        if response.status_code in self.REJECTED_STATUS:
+            raise _BatchRejected(f"HTTP {response.status_code}")
+        response.raise_for_status()
+
+        body = response.json()
+        if not isinstance(body, list):
+            raise _BatchRejected(body.get('error', {}).get('message', 'non-list response'))
+
+        by_id = {item.get('id'): item for item in body}
+        results = []
+        for call_id in ids:
+            try:
+                results.append(self._unwrap(by_id[call_id]))
+            except KeyError:
+                results.append(JsonRpcError(-32603, 'missing from batch response'))
+            except JsonRpcError as e:
+                results.append(e)
+        return results
+
+    def _send_single(self, method: str, params: list):
+        try:
+            return self.call(method, params)
+        except Exception as e:
+            return e
+
+    @staticmethod
+    def _unwrap(item: Dict):
+        if 'error' in item:
+            raise JsonRpcError(item['error'].get('code', -32603), item['error'].get('message', ''))
+        return item.get('result')
+
+    @staticmethod
+    def _decode(raw: Dict, quantities: Tuple[str, ...]) -> Dict:
+        decoded = dict(raw)
+        for field in quantities:
+            if isinstance(decoded.get(field), str):
+                decoded[field] = int(decoded[field], 16)
+        for field in ('hash', 'transactionHash', 'blockHash'):
+            if decoded.get(field):
+                decoded[field] = HexBytes(decoded[field])
+        for field in ('from', 'to'):
+            if decoded.get(field):
+                decoded[field] = Web3.to_checksum_address(decoded[field])
+        return decoded
+
+    def _format_block(self, raw: Dict) -> AttributeDict:
+        block = self._decode(raw, self.BLOCK_QUANTITIES)
+        block['transactions'] = [
+            AttributeDict(self._decode(tx, self.TX_QUANTITIES)) if isinstance(tx, dict) else HexBytes(tx)
+            for tx in raw.get('transactions', [])
+        ]
+        return AttributeDict(block)
+
+
+_TX_ARRAY = re.compile(r'"tx"\s*:\s*\[')
+
+
+def iter_bitcoin_transactions(chunks: Iterable[bytes]) -> Iterator[Tuple[str, int, int, int, int]]:
+    """
+    Stream (hash, total_output_satoshis, inputs, outputs, time) out of a
+    blockchain.info rawblock JSON body, decoding one transaction at a time
+    so the full block is never held in memory
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buffer, pos, in_array = '', 0, False
+
+    for chunk in chunks:
+        buffer = buffer[pos:] + utf8.decode(chunk)
+        pos = 0
+
+        if not in_array:
+            match = _TX_ARRAY.search(buffer)
+            if match is None:
+                continue
+            pos, in_array = match.end(), True
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == ']':
+                return
+
+            try:
+                tx, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # Transaction continues in the next chunk
+
+            yield tx['hash'], sum(out['value'] for out in tx['out']), len(tx['inputs']), len(tx['out']), tx['time']
+            pos = end
+
+
+class BitcoinBlockCache:
+    """
+    Content-addressed on-disk cache of parsed Bitcoin blocks. Blocks are
+    immutable, so entries keyed by block hash never need invalidation.
+    """
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        os.makedirs(root_dir, exist_ok=True)
+
+    def _path(self, block_hash: str) -> str:
+        return os.path.join(self.root_dir, block_hash[-2:], f'{block_hash}.json')
+
+    def get(self, block_hash: str) -> Optional[List[Tuple]]:
+        try:
+            with open(self._path(block_hash)) as f:
+                return [tuple(tx) for tx in json.load(f)]
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put(self, block_hash: str, transactions: List[Tuple]):
+        path = self._path(block_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(transactions, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+
+class AddressLabelIndex:
+    """
+    Exact-match index of labelled addresses (entity and category, e.g.
+    Binance / exchange). Hex addresses are normalized to lowercase and kept in
+    a dict for O(1) lookups. Labels load from a tab-separated file
+    (address, category, entity; optionally gzipped) and are hot-reloaded on a
+    background thread when the file changes; lookups keep using the previous
+    table until the new one is swapped in. default_labels apply only until a
+    label file has been loaded.
+    """
+
+    def __init__(self, path: Optional[str] = None, default_labels: Optional[Dict[str, Tuple[str, str]]] = None,
+                 check_interval: float = 30.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._labels = {self.normalize(a): label for a, label in (default_labels or {}).items()}
+        self._mtime = None
+        self._last_check = 0.0
+        self._reloading = threading.Lock()
+        if path:
+            self._reload_quietly()
+
+    @staticmethod
+    def normalize(address: Optional[str]) -> str:
+        address = (address or '').strip()
+        return address.lower() if address[:2].lower() == '0x' else address
+
+    def lookup(self, address: Optional[str]) -> Optional[Tuple[str, str]]:
+        """(category, entity) for an address, or None when unlabelled"""
+        self._maybe_reload()
+        return self._labels.get(self.normalize(address))
+
+    def category(self, address: Optional[str]) -> Optional[str]:
+        label = self.lookup(address)
+        return label[0] if label else None
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def reload(self):
+        """Rebuild the table from the label file and swap it in"""
+        with self._reloading:
+            mtime = os.path.getmtime(self.path)
+            opener = gzip.open if self.path.endswith('.gz') else open
+            labels, names = {}, {}
+            with opener(self.path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip() or line.startswith('#'):
+                        continue
+                    address, category, entity = (line.rstrip('\n').split('\t') + ['', ''])[:3]
+                    # Intern repeated label strings so large files stay compact in memory
+                    label = (category, entity)
+                    labels[self.normalize(address)] = names.setdefault(label, label)
+            self._labels = labels
+            self._mtime = mtime
+        logger.info(f"Loaded {len(labels)} address labels from {self.path}")
+
+    def _maybe_reload(self):
+        if not self.path:
+            return
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+
+        try:
+            changed = os.path.getmtime(self.path) != self._mtime
+        except OSError:
+            return
+        if changed and not self._reloading.locked():
+            threading.Thread(target=self._reload_quietly, name='address-labels-reload', daemon=True).start()
+
+    def _reload_quietly(self):
+        try:
+            self.reload()
+        except Exception as e:
+            logger.warning(f"Error reloading address labels from {self.path}: {str(e)}")
+
+
+class PriceCache:
+    """
+    Thread-safe TTL cache of USD quotes keyed by CoinGecko id.
+    Concurrent misses for the same id wait on a single in-flight fetch; quotes
+    past `ttl` but within `stale_ttl` are served immediately while a background
+    refresh runs (stale-while-revalidate). Quotes older than `stale_ttl` are
+    never served: if refetching them fails the caller's fallback is used. Ids
+    whose fetch failed are not retried for `error_backoff` seconds so a
+    rate-limited API is not hammered.
+    """
+
+    def __init__(self, fetcher: Callable[[List[str]], Dict[str, float]], ttl: float = 60.0,
+                 stale_ttl: float = 600.0, fetch_timeout: float = 10.0, error_backoff: float = 30.0):
+        self.fetcher = fetcher
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.fetch_timeout = fetch_timeout
+        self.error_backoff = error_backoff
+        self._quotes = {}    # id -> (price, fetched_at)
+        self._failed = {}    # id -> time of the last failed fetch
+        self._inflight = {}  # id -> Event set when its fetch finishes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self.errors = 0
+
+    def get(self, coin_id: str, fallback: Optional[float] = None) -> Optional[float]:
+        """Get a single quote, falling back when none is cached within stale_ttl"""
+        return self.get_many([coin_id], {coin_id: fallback})[coin_id]
+
+    def get_many(self, coin_ids: Iterable[str], fallbacks: Optional[Dict[str, float]] = None) -> Dict[str, Optional[float]]:
+        """Get quotes for several ids, fetching every missing one in a single request"""
+        coin_ids = list(dict.fromkeys(coin_ids))
+        fallbacks = fallbacks or {}
+        now = time.monotonic()
+        missing, stale = [], []
+
+        with self._lock:
+            for coin_id in coin_ids:
+                entry = self._quotes.get(coin_id)
+                age = now - entry[1] if entry else None
+                if age is not None and age <= self.ttl:
+                    self.hits += 1
+                elif age is not None and age <= self.stale_ttl:
+                    self.stale_hits += 1
+                    stale.append(coin_id)
+                else:
+                    self.misses += 1
+                    missing.append(coin_id)
+
+        if stale:
+            self.refresh(stale, background=True)
+        if missing:
+            self.refresh(missing)
+
+        now = time.monotonic()
+        quotes = {}
+        with self._lock:
+            for coin_id in coin_ids:
+                entry = self._quotes.get(coin_id)
+                if entry is not None and now - entry[1] <= self.stale_ttl:
+                    quotes[coin_id] = entry[0]
+                else:
+                    if entry is not None:
+                        logger.warning(f"Price quote for {coin_id} is {now - entry[1]:.0f}s old "
+                                       f"(stale_ttl {self.stale_ttl:.0f}s), using fallback")
+                    quotes[coin_id] = fallbacks.get(coin_id)
+        return quotes
+
+    def refresh(self, coin_ids: Iterable[str], background: bool = False):
+        """
+        Fetch the given ids, joining any fetch already in flight for them.
+        With background=True only the ids nobody is fetching are requested, on a daemon thread.
+        """
+        now = time.monotonic()
+        with self._lock:
+            waiting = [self._inflight[c] for c in coin_ids if c in self._inflight]
+            owned = [
+                c for c in coin_ids
+                if c not in self._inflight and now - self._failed.get(c, -self.error_backoff) >= self.error_backoff
+            ]
+            done = threading.Event()
+            for coin_id in owned:
+                self._inflight[coin_id] = done
+
+        if owned:
+            if background:
+                threading.Thread(target=self._fetch, args=(owned, done), daemon=True).start()
+            else:
+                self._fetch(owned, done)
+
+        if not background:
+            for event in waiting:
+                event.wait(self.fetch_timeout)
+
+    def _fetch(self, coin_ids: List[str], done: threading.Event):
+        try:
+            with self._lock:
+                self.fetches += 1
+            quotes = self.fetcher(coin_ids)
+            fetched_at = time.monotonic()
+            with self._lock:
+                for coin_id, price in quotes.items():
+                    self._quotes[coin_id] = (float(price), fetched_at)
+                    self._failed.pop(coin_id, None)
+        except Exception as e:
+            failed_at = time.monotonic()
+            with self._lock:
+                self.errors += 1
+                for coin_id in coin_ids:
+                    self._failed[coin_id] = failed_at
+            logger.warning(f"Error fetching prices for {', '.join(coin_ids)}: {str(e)}")
+        finally:
+            with self._lock:
+                for coin_id in coin_ids:
+                    self._inflight.pop(coin_id, None)
+            done.set()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'fetches': self.fetches,
+                'errors': self.errors,
+                'hit_rate': (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+                'cached_assets': len(self._quotes)
+            }
+
+
+class TransferIndex:
+    """
+    SQLite index of large transfers plus a per-chain cursor recording the
+    contiguous block range already scanned, so repeat scans only fetch new blocks.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS transfers (
+                chain TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                from_address TEXT,
+                to_address TEXT,
+                value REAL NOT NULL,
+                gas_price INTEGER,
+                block_number INTEGER NOT NULL,
+                timestamp INTEGER NOT NULL,
+                type TEXT,
+                PRIMARY KEY (chain, hash)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS transfers_block ON transfers (chain, block_number);
+            CREATE INDEX IF NOT EXISTS transfers_time ON transfers (chain, timestamp);
+            CREATE TABLE IF NOT EXISTS cursors (
+                chain TEXT PRIMARY KEY,
+                first_block INTEGER NOT NULL,
+                last_block INTEGER NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+        ''')
+
+    def get_coverage(self, chain: str) -> Optional[Tuple[int, int]]:
+        """(first_block, last_block) already processed for a chain, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT first_block, last_block FROM cursors WHERE chain = ?', (chain,)
+            ).fetchone()
+        return tuple(row) if row and row[1] >= row[0] else None
+
+    def record(self, chain: str, rows: List[Tuple], first_block: int, last_block: int):
+        """
+        Store transfer rows (hash, from, to, value, gas_price, block_number, timestamp, type)
+        and move the cursor in one transaction
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO transfers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [(chain, *row) for row in rows]
+            )
+            self._conn.execute(
+                'INSERT OR REPLACE INTO cursors VALUES (?, ?, ?, ?)',
+                (chain, first_block, last_block, datetime.now().isoformat())
+            )
+
+    def query(self, chain: str, start_block: Optional[int] = None, end_block: Optional[int] = None,
+              since: Optional[int] = None, until: Optional[int] = None, min_value: float = 0) -> List[Dict]:
+        """Transfers above min_value in [start_block, end_block) and [since, until] (unix seconds)"""
+        clauses, params = ['chain = ?', 'value > ?'], [chain, min_value]
+        for clause, value in (('block_number >= ?', start_block), ('block_number < ?', end_block),
+                              ('timestamp >= ?', since), ('timestamp <= ?', until)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+
+        with self._lock:
+            cursor = self._conn.execute(
+                'SELECT hash, from_address, to_address, value, gas_price, block_number, timestamp, type '
+                f'FROM transfers WHERE {" AND ".join(clauses)}', params
+            )
+            rows = cursor.fetchall()
+
+        columns = ('hash', 'from', 'to', 'value', 'gas_price', 'block_number', 'timestamp', 'type')
+        return [dict(zip(columns, row)) for row in rows]
+
+    def prune(self, chain: str, before_block: int):
+        """Drop transfers older than before_block and trim the cursor to match"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM transfers WHERE chain = ? AND block_number < ?', (chain, before_block))
+            self._conn.execute(
+                'UPDATE cursors SET first_block = ? WHERE chain = ? AND first_block < ?',
+                (before_block, chain, before_block)
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class TransactionColumns:
+    """
+    Columnar NumPy view of a batch of transaction records for vectorized
+    summaries. Transaction types are dictionary-encoded in first-appearance
+    order and hours/timespans come from timestamps parsed once per batch.
+    """
+
+    def __init__(self, value_usd: np.ndarray, type_codes: np.ndarray, type_labels: List[str],
+                 hours: np.ndarray, timespan_seconds: Optional[float]):
+        self.value_usd = value_usd
+        self.type_codes = type_codes
+        self.type_labels = type_labels
+        self.hours = hours
+        self.timespan_seconds = timespan_seconds
+
+    def __len__(self) -> int:
+        return len(self.value_usd)
+
+    @classmethod
+    def from_records(cls, transactions: List[Dict]) -> 'TransactionColumns':
+        value_usd = np.fromiter((tx.get('value_usd', 0) for tx in transactions), dtype=float, count=len(transactions))
+        type_codes, type_labels = pd.factorize(
+            pd.Series([tx.get('type', 'unknown') for tx in transactions], dtype=object), use_na_sentinel=False
+        )
+        hours, timespan = cls.parse_timestamps([tx.get('timestamp') for tx in transactions if tx.get('timestamp')])
+        return cls(value_usd, type_codes, list(type_labels), hours, timespan)
+
+    @staticmethod
+    def parse_timestamps(timestamps: List[str]) -> Tuple[np.ndarray, Optional[float]]:
+        """
+        Hours of day (in each timestamp's own offset, in input order) and the total
+        timespan in seconds for ISO timestamps; unparseable entries are skipped
+        """
+        if not len(timestamps):
+            return np.empty(0, dtype=np.int64), None
+
+        try:
+            parsed = pd.to_datetime(pd.Series(timestamps, dtype=object), format='ISO8601', errors='coerce').dropna()
+            hours = parsed.dt.hour.to_numpy(dtype=np.int64)
+            timespan = (parsed.max() - parsed.min()).total_seconds() if len(parsed) else None
+            return hours, timespan
+        except (ValueError, TypeError):
+            pass
+
+        # Mixed UTC offsets cannot share one datetime64 column; parse them one by one
+        datetimes = []
+        for ts in timestamps:
+            try:
+                datetimes.append(datetime.fromisoformat(ts.replace('Z', '+00:00')))
+            except (ValueError, TypeError, AttributeError):
+                continue
+        try:
+            timespan = (max(datetimes) - min(datetimes)).total_seconds() if datetimes else None
+        except TypeError:
+            # Naive and aware timestamps are not comparable
+            return np.empty(0, dtype=np.int64), None
+        hours = np.fromiter((dt.hour for dt in datetimes), dtype=np.int64, count=len(datetimes))
+        return hours, timespan
+
+    def type_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.type_codes, minlength=len(self.type_labels))
+        return {label: int(count) for label, count in zip(self.type_labels, counts)}
+
+    def time_distribution(self) -> Dict:
+        """Peak hour, hourly histogram and timespan, keyed like _analyze_time_distribution"""
+        if not len(self.hours):
+            return {}
+
+        counts = np.bincount(self.hours, minlength=24)
+        # Hours in order of first appearance, so ties resolve to the earliest-seen hour
+        seen, first_index = np.unique(self.hours, return_index=True)
+        order = seen[np.argsort(first_index)]
+        peak_hour = order[np.argmax(counts[order])]
+
+        return {
+            'peak_activity_hour': int(peak_hour),
+            'hourly_distribution': {int(hour): int(counts[hour]) for hour in order},
+            'total_timespan_hours': self.timespan_seconds / 3600
+        }
+
+
+class WhaleActivitySummary:
+    """
+    Incremental summary of whale wallet activities, updated one analysis at a
+    time so it can be read while monitoring is still in progress
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.active_whales = 0
+        self.total_balance_usd = 0
+        self.most_active_whale = None
+        self.largest_whale = None
+        self.failures = []
+
+    def add(self, activity: Dict):
+        self.count += 1
+        self.total_balance_usd += activity.get('balance_usd', 0)
+        if activity.get('activity_score', 0) > 0.5:
+            self.active_whales += 1
+        if self.most_active_whale is None or \
+                activity.get('activity_score', 0) > self.most_active_whale.get('activity_score', 0):
+            self.most_active_whale = activity
+        if self.largest_whale is None or activity.get('balance_usd', 0) > self.largest_whale.get('balance_usd', 0):
+            self.largest_whale = activity
+
+    def add_failure(self, address: str, error: str):
+        self.failures.append({'address': address, 'error': error})
+
+    def result(self) -> Dict:
+        if not self.count:
+            return {}
+
+        return {
+            'total_whales_monitored': self.count,
+            'active_whales': self.active_whales,
+            'total_balance_usd': self.total_balance_usd,
+            'average_balance_usd': self.total_balance_usd / self.count,
+            'most_active_whale': self.most_active_whale,
+            'largest_whale': self.largest_whale
+        }
+
+
 class WhaleTrackingAgent:
     """
     Advanced whale tracking and large transaction monitoring
@@ -33,10 +734,52 @@ class WhaleTrackingAgent:
             'DOT': 100000,   # 100K+ DOT
         }
         
+        # CoinGecko ids for USD quotes
+        self.coingecko_ids = {
+            'BTC': 'bitcoin',
+            'ETH': 'ethereum',
+            'USDT': 'tether',
+            'USDC': 'usd-coin',
+            'BNB': 'binancecoin',
+            'ADA': 'cardano',
+            'SOL': 'solana',
+            'DOT': 'polkadot',
+        }
+        self.fallback_prices = {'bitcoin': 50000.0, 'ethereum': 2000.0}
+        self.price_cache = PriceCache(
+            self._fetch_usd_prices,
+            ttl=self.config.get('price_cache_ttl', 60),
+            stale_ttl=self.config.get('price_cache_stale_ttl', 600)
+        )
+        
         # Initialize Web3 connections
         self.web3_connections = {}
+        self.rpc_clients = {}
+        self.rate_limiters = {}
+        self._rate_limiter_lock = threading.Lock()
         self._init_blockchain_connections()
         
+        # Bitcoin block source and content-addressed cache of parsed blocks
+        self.bitcoin_api_url = self.config.get('bitcoin_api_url', 'https://blockchain.info').rstrip('/')
+        self.bitcoin_block_cache = None
+        if self.config.get('bitcoin_block_cache_dir'):
+            self.bitcoin_block_cache = BitcoinBlockCache(self.config['bitcoin_block_cache_dir'])
+        
+        # Persistent per-chain block cursor and index of large transfers
+        self.transfer_index = None
+        if self.config.get('whale_index_path'):
+            self.transfer_index = TransferIndex(self.config['whale_index_path'])
+        
+        # Labelled addresses (exchanges, bridges, ...) used to classify movements
+        self.address_labels = AddressLabelIndex(
+            self.config.get('address_labels_path'),
+            default_labels={
+                '0x742d35cc6634c0532925a3b8d4c9db96c4b4d8b6': ('exchange', 'Example exchange'),
+                '0x8894e0a0c962cb723c1976a4421c95949be2d4e3': ('exchange', 'Example exchange'),
+            },
+            check_interval=self.config.get('address_labels_check_interval', 30)
+        )
+        
         # Known whale addresses (examples - replace with real data)
         self.known_whales = {
             'ethereum': [
@@ -54,22 +797,33 @@ class WhaleTrackingAgent:
         try:
             # Ethereum mainnet
             if 'ethereum_rpc_url' in self.config:
-                self.web3_connections['ethereum'] = Web3(Web3.HTTPProvider(self.config['ethereum_rpc_url']))
+                self.web3_connections['ethereum'] = self._connect('ethereum', self.config['ethereum_rpc_url'])
                 logger.info("Ethereum Web3 connection initialized")
             
             # BSC
             if 'bsc_rpc_url' in self.config:
-                self.web3_connections['bsc'] = Web3(Web3.HTTPProvider(self.config['bsc_rpc_url']))
+                self.web3_connections['bsc'] = self._connect('bsc', self.config['bsc_rpc_url'])
                 logger.info("BSC Web3 connection initialized")
             
             # Polygon
             if 'polygon_rpc_url' in self.config:
-                self.web3_connections['polygon'] = Web3(Web3.HTTPProvider(self.config['polygon_rpc_url']))
+                self.web3_connections['polygon'] = self._connect('polygon', self.config['polygon_rpc_url'])
                 logger.info("Polygon Web3 connection initialized")
                 
         except Exception as e:
             logger.error(f"Error initializing blockchain connections: {str(e)}")
     
+    def _connect(self, blockchain: str, rpc_url: str) -> Web3:
+        """Create the batch client for a chain and a Web3 connection sharing its keep-alive session"""
+        client = JsonRpcBatchClient(
+            rpc_url,
+            batch_size=self.config.get('rpc_batch_size', 20),
+            pool_size=max(16, self.config.get('rpc_max_concurrency', 8)),
+            timeout=self.config.get('rpc_timeout', 30)
+        )
+        self.rpc_clients[blockchain] = client
+        return Web3(Web3.HTTPProvider(rpc_url, session=client.session))
+    
     def track_large_transactions(self, symbol: str, blockchain: str = 'ethereum', hours: int = 24) -> Dict:
         """Track large transactions for a specific cryptocurrency"""
         try:
@@ -109,7 +863,8 @@ class WhaleTrackingAgent:
                 'timestamp': datetime.now().isoformat(),
                 'whale_count': 0,
                 'activities': [],
-                'summary': {}
+                'summary': {},
+                'failed_addresses': []
             }
             
             if blockchain not in self.known_whales:
@@ -118,16 +873,14 @@ class WhaleTrackingAgent:
             whale_addresses = self.known_whales[blockchain]
             whale_activities['whale_count'] = len(whale_addresses)
             
-            for address in whale_addresses:
-                try:
-                    activity = self._analyze_whale_address(address, blockchain)
-                    if activity:
-                        whale_activities['activities'].append(activity)
-                except Exception as e:
-                    logger.warning(f"Error analyzing whale address {address}: {str(e)}")
-                    continue
+            summary = WhaleActivitySummary()
+            activities = list(self.stream_whale_activities(blockchain, whale_addresses, summary))
             
-            whale_activities['summary'] = self._summarize_whale_activities(whale_activities['activities'])
+            # Report in address order regardless of completion order
+            position = {address: i for i, address in enumerate(whale_addresses)}
+            whale_activities['activities'] = sorted(activities, key=lambda a: position.get(a.get('address'), len(position)))
+            whale_activities['summary'] = summary.result()
+            whale_activities['failed_addresses'] = summary.failures
             
             return whale_activities
             
@@ -135,6 +888,94 @@ class WhaleTrackingAgent:
             logger.error(f"Error monitoring whale wallets: {str(e)}")
             return {'error': str(e)}
     
+    def stream_whale_activities(self, blockchain: str = 'ethereum', addresses: Optional[List[str]] = None,
+                                summary: Optional[WhaleActivitySummary] = None) -> Iterator[Dict]:
+        """
+        Yield whale address analyses as they complete. When a summary accumulator is
+        passed it is updated with every result, so it is current at each yield.
+        """
+        return self._iterate_async(lambda: self.monitor_whale_wallets_async(blockchain, addresses, summary), blockchain)
+    
+    async def monitor_whale_wallets_async(self, blockchain: str = 'ethereum', addresses: Optional[List[str]] = None,
+                                          summary: Optional[WhaleActivitySummary] = None) -> AsyncIterator[Dict]:
+        """
+        Analyze whale addresses concurrently, at most provider_concurrency[blockchain]
+        at a time, yielding each analysis as it completes. Each address gets
+        whale_address_timeout seconds from the moment a thread starts on it; an
+        address that times out frees its slot while its thread finishes in the
+        background. Balances are prefetched in JSON-RPC batches where the chain
+        supports it.
+        """
+        addresses = list(addresses if addresses is not None else self.known_whales.get(blockchain, []))
+        if not addresses:
+            return
+        
+        limits = {'bitcoin': 2, **self.config.get('provider_concurrency', {})}
+        limit = max(1, limits.get(blockchain, self.config.get('rpc_max_concurrency', 8)))
+        # Give a single RPC/HTTP call the chance to time out on its own first
+        timeout = self.config.get('whale_address_timeout', self.config.get('rpc_timeout', 30) + 5)
+        
+        loop = asyncio.get_running_loop()
+        # The semaphore bounds live calls; the executor has a spare thread for every
+        # address so calls abandoned after a timeout never delay the ones behind them
+        # (threads are only created as needed).
+        executor = ThreadPoolExecutor(max_workers=limit + len(addresses), thread_name_prefix=f'{blockchain}-whales')
+        provider = asyncio.Semaphore(limit)
+        
+        def run_started(started: asyncio.Future, func, *args):
+            loop.call_soon_threadsafe(lambda: started.done() or started.set_result(None))
+            return func(*args)
+        
+        async def fetch_balances(chunk: List[str]) -> Dict[str, int]:
+            async with provider:
+                return await loop.run_in_executor(executor, self._get_balances, blockchain, chunk)
+        
+        async def analyze(address: str, balances_task: asyncio.Future) -> Tuple[str, Optional[Dict], Optional[str]]:
+            balances = await balances_task
+            async with provider:
+                try:
+                    started = loop.create_future()
+                    call = loop.run_in_executor(executor, run_started, started, self._analyze_whale_address,
+                                                address, blockchain, balances.get(address))
+                    await started
+                    activity = await asyncio.wait_for(call, timeout)
+                    return address, activity, None
+                except asyncio.TimeoutError:
+                    return address, None, f'timed out after {timeout}s'
+                except Exception as e:
+                    return address, None, str(e)
+        
+        tasks = []
+        try:
+            client = self.rpc_clients.get(blockchain)
+            chunk_size = client.batch_size if client is not None else len(addresses)
+            for start in range(0, len(addresses), chunk_size):
+                chunk = addresses[start:start + chunk_size]
+                if client is not None:
+                    balances_task = asyncio.create_task(fetch_balances(chunk))
+                else:
+                    balances_task = loop.create_future()
+                    balances_task.set_result({})
+                tasks.extend(asyncio.create_task(analyze(address, balances_task)) for address in chunk)
+            
+            for next_done in asyncio.as_completed(tasks):
+                address, activity, error = await next_done
+                if error is not None:
+                    logger.warning(f"Error analyzing whale address {address}: {error}")
+                    if summary is not None:
+                        summary.add_failure(address, error)
+                    continue
+                if activity:
+                    if summary is not None:
+                        summary.add(activity)
+                    yield activity
+                    
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            executor.shutdown(wait=False, cancel_futures=True)
+    
     def detect_whale_movements(self, symbol: str, threshold_usd: float = 1000000) -> Dict:
         """Detect significant whale movements across multiple blockchains"""
         try:
@@ -171,50 +1012,305 @@ class WhaleTrackingAgent:
         transactions = []
         
         try:
-            if 'ethereum' not in self.web3_connections:
-                return transactions
-            
-            web3 = self.web3_connections['ethereum']
-            
-            # Get recent blocks
-            latest_block = web3.eth.block_number
-            blocks_to_check = min(hours * 240, 1000)  # Approximate blocks per hour
-            
-            threshold = self.whale_thresholds.get(symbol, 1000000)  # Default threshold
+            if self.transfer_index is not None:
+                transactions = self._get_indexed_large_transactions(symbol, hours, 'ethereum')
+            else:
+                transactions = list(self.stream_large_transactions(symbol, hours, 'ethereum'))
+        except Exception as e:
+            logger.error(f"Error getting Ethereum transactions: {str(e)}")
+        
+        # Break value ties by block and hash so equal-value transfers keep a stable top 100
+        return sorted(transactions, key=lambda x: (-x['value_usd'], x['block_number'], x['hash']))[:100]
+    
+    def stream_large_transactions(self, symbol: str, hours: int = 24, blockchain: str = 'ethereum') -> Iterator[Dict]:
+        """
+        Yield large-transaction records as blocks are scanned.
+        Runs scan_large_transactions_async on a background event loop; closing
+        the generator early stops the scan.
+        """
+        return self._iterate_async(lambda: self.scan_large_transactions_async(symbol, hours, blockchain), blockchain)
+    
+    def _iterate_async(self, make_generator: Callable[[], AsyncIterator], blockchain: str) -> Iterator:
+        """Drive an async generator on a background event loop and yield its items"""
+        items = queue.Queue(maxsize=self.config.get('rpc_max_concurrency', 8) * 4)
+        stop = threading.Event()
+        done = object()
+        
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    items.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        async def pump():
+            generator = make_generator()
+            try:
+                async for item in generator:
+                    if not put(item):
+                        break
+            finally:
+                await generator.aclose()
+        
+        def run():
+            try:
+                asyncio.run(pump())
+            except Exception as e:
+                logger.error(f"Error scanning {blockchain} blocks: {str(e)}")
+            finally:
+                put(done)
+        
+        threading.Thread(target=run, name=f'whale-scan-{blockchain}', daemon=True).start()
+        
+        try:
+            while True:
+                item = items.get()
+                if item is done:
+                    break
+                yield item
+        finally:
+            stop.set()
+    
+    async def scan_large_transactions_async(self, symbol: str, hours: int = 24,
+                                            blockchain: str = 'ethereum') -> AsyncIterator[Dict]:
+        """
+        Scan recent blocks concurrently and yield large transactions as they are found.
+        Records arrive in block completion order.
+        """
+        if blockchain not in self.web3_connections:
+            return
+        
+        web3 = self.web3_connections[blockchain]
+        loop = asyncio.get_running_loop()
+        threshold = self.whale_thresholds.get(symbol, 1000000)  # Default threshold
+        
+        # Get recent blocks
+        await self._get_rate_limiter(blockchain).acquire()
+        latest_block = await loop.run_in_executor(None, lambda: web3.eth.block_number)
+        blocks_to_check = min(hours * 240, 1000)  # Approximate blocks per hour
+        eth_price = await loop.run_in_executor(None, self._get_eth_price)
+        
+        blocks = range(latest_block - blocks_to_check, latest_block)
+        async for _, _, records in self._scan_blocks_async(blockchain, blocks, threshold, eth_price):
+            for record in records:
+                yield record
+    
+    async def _scan_blocks_async(self, blockchain: str, block_numbers: Iterable[int], threshold: float,
+                                 eth_price: float) -> AsyncIterator[Tuple[int, int, List[Dict]]]:
+        """
+        Fetch blocks through a bounded worker pool (rpc_max_concurrency) and the chain's
+        token-bucket limiter (rpc_requests_per_second, counted per HTTP request), packing
+        rpc_batch_size blocks into each JSON-RPC batch, and yield
+        (block_number, block_timestamp, large_transactions) for every block fetched.
+        Blocks left over when the provider rejects batches, or from a batch request
+        that failed as a whole, are re-queued as single requests, each taking its own
+        token. Blocks that fail on their own are logged and skipped.
+        """
+        web3 = self.web3_connections[blockchain]
+        client = self.rpc_clients.get(blockchain)
+        concurrency = max(1, self.config.get('rpc_max_concurrency', 8))
+        limiter = self._get_rate_limiter(blockchain)
+        
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f'{blockchain}-rpc')
+        workers = []
+        
+        try:
+            pending = asyncio.Queue()
+            for block_num in block_numbers:
+                pending.put_nowait(block_num)
+            singles = asyncio.Queue()  # blocks to re-fetch one request at a time
+            found = asyncio.Queue(maxsize=concurrency)
             
-            for block_num in range(latest_block - blocks_to_check, latest_block):
+            async def worker():
                 try:
-                    block = web3.eth.get_block(block_num, full_transactions=True)
-                    
-                    for tx in block.transactions:
-                        # Analyze transaction value
-                        value_eth = web3.from_wei(tx.value, 'ether')
+                    while True:
+                        # Take a batch-sized chunk while the provider accepts batches
+                        chunk_size = client.batch_size if client is not None and client.batch_supported else 1
+                        chunk = []
+                        if not singles.empty():
+                            chunk, chunk_size = [singles.get_nowait()], 1
+                        while len(chunk) < chunk_size:
+                            try:
+                                chunk.append(pending.get_nowait())
+                            except asyncio.QueueEmpty:
+                                break
+                        if not chunk:
+                            break
                         
-                        if value_eth > threshold:
-                            tx_data = {
-                                'hash': tx.hash.hex(),
-                                'from': tx['from'],
-                                'to': tx.to,
-                                'value_eth': float(value_eth),
-                                'value_usd': float(value_eth) * self._get_eth_price(),
-                                'gas_price': tx.gasPrice,
-                                'block_number': block_num,
-                                'timestamp': datetime.fromtimestamp(block.timestamp).isoformat(),
-                                'type': self._classify_transaction_type(tx)
-                            }
-                            transactions.append(tx_data)
-                            
-                except Exception as e:
-                    logger.warning(f"Error processing block {block_num}: {str(e)}")
+                        try:
+                            await limiter.acquire()
+                            if len(chunk) > 1:
+                                blocks = await loop.run_in_executor(
+                                    executor, lambda: client.get_blocks(chunk, True, single_fallback=False)
+                                )
+                            else:
+                                blocks = [await loop.run_in_executor(executor, web3.eth.get_block, chunk[0], True)]
+                        except Exception as e:
+                            if len(chunk) > 1:
+                                # e.g. HTTP 429/5xx on the whole batch: retry its blocks one at a time
+                                logger.warning(f"Error fetching blocks {chunk[0]}-{chunk[-1]}, "
+                                               f"retrying them singly: {str(e)}")
+                                for block_num in chunk:
+                                    singles.put_nowait(block_num)
+                            else:
+                                logger.warning(f"Error fetching block {chunk[0]}: {str(e)}")
+                            continue
+                        
+                        for block_num, block in zip(chunk, blocks):
+                            if isinstance(block, _BatchRejected):
+                                singles.put_nowait(block_num)
+                                continue
+                            try:
+                                if isinstance(block, Exception):
+                                    raise block
+                                if block is None:
+                                    raise ValueError('block not found')
+                                records = self._extract_large_transactions(web3, block, threshold, eth_price)
+                                await found.put((block_num, block.timestamp, records))
+                            except Exception as e:
+                                logger.warning(f"Error processing block {block_num}: {str(e)}")
+                finally:
+                    await found.put(None)
+            
+            workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+            finished = 0
+            
+            while finished < len(workers):
+                result = await found.get()
+                if result is None:
+                    finished += 1
                     continue
+                yield result
                     
-                # Rate limiting
-                time.sleep(0.1)
-                
-        except Exception as e:
-            logger.error(f"Error getting Ethereum transactions: {str(e)}")
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _get_rate_limiter(self, blockchain: str) -> TokenBucket:
+        """Token bucket shared by every scan against a chain's RPC endpoint"""
+        with self._rate_limiter_lock:
+            if blockchain not in self.rate_limiters:
+                self.rate_limiters[blockchain] = TokenBucket(self.config.get('rpc_requests_per_second', 25))
+            return self.rate_limiters[blockchain]
+    
+    def query_large_transactions(self, symbol: str, hours: int = 24, blockchain: str = 'ethereum') -> List[Dict]:
+        """
+        Answer a time-window query from the local transfer index without touching the node.
+        Only blocks already synced by earlier scans are covered.
+        """
+        if self.transfer_index is None:
+            return []
+        
+        since = int(time.time()) - hours * 3600
+        rows = self.transfer_index.query(blockchain, since=since,
+                                         min_value=self.whale_thresholds.get(symbol, 1000000))
+        return sorted(self._indexed_records(rows), key=lambda x: (-x['value_usd'], x['block_number'], x['hash']))
+    
+    def _get_indexed_large_transactions(self, symbol: str, hours: int, blockchain: str) -> List[Dict]:
+        """Bring the transfer index up to the chain head, then answer the block window from it"""
+        if blockchain not in self.web3_connections:
+            return []
+        
+        latest_block = self.web3_connections[blockchain].eth.block_number
+        start_block = latest_block - min(hours * 240, 1000)  # Approximate blocks per hour
+        self._sync_transfer_index(blockchain, start_block, latest_block)
+        
+        rows = self.transfer_index.query(blockchain, start_block=start_block, end_block=latest_block,
+                                         min_value=self.whale_thresholds.get(symbol, 1000000))
+        return self._indexed_records(rows)
+    
+    def _sync_transfer_index(self, blockchain: str, start_block: int, end_block: int):
+        """
+        Fetch only the blocks in [start_block, end_block) not yet covered by the
+        chain's cursor, store their large transfers and advance the cursor.
+        The cursor tracks one contiguous range of processed blocks and is
+        checkpointed every index_checkpoint_blocks blocks.
+        """
+        index = self.transfer_index
+        coverage = index.get_coverage(blockchain)
+        if coverage is None or coverage[1] < start_block - 1 or coverage[0] > end_block:
+            first, last = start_block, start_block - 1
+        else:
+            first, last = coverage
+        
+        missing = list(range(last + 1, end_block)) + list(range(start_block, first))
+        if not missing:
+            return
+        
+        min_value = self.config.get('whale_index_min_value', min(self.whale_thresholds.values()))
+        checkpoint_every = self.config.get('index_checkpoint_blocks', 100)
+        fetched, rows = set(), []
+        
+        def checkpoint():
+            nonlocal first, last, rows
+            while last + 1 in fetched:
+                last += 1
+            while first - 1 in fetched:
+                first -= 1
+            index.record(blockchain, rows, first, last)
+            rows = []
+        
+        scan = self._iterate_async(lambda: self._scan_blocks_async(blockchain, missing, min_value, 0.0), blockchain)
+        for block_num, block_timestamp, records in scan:
+            fetched.add(block_num)
+            rows.extend(
+                (tx['hash'], tx['from'], tx['to'], tx['value_eth'], tx['gas_price'], block_num, block_timestamp, tx['type'])
+                for tx in records
+            )
+            if len(fetched) % checkpoint_every == 0:
+                checkpoint()
+        checkpoint()
+        
+        retention = self.config.get('whale_index_retention_blocks', 7 * 24 * 240)  # ~1 week
+        if retention:
+            index.prune(blockchain, end_block - retention)
+    
+    def _indexed_records(self, rows: List[Dict]) -> List[Dict]:
+        """Turn index rows into transaction records priced at the current ETH quote"""
+        eth_price = self._get_eth_price()
+        return [
+            {
+                'hash': row['hash'],
+                'from': row['from'],
+                'to': row['to'],
+                'value_eth': row['value'],
+                'value_usd': row['value'] * eth_price,
+                'gas_price': row['gas_price'],
+                'block_number': row['block_number'],
+                'timestamp': datetime.fromtimestamp(row['timestamp']).isoformat(),
+                'type': row['type']
+            }
+            for row in rows
+        ]
+    
+    def _extract_large_transactions(self, web3: Web3, block, threshold: float, eth_price: float) -> List[Dict]:
+        """Build transaction records for every transfer in a block above the threshold"""
+        transactions = []
+        
+        for tx in block.transactions:
+            # Analyze transaction value
+            value_eth = web3.from_wei(tx.value, 'ether')
+            
+            if value_eth > threshold:
+                tx_data = {
+                    'hash': tx.hash.hex(),
+                    'from': tx['from'],
+                    'to': tx.to,
+                    'value_eth': float(value_eth),
+                    'value_usd': float(value_eth) * eth_price,
+                    'gas_price': tx.gasPrice,
+                    'block_number': block.number,
+                    'timestamp': datetime.fromtimestamp(block.timestamp).isoformat(),
+                    'type': self._classify_transaction_type(tx)
+                }
+                transactions.append(tx_data)
         
-        return sorted(transactions, key=lambda x: x['value_usd'], reverse=True)[:100]
+        return transactions
     
     def _get_bitcoin_large_transactions(self, symbol: str, hours: int) -> List[Dict]:
         """Get large Bitcoin transactions using external API"""
@@ -222,45 +1318,70 @@ class WhaleTrackingAgent:
         
         try:
             # Use blockchain.info API or similar
-            api_url = "https://blockchain.info/blocks?format=json"
+            api_url = f"{self.bitcoin_api_url}/blocks?format=json"
             response = requests.get(api_url, timeout=10)
             
             if response.status_code == 200:
                 blocks = response.json()['blocks']
                 threshold = self.whale_thresholds.get('BTC', 100)
+                btc_price = self._get_btc_price()
                 
-                for block in blocks[:10]:  # Check recent blocks
-                    block_hash = block['hash']
-                    
-                    # Get block details
-                    block_url = f"https://blockchain.info/rawblock/{block_hash}"
-                    block_response = requests.get(block_url, timeout=10)
-                    
-                    if block_response.status_code == 200:
-                        block_data = block_response.json()
-                        
-                        for tx in block_data['tx']:
-                            total_output = sum(out['value'] for out in tx['out']) / 100000000  # Convert to BTC
-                            
-                            if total_output > threshold:
-                                tx_data = {
-                                    'hash': tx['hash'],
-                                    'value_btc': total_output,
-                                    'value_usd': total_output * self._get_btc_price(),
-                                    'inputs': len(tx['inputs']),
-                                    'outputs': len(tx['out']),
-                                    'timestamp': datetime.fromtimestamp(tx['time']).isoformat(),
-                                    'type': 'bitcoin_transfer'
-                                }
-                                transactions.append(tx_data)
+                # Check recent blocks
+                block_hashes = [block['hash'] for block in blocks[:self.config.get('bitcoin_blocks_to_check', 10)]]
+                
+                for tx_hash, total_satoshis, inputs, outputs, tx_time in self._load_bitcoin_blocks(block_hashes):
+                    total_output = total_satoshis / 100000000  # Convert to BTC
                     
-                    time.sleep(0.5)  # Rate limiting
+                    if total_output > threshold:
+                        tx_data = {
+                            'hash': tx_hash,
+                            'value_btc': total_output,
+                            'value_usd': total_output * btc_price,
+                            'inputs': inputs,
+                            'outputs': outputs,
+                            'timestamp': datetime.fromtimestamp(tx_time).isoformat(),
+                            'type': 'bitcoin_transfer'
+                        }
+                        transactions.append(tx_data)
                     
         except Exception as e:
             logger.error(f"Error getting Bitcoin transactions: {str(e)}")
         
         return sorted(transactions, key=lambda x: x['value_usd'], reverse=True)[:50]
     
+    def _load_bitcoin_blocks(self, block_hashes: List[str]) -> Iterator[Tuple[str, int, int, int, int]]:
+        """
+        Yield parsed transactions for the given blocks in order, reading cached blocks
+        from disk and fetching the rest in parallel (provider_concurrency['bitcoin'] at a time)
+        """
+        cache = self.bitcoin_block_cache
+        cached = {block_hash: cache.get(block_hash) if cache is not None else None for block_hash in block_hashes}
+        uncached = [block_hash for block_hash, transactions in cached.items() if transactions is None]
+        
+        workers = max(1, self.config.get('provider_concurrency', {}).get('bitcoin', 2))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bitcoin-blocks') as executor:
+            futures = {block_hash: executor.submit(self._fetch_bitcoin_block, block_hash) for block_hash in uncached}
+            
+            for block_hash in block_hashes:
+                if block_hash not in futures:
+                    yield from cached[block_hash]
+                    continue
+                try:
+                    yield from futures[block_hash].result()
+                except Exception as e:
+                    logger.warning(f"Error fetching Bitcoin block {block_hash}: {str(e)}")
+    
+    def _fetch_bitcoin_block(self, block_hash: str) -> List[Tuple[str, int, int, int, int]]:
+        """Download and stream-parse one raw block, then store it in the block cache"""
+        block_url = f"{self.bitcoin_api_url}/rawblock/{block_hash}"
+        with requests.get(block_url, timeout=10, stream=True) as response:
+            response.raise_for_status()
+            transactions = list(iter_bitcoin_transactions(response.iter_content(chunk_size=65536)))
+        
+        if self.bitcoin_block_cache is not None:
+            self.bitcoin_block_cache.put(block_hash, transactions)
+        return transactions
+    
     def _get_bsc_large_transactions(self, symbol: str, hours: int) -> List[Dict]:
         """Get large BSC transactions"""
         # Similar to Ethereum but for BSC
@@ -280,14 +1401,29 @@ class WhaleTrackingAgent:
         
         return transactions
     
-    def _analyze_whale_address(self, address: str, blockchain: str) -> Dict:
+    def _get_balances(self, blockchain: str, addresses: List[str]) -> Dict[str, int]:
+        """Fetch balances (wei) for many addresses in batched JSON-RPC calls; failed lookups are omitted"""
+        client = self.rpc_clients.get(blockchain)
+        if client is None or not addresses:
+            return {}
+        
+        try:
+            balances = client.get_balances(addresses)
+        except Exception as e:
+            logger.warning(f"Error fetching {blockchain} balances: {str(e)}")
+            return {}
+        
+        return {address: balance for address, balance in zip(addresses, balances) if isinstance(balance, int)}
+    
+    def _analyze_whale_address(self, address: str, blockchain: str, balance_wei: Optional[int] = None) -> Dict:
         """Analyze a specific whale address"""
         try:
             if blockchain == 'ethereum' and 'ethereum' in self.web3_connections:
                 web3 = self.web3_connections['ethereum']
                 
-                # Get balance
-                balance_wei = web3.eth.get_balance(address)
+                # Get balance unless it was prefetched in a batch
+                if balance_wei is None:
+                    balance_wei = web3.eth.get_balance(address)
                 balance_eth = web3.from_wei(balance_wei, 'ether')
                 
                 # Get recent transactions
@@ -314,7 +1450,7 @@ class WhaleTrackingAgent:
     def _analyze_bitcoin_address(self, address: str) -> Dict:
         """Analyze Bitcoin address using external API"""
         try:
-            api_url = f"https://blockchain.info/rawaddr/{address}"
+            api_url = f"{self.bitcoin_api_url}/rawaddr/{address}"
             response = requests.get(api_url, timeout=10)
             
             if response.status_code == 200:
@@ -377,9 +1513,11 @@ class WhaleTrackingAgent:
                         'to_address': tx['to'],
                         'amount_usd': tx['value_usd'],
                         'timestamp': tx['timestamp'],
-                        'movement_type': self._classify_movement_type(tx),
-                        'risk_level': self._assess_movement_risk(tx)
+                        'from_label': self.address_labels.lookup(tx['from']),
+                        'to_label': self.address_labels.lookup(tx['to'])
                     }
+                    movement['movement_type'] = self._classify_movement_type(movement)
+                    movement['risk_level'] = self._assess_movement_risk(movement)
                     movements.append(movement)
             
         except Exception as e:
@@ -398,17 +1536,8 @@ class WhaleTrackingAgent:
     
     def _classify_movement_type(self, tx: Dict) -> str:
         """Classify whale movement type"""
-        from_addr = tx.get('from_address', '').lower()
-        to_addr = tx.get('to_address', '').lower()
-        
-        # Known exchange addresses (simplified)
-        exchange_addresses = [
-            '0x742d35cc6634c0532925a3b8d4c9db96c4b4d8b6',  # Example exchange
-            '0x8894e0a0c962cb723c1976a4421c95949be2d4e3',  # Example exchange
-        ]
-        
-        from_exchange = any(addr in from_addr for addr in exchange_addresses)
-        to_exchange = any(addr in to_addr for addr in exchange_addresses)
+        from_exchange = self.address_labels.category(tx.get('from_address')) == 'exchange'
+        to_exchange = self.address_labels.category(tx.get('to_address')) == 'exchange'
         
         if from_exchange and not to_exchange:
             return 'exchange_outflow'
@@ -428,56 +1557,36 @@ class WhaleTrackingAgent:
             return 'very_high'
         elif amount_usd > 5000000:  # $5M+
             return 'high'
-        elif amount_type == 'exchange_outflow' and amount_usd > 1000000:
+        elif movement_type == 'exchange_outflow' and amount_usd > 1000000:
             return 'high'  # Large outflows are concerning
         elif amount_usd > 1000000:  # $1M+
             return 'medium'
         else:
             return 'low'
     
-    def _analyze_transaction_patterns(self, transactions: List[Dict]) -> Dict:
+    def _analyze_transaction_patterns(self, transactions: Union[List[Dict], TransactionColumns]) -> Dict:
         """Analyze patterns in large transactions"""
-        if not transactions:
+        if not len(transactions):
             return {}
         
-        total_volume = sum(tx.get('value_usd', 0) for tx in transactions)
-        avg_transaction_size = total_volume / len(transactions)
-        
-        # Analyze transaction types
-        type_counts = {}
-        for tx in transactions:
-            tx_type = tx.get('type', 'unknown')
-            type_counts[tx_type] = type_counts.get(tx_type, 0) + 1
-        
-        # Analyze time distribution
-        timestamps = [tx.get('timestamp') for tx in transactions if tx.get('timestamp')]
-        time_analysis = self._analyze_time_distribution(timestamps)
+        columns = transactions if isinstance(transactions, TransactionColumns) else TransactionColumns.from_records(transactions)
+        total_volume = float(columns.value_usd.sum())
         
         return {
-            'total_transactions': len(transactions),
+            'total_transactions': len(columns),
             'total_volume_usd': total_volume,
-            'average_transaction_size_usd': avg_transaction_size,
-            'largest_transaction_usd': max(tx.get('value_usd', 0) for tx in transactions),
-            'transaction_types': type_counts,
-            'time_analysis': time_analysis
+            'average_transaction_size_usd': total_volume / len(columns),
+            'largest_transaction_usd': float(columns.value_usd.max()),
+            'transaction_types': columns.type_counts(),
+            'time_analysis': columns.time_distribution()
         }
     
     def _summarize_whale_activities(self, activities: List[Dict]) -> Dict:
         """Summarize whale wallet activities"""
-        if not activities:
-            return {}
-        
-        total_balance_usd = sum(activity.get('balance_usd', 0) for activity in activities)
-        active_whales = sum(1 for activity in activities if activity.get('activity_score', 0) > 0.5)
-        
-        return {
-            'total_whales_monitored': len(activities),
-            'active_whales': active_whales,
-            'total_balance_usd': total_balance_usd,
-            'average_balance_usd': total_balance_usd / len(activities),
-            'most_active_whale': max(activities, key=lambda x: x.get('activity_score', 0), default={}),
-            'largest_whale': max(activities, key=lambda x: x.get('balance_usd', 0), default={})
-        }
+        summary = WhaleActivitySummary()
+        for activity in activities:
+            summary.add(activity)
+        return summary.result()
     
     def _generate_movement_alerts(self, movements: List[Dict]) -> List[Dict]:
         """Generate alerts for significant whale movements"""
@@ -540,57 +1649,38 @@ class WhaleTrackingAgent:
     
     def _analyze_time_distribution(self, timestamps: List[str]) -> Dict:
         """Analyze time distribution of transactions"""
-        if not timestamps:
+        if not len(timestamps):
             return {}
         
         try:
-            # Convert timestamps to datetime objects
-            datetimes = []
-            for ts in timestamps:
-                try:
-                    dt = datetime.fromisoformat(ts.replace('Z', '+00:00'))
-                    datetimes.append(dt)
-                except:
-                    continue
-            
-            if not datetimes:
-                return {}
-            
-            # Analyze by hour
-            hour_counts = {}
-            for dt in datetimes:
-                hour = dt.hour
-                hour_counts[hour] = hour_counts.get(hour, 0) + 1
-            
-            # Find peak activity hours
-            peak_hour = max(hour_counts.keys(), key=lambda h: hour_counts[h])
-            
-            return {
-                'peak_activity_hour': peak_hour,
-                'hourly_distribution': hour_counts,
-                'total_timespan_hours': (max(datetimes) - min(datetimes)).total_seconds() / 3600
-            }
+            hours, timespan = TransactionColumns.parse_timestamps(timestamps)
+            columns = TransactionColumns(np.empty(0), np.empty(0, dtype=np.int64), [], hours, timespan)
+            return columns.time_distribution()
             
         except Exception as e:
             logger.error(f"Error analyzing time distribution: {str(e)}")
             return {}
     
+    def get_usd_prices(self, symbols: List[str]) -> Dict[str, Optional[float]]:
+        """Get cached USD prices for several symbols with one bulk request for any misses"""
+        ids = {symbol: self.coingecko_ids.get(symbol, symbol.lower()) for symbol in symbols}
+        quotes = self.price_cache.get_many(ids.values(), self.fallback_prices)
+        return {symbol: quotes[coin_id] for symbol, coin_id in ids.items()}
+    
+    def _fetch_usd_prices(self, coin_ids: List[str]) -> Dict[str, float]:
+        """Fetch USD prices for several CoinGecko ids in one request"""
+        response = requests.get(
+            'https://api.coingecko.com/api/v3/simple/price',
+            params={'ids': ','.join(coin_ids), 'vs_currencies': 'usd'},
+            timeout=5
+        )
+        response.raise_for_status()
+        return {coin_id: quote['usd'] for coin_id, quote in response.json().items() if 'usd' in quote}
+    
     def _get_eth_price(self) -> float:
         """Get current ETH price in USD"""
-        try:
-            response = requests.get('https://api.coingecko.com/api/v3/simple/price?ids=ethereum&vs_currencies=usd', timeout=5)
-            if response.status_code == 200:
-                return response.json()['ethereum']['usd']
-        except:
-            pass
-        return 2000.0  # Fallback price
+        return self.price_cache.get('ethereum', self.fallback_prices['ethereum'])
     
     def _get_btc_price(self) -> float:
         """Get current BTC price in USD"""
-        try:
-            response = requests.get('https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd', timeout=5)
-            if response.status_code == 200:
-                return response.json()['bitcoin']['usd']
-        except:
-            pass
-        return 50000.0  # Fallback price
+        return self.price_cache.get('bitcoin', self.fallback_prices['bitcoin'])
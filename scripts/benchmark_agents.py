@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the XplainCrypto agents' hot paths
+"""
+
+import os
+import sys
+import time
+import argparse
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+AGENTS_DIR = os.path.join(SCRIPTS_DIR, '..', 'agents')
+sys.path.insert(0, AGENTS_DIR)
+sys.path.insert(0, SCRIPTS_DIR)
+
+
+def timed(func, *args, **kwargs):
+    """Run func once and return (result, elapsed seconds)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def make_ohlcv(rows: int, seed: int = 42, crash_every: int = 5000) -> pd.DataFrame:
+    """Synthetic 1-minute candles with a flash crash injected every crash_every rows"""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, 0.002, rows)
+    returns[crash_every::crash_every] = -0.08
+    returns[crash_every + 3::crash_every] = 0.06
+    close = 30000 * np.exp(np.cumsum(returns))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=rows, freq='min'),
+        'open': open_,
+        'high': np.maximum(open_, close) * (1 + rng.uniform(0, 0.002, rows)),
+        'low': np.minimum(open_, close) * (1 - rng.uniform(0, 0.002, rows)),
+        'close': close,
+        'volume': rng.uniform(10, 1000, rows)
+    })
+
+
+def legacy_flash_crash_loop(data: pd.DataFrame) -> list:
+    """Reference copy of the original per-window detect_flash_crashes loop"""
+    events = []
+    price_changes = data['close'].pct_change()
+    crash_threshold = -0.05
+    time_window = 10
+
+    for i in range(len(data) - time_window):
+        window_data = data.iloc[i:i+time_window]
+        window_changes = price_changes.iloc[i:i+time_window]
+
+        min_change = window_changes.min()
+        if min_change < crash_threshold:
+            crash_idx = window_changes.idxmin()
+
+            post_crash_data = data.iloc[i+time_window:i+time_window*2]
+            if len(post_crash_data) > 0:
+                recovery = (post_crash_data['close'].max() - data['close'].iloc[crash_idx]) / data['close'].iloc[crash_idx]
+
+                events.append({
+                    'type': 'flash_crash',
+                    'timestamp': crash_idx,
+                    'price_before': data['close'].iloc[i],
+                    'price_crash': data['close'].iloc[crash_idx],
+                    'crash_magnitude': min_change * 100,
+                    'recovery_percent': recovery * 100,
+                    'volume_spike': window_data['volume'].max() / window_data['volume'].mean(),
+                    'duration_minutes': time_window
+                })
+
+    return events
+
+
+def events_match(expected: list, actual: list) -> bool:
+    """Compare event dicts, allowing float rounding differences"""
+    if len(expected) != len(actual):
+        return False
+    for left, right in zip(expected, actual):
+        if left.keys() != right.keys():
+            return False
+        for key in left:
+            if isinstance(left[key], (float, np.floating)):
+                if not np.isclose(left[key], right[key], rtol=1e-9, equal_nan=True):
+                    return False
+            elif left[key] != right[key]:
+                return False
+    return True
+
+
+def benchmark_flash_crashes(args: argparse.Namespace):
+    """Vectorized detect_flash_crashes vs the original loop"""
+    from anomaly_detection_agent import AnomalyDetectionAgent
+
+    sizes = args.sizes or [10_000, 100_000, 1_000_000]
+    agent = AnomalyDetectionAgent({})
+    print("\n⚡ detect_flash_crashes")
+    print(f"   {'rows':>10} {'events':>8} {'vectorized':>12} {'loop':>12} {'speedup':>9}  parity")
+
+    for rows in sizes:
+        data = make_ohlcv(rows)
+        result, fast_time = timed(agent.detect_flash_crashes, data, 'BTC')
+
+        if rows <= args.legacy_max_rows:
+            expected, loop_time = timed(legacy_flash_crash_loop, data)
+            parity = '✓' if events_match(expected, result['events']) else '✗'
+            loop_col = f"{loop_time:>11.3f}s"
+            speedup = f"{loop_time / fast_time:>8.0f}x"
+        else:
+            parity, loop_col, speedup = '-', f"{'skipped':>12}", f"{'-':>9}"
+
+        print(f"   {rows:>10,} {len(result['events']):>8} {fast_time:>11.4f}s {loop_col} {speedup}  {parity}")
+
+
+def benchmark_feature_parity(args: argparse.Namespace):
+    """Incremental update_features stream vs the batch prepare_features path, column by column"""
+    from crypto_prediction_agent import CryptoPredictionAgent
+
+    sizes = args.sizes or [2_000, 5_000]
+    print("\n🧮 update_features vs prepare_features")
+    print(f"   {'rows':>10} {'rows out':>9} {'stream':>10} {'batch':>10} {'worst column':>24} {'max rel err':>12}  parity")
+
+    for rows in sizes:
+        data = make_ohlcv(rows)
+        agent = CryptoPredictionAgent({})
+        expected, batch_time = timed(agent.prepare_features, data)
+
+        def stream():
+            frames = [agent.update_features('BTC', candle) for candle in data.to_dict('records')]
+            return pd.concat([frame for frame in frames if frame is not None], ignore_index=True)
+
+        streamed, stream_time = timed(stream)
+        columns = agent.feature_columns
+        worst_column, worst_error = '-', 0.0
+        parity = len(streamed) == len(expected) and list(columns) == [c for c in expected.columns if c in columns]
+        if parity:
+            expected_values = expected[columns].to_numpy(dtype=float)
+            streamed_values = streamed[columns].to_numpy(dtype=float)
+            errors = np.abs(streamed_values - expected_values) / np.maximum(np.abs(expected_values), 1e-12)
+            column_errors = np.nanmax(errors, axis=0)
+            worst = int(np.argmax(column_errors))
+            worst_column, worst_error = columns[worst], float(column_errors[worst])
+            parity = bool(np.allclose(streamed_values, expected_values, rtol=args.feature_rtol, atol=1e-9))
+
+        print(f"   {rows:>10,} {len(streamed):>9,} {stream_time:>9.3f}s {batch_time:>9.3f}s {worst_column:>24} "
+              f"{worst_error:>12.2e}  {'✓' if parity else '✗'}")
+
+
+def benchmark_batch_predict(args: argparse.Namespace):
+    """Batched predict_batch vs one predict() call per symbol"""
+    from crypto_prediction_agent import CryptoPredictionAgent
+
+    sizes = args.sizes or [1, 32, 512]
+    agent = CryptoPredictionAgent({})
+    for params in agent.model_configs.values():
+        params['n_estimators'] = args.estimators
+
+    features = agent.prepare_features(make_ohlcv(3000))
+    agent.train_models(features.copy(), target_horizon=1)
+    latest = features.iloc[-1:][agent.feature_columns + ['close']]
+    rng = np.random.default_rng(7)
+
+    print(f"\n🔮 predict_batch ({args.estimators} estimators per model)")
+    print(f"   {'batch':>6} {'batched':>12} {'per-symbol':>12} {'speedup':>9}  parity")
+
+    for batch_size in sizes:
+        frames = {
+            f'SYM{k}': latest * (1 + rng.normal(0, 0.01, latest.shape[1]))
+            for k in range(batch_size)
+        }
+        rows = pd.concat(frames.values(), keys=frames.keys()).droplevel(1)
+
+        batched, batch_time = timed(agent.predict_batch, rows, 1)
+        expected, loop_time = timed(lambda: {s: agent.predict(f, 1) for s, f in frames.items()})
+        parity = all(
+            np.isclose(batched[s]['predicted_price'], expected[s]['predicted_price'], rtol=1e-9)
+            for s in frames
+        )
+        print(f"   {batch_size:>6} {batch_time * 1000:>10.2f}ms {loop_time * 1000:>10.2f}ms "
+              f"{loop_time / batch_time:>8.1f}x  {'✓' if parity else '✗'}")
+
+
+def make_price_data(assets: int, periods: int, seed: int = 11) -> Dict:
+    """Synthetic daily price histories in the {'prices': [{'price': ...}]} shape the risk agent reads"""
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, (periods, assets)), axis=0))
+    return {
+        f'ASSET{k}': {'prices': [{'price': float(p)} for p in prices[:, k]], 'current_price': float(prices[-1, k])}
+        for k in range(assets)
+    }
+
+
+def legacy_portfolio_returns(agent, portfolio_data: Dict, price_data: Dict) -> np.ndarray:
+    """Reference copy of the original nested-loop _calculate_portfolio_returns"""
+    portfolio_returns = []
+    min_length = float('inf')
+
+    asset_returns = {}
+    for asset in portfolio_data['assets']:
+        symbol = asset['symbol']
+        returns = agent._calculate_returns(price_data.get(symbol, {}))
+        if len(returns) > 0:
+            asset_returns[symbol] = returns
+            min_length = min(min_length, len(returns))
+
+    if not asset_returns or min_length == 0:
+        return np.array([])
+
+    for i in range(min_length):
+        portfolio_return = 0
+        for asset in portfolio_data['assets']:
+            symbol = asset['symbol']
+            if symbol in asset_returns:
+                portfolio_return += asset['weight'] * asset_returns[symbol][-(min_length-i)]
+        portfolio_returns.append(portfolio_return)
+
+    return np.array(portfolio_returns)
+
+
+def benchmark_portfolio_returns(args: argparse.Namespace):
+    """Matrix-vector _calculate_portfolio_returns vs the original nested loop"""
+    from risk_assessment_agent import RiskAssessmentAgent
+
+    sizes = args.sizes or [10, 100, 1000]
+    agent = RiskAssessmentAgent({})
+    print(f"\n📊 _calculate_portfolio_returns ({args.periods} daily periods)")
+    print(f"   {'assets':>6} {'first call':>11} {'cached':>11} {'loop':>11} {'speedup':>9}  parity")
+
+    for assets in sizes:
+        price_data = make_price_data(assets, args.periods)
+        portfolio = {'holdings': [{'symbol': symbol, 'quantity': 1.0} for symbol in price_data]}
+        portfolio_data = agent._prepare_portfolio_data(portfolio, price_data)
+
+        _, cold_time = timed(agent._calculate_portfolio_returns, portfolio_data, price_data)
+        result, warm_time = timed(agent._calculate_portfolio_returns, portfolio_data, price_data)
+        expected, loop_time = timed(legacy_portfolio_returns, agent, portfolio_data, price_data)
+        parity = np.allclose(result, expected, rtol=1e-9, atol=1e-15)
+
+        print(f"   {assets:>6} {cold_time * 1000:>9.2f}ms {warm_time * 1000:>9.3f}ms {loop_time * 1000:>9.1f}ms "
+              f"{loop_time / warm_time:>8.0f}x  {'✓' if parity else '✗'}")
+
+
+def legacy_stress_losses(portfolio: Dict, price_data: Dict, scenarios: List[Dict]) -> List[float]:
+    """Reference copy of the original per-holding _apply_stress_scenario loop (percentage losses)"""
+    losses = []
+    for scenario in scenarios:
+        shocks = scenario['shocks']
+        value_before = new_value = 0
+        for holding in portfolio['holdings']:
+            symbol = holding['symbol']
+            current_price = price_data.get(symbol, {}).get('current_price', 0)
+            shock = 0
+            if 'all' in shocks:
+                shock = shocks['all']
+            elif symbol in shocks:
+                shock = shocks[symbol]
+            elif 'others' in shocks:
+                shock = shocks['others']
+            value_before += holding['quantity'] * current_price
+            new_value += holding['quantity'] * current_price * (1 + shock)
+        losses.append((value_before - new_value) / value_before * 100)
+    return losses
+
+
+def benchmark_stress_test(args: argparse.Namespace):
+    """Vectorized scenarios x portfolios stress test vs the original per-holding loop"""
+    from risk_assessment_agent import RiskAssessmentAgent
+
+    sizes = args.sizes or [10, 100, 1000]
+    rng = np.random.default_rng(5)
+    agent = RiskAssessmentAgent({})
+    price_data = make_price_data(200, 2)
+    symbols = list(price_data)
+    scenarios = [
+        {'name': f'scenario_{k}',
+         'shocks': {**{symbol: -float(shock) for symbol, shock in zip(rng.choice(symbols, 5, replace=False), rng.random(5))},
+                    'others': -0.3 * float(rng.random())}}
+        for k in range(args.scenarios)
+    ]
+    print(f"\n🧨 stress_test_portfolios ({args.scenarios} scenarios, 20 holdings per portfolio)")
+    print(f"   {'portfolios':>10} {'batched':>10} {'loop':>10} {'speedup':>9}  parity")
+
+    for count in sizes:
+        portfolios = [
+            {'holdings': [{'symbol': symbol, 'quantity': float(quantity)}
+                          for symbol, quantity in zip(rng.choice(symbols, 20, replace=False), rng.random(20) + 0.1)]}
+            for _ in range(count)
+        ]
+        result, batch_time = timed(agent.stress_test_portfolios, portfolios, price_data, scenarios)
+        expected, loop_time = timed(lambda: [legacy_stress_losses(p, price_data, scenarios) for p in portfolios])
+        parity = np.allclose([p['percentage_losses'] for p in result['portfolios']], expected)
+
+        print(f"   {count:>10} {batch_time:>9.3f}s {loop_time:>9.3f}s {loop_time / batch_time:>8.0f}x  {'✓' if parity else '✗'}")
+
+
+def benchmark_batch_assessment(args: argparse.Namespace):
+    """assess_portfolio_risks over shared price data vs independent assess_portfolio_risk calls"""
+    from risk_assessment_agent import RiskAssessmentAgent
+
+    sizes = args.sizes or [100, 1000]
+    rng = np.random.default_rng(9)
+    price_data = make_price_data(50, args.periods)
+    symbols = list(price_data)
+    print(f"\n🗂️  assess_portfolio_risks (50-asset universe, {args.periods} periods)")
+    print(f"   {'portfolios':>10} {'batched':>10} {'independent':>12} {'speedup':>9}  parity")
+
+    def without_timestamps(value):
+        if isinstance(value, dict):
+            return {key: without_timestamps(item) for key, item in value.items() if key != 'timestamp'}
+        if isinstance(value, list):
+            return [without_timestamps(item) for item in value]
+        return value
+
+    for count in sizes:
+        portfolios = [
+            {'id': i, 'holdings': [{'symbol': symbol, 'quantity': float(quantity)}
+                                   for symbol, quantity in zip(symbols, rng.random(len(symbols)) + 0.1)]}
+            for i in range(count)
+        ]
+        results, batch_time = timed(RiskAssessmentAgent({}).assess_portfolio_risks, portfolios, price_data)
+        sample = portfolios[:max(1, count // 10)]
+        expected, sample_time = timed(lambda: [RiskAssessmentAgent({}).assess_portfolio_risk(p, price_data) for p in sample])
+        loop_time = sample_time * count / len(sample)
+        parity = repr(without_timestamps(results[:len(sample)])) == repr(without_timestamps(expected))
+
+        print(f"   {count:>10} {batch_time:>9.2f}s {loop_time:>11.2f}s {loop_time / batch_time:>8.1f}x  {'✓' if parity else '✗'}")
+
+
+def benchmark_rpc_batching(args: argparse.Namespace):
+    """Batched JSON-RPC block/balance reads vs one request per call, against a local stub node"""
+    from stub_nodes import StubEthereumNode
+    from whale_tracking_agent import WhaleTrackingAgent
+
+    sizes = args.sizes or [100, 400, 1000]
+    print(f"\n📦 JSON-RPC batching (stub node, {args.rpc_latency * 1000:.0f}ms per HTTP request)")
+    print(f"   {'calls':>6} {'kind':>8} {'batched':>10} {'reqs':>6} {'single':>10} {'reqs':>6} {'speedup':>9}  parity")
+
+    with StubEthereumNode(txs_per_block=50, latency=args.rpc_latency) as node:
+        agents = {
+            batch_size: WhaleTrackingAgent({
+                'ethereum_rpc_url': node.url,
+                'rpc_batch_size': batch_size,
+                'rpc_requests_per_second': 0
+            })
+            for batch_size in (args.rpc_batch_size, 1)
+        }
+
+        def scan(agent, count):
+            blocks = range(node.latest_block - count, node.latest_block)
+            stream = agent._iterate_async(lambda: agent._scan_blocks_async('ethereum', blocks, 1000, 2000.0), 'ethereum')
+            return sorted((block_num, len(records)) for block_num, _, records in stream)
+
+        def balances(agent, count):
+            return agent._get_balances('ethereum', [f'0x{k:040x}' for k in range(count)])
+
+        for count in sizes:
+            for kind, func in (('blocks', scan), ('balances', balances)):
+                runs = []
+                for agent in agents.values():
+                    before = node.request_count
+                    result, elapsed = timed(func, agent, count)
+                    runs.append((result, elapsed, node.request_count - before))
+
+                (batched, batch_time, batch_reqs), (single, single_time, single_reqs) = runs
+                print(f"   {count:>6} {kind:>8} {batch_time:>9.3f}s {batch_reqs:>6} {single_time:>9.3f}s {single_reqs:>6} "
+                      f"{single_time / batch_time:>8.1f}x  {'✓' if batched == single else '✗'}")
+
+
+def benchmark_whale_timeouts(args: argparse.Namespace):
+    """Whale wallet monitoring with hung addresses: timed-out calls must not starve healthy ones"""
+    from whale_tracking_agent import WhaleTrackingAgent
+
+    class HangingWhaleAgent(WhaleTrackingAgent):
+        def _analyze_whale_address(self, address, blockchain, balance_wei=None):
+            time.sleep(args.hang_seconds if address.startswith('hung') else 0.05)
+            return {'address': address, 'blockchain': blockchain, 'balance_usd': 0.0}
+
+    concurrency, healthy = 2, 8
+    agent = HangingWhaleAgent({'provider_concurrency': {'ethereum': concurrency}, 'whale_address_timeout': 1})
+    print(f"\n🐋 Whale monitoring with hung addresses (concurrency {concurrency}, 1s timeout, "
+          f"{args.hang_seconds:.0f}s hangs, {healthy} healthy)")
+    print(f"   {'hung':>6} {'time':>9} {'healthy ok':>11} {'timed out':>10}  expected")
+
+    for hung in args.sizes or [concurrency, 2 * concurrency]:
+        agent.known_whales['ethereum'] = [f'hung-{k}' for k in range(hung)] + [f'ok-{k}' for k in range(healthy)]
+        result, elapsed = timed(agent.monitor_whale_wallets, 'ethereum')
+        served = sum(1 for activity in result['activities'] if activity['address'].startswith('ok'))
+        failed = sum(1 for failure in result['failed_addresses'] if failure['address'].startswith('hung'))
+        print(f"   {hung:>6} {elapsed:>8.2f}s {served:>11} {failed:>10}  {'✓' if (served, failed) == (healthy, hung) else '✗'}")
+
+
+def benchmark_sentiment_fan_out(args: argparse.Namespace):
+    """Sentiment fan-outs with concurrent callers and with a hung source: healthy sources must keep answering"""
+    from concurrent.futures import ThreadPoolExecutor
+    from sentiment_analysis_agent import SentimentAnalysisAgent
+
+    sources = ('twitter', 'reddit', 'news', 'fear_greed_index')
+
+    def make_agent(twitter_delay: float, delay: float):
+        def source(platform: str, seconds: float):
+            def fetch(*_args, **_kwargs):
+                time.sleep(seconds)
+                return {'platform': platform, 'average_sentiment': {'compound': 0.1}}
+            return fetch
+
+        agent = SentimentAnalysisAgent({'sentiment_source_timeouts': dict.fromkeys(sources, 1.0)})
+        agent.analyze_twitter_sentiment = source('twitter', twitter_delay)
+        agent.analyze_reddit_sentiment = source('reddit', delay)
+        agent.analyze_news_sentiment = source('news', delay)
+        agent.get_fear_greed_index = source('fear_greed_index', delay)
+        return agent
+
+    def healthy_ok(result) -> int:
+        return sum(1 for name, entry in result['source_status'].items() if name != 'twitter' and entry['status'] == 'ok')
+
+    print("\n📣 Sentiment fan-out with concurrent callers (every source takes 0.5s, 1s deadlines)")
+    print(f"   {'symbol':>6} {'time':>9} {'sources ok':>11}  expected")
+    agent = make_agent(0.5, 0.5)
+    with ThreadPoolExecutor(max_workers=2) as callers:
+        runs = {symbol: callers.submit(timed, agent.get_comprehensive_sentiment, symbol) for symbol in ('BTC', 'ETH')}
+        for symbol, run in runs.items():
+            result, elapsed = run.result()
+            ok = sum(1 for entry in result['source_status'].values() if entry['status'] == 'ok')
+            print(f"   {symbol:>6} {elapsed:>8.2f}s {ok:>11}  {'✓' if ok == len(sources) else '✗'}")
+
+    calls = (args.sizes or [12])[0]
+    print(f"\n📣 Sentiment fan-out with a hung source (twitter sleeps {args.hang_seconds:.0f}s, 1s deadlines, {calls} calls)")
+    print(f"   {'call':>6} {'time':>9} {'twitter':>9} {'healthy ok':>11}  expected")
+    agent = make_agent(args.hang_seconds, 0.05)
+    for call in range(1, calls + 1):
+        result, elapsed = timed(agent.get_comprehensive_sentiment, 'BTC')
+        healthy = healthy_ok(result)
+        print(f"   {call:>6} {elapsed:>8.2f}s {result['source_status']['twitter']['status']:>9} {healthy:>11}  "
+              f"{'✓' if healthy == len(sources) - 1 else '✗'}")
+
+BENCHMARKS = {
+    'flash_crash': benchmark_flash_crashes,
+    'feature_parity': benchmark_feature_parity,
+    'batch_predict': benchmark_batch_predict,
+    'rpc_batching': benchmark_rpc_batching,
+    'whale_timeouts': benchmark_whale_timeouts,
+    'portfolio_returns': benchmark_portfolio_returns,
+    'stress_test': benchmark_stress_test,
+    'batch_assessment': benchmark_batch_assessment,
+    'sentiment_fan_out': benchmark_sentiment_fan_out,
+}
+
+
+def main():
+    """Parse arguments and run the selected benchmarks"""
+    parser = argparse.ArgumentParser(description='Benchmark XplainCrypto agent hot paths')
+    parser.add_argument('benchmarks', nargs='*', help=f"benchmarks to run: {', '.join(sorted(BENCHMARKS))} (default: all)")
+    parser.add_argument('--sizes', type=int, nargs='+', help='override the benchmark sizes (rows, batch size, ...)')
+    parser.add_argument('--legacy-max-rows', type=int, default=1_000_000,
+                        help='skip the slow reference implementation above this many rows')
+    parser.add_argument('--estimators', type=int, default=200,
+                        help='n_estimators for models trained inside benchmarks')
+    parser.add_argument('--feature-rtol', type=float, default=1e-5,
+                        help='relative tolerance for the feature parity check')
+    parser.add_argument('--periods', type=int, default=5 * 365,
+                        help='price history length for portfolio benchmarks')
+    parser.add_argument('--scenarios', type=int, default=2000,
+                        help='generated scenarios for the stress test benchmark')
+    parser.add_argument('--rpc-latency', type=float, default=0.02,
+                        help='simulated seconds per HTTP request on the stub node')
+    parser.add_argument('--rpc-batch-size', type=int, default=20,
+                        help='JSON-RPC calls per batch for the batched path')
+    parser.add_argument('--hang-seconds', type=float, default=5.0,
+                        help='how long hung calls block in the timeout benchmarks')
+    args = parser.parse_args()
+
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    print("🏁 XplainCrypto agent benchmarks")
+    for name in args.benchmarks or sorted(BENCHMARKS):
+        BENCHMARKS[name](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Local stub blockchain nodes for exercising the whale tracking agent offline
+
+StubEthereumNode answers the JSON-RPC methods the agent uses and
+StubBitcoinNode serves blockchain.info-style fixtures, both with
+deterministic synthetic blocks, so scans can be run and benchmarked
+without a real provider.
+"""
+
+import json
+import time
+import hashlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+WEI_PER_ETH = 10 ** 18
+SATOSHIS_PER_BTC = 10 ** 8
+
+
+def _hex(value: int) -> str:
+    return hex(value)
+
+
+def _hash(*parts) -> str:
+    return '0x' + hashlib.sha256(':'.join(str(p) for p in parts).encode()).hexdigest()
+
+
+def _address(seed) -> str:
+    return '0x' + hashlib.sha256(f'addr:{seed}'.encode()).hexdigest()[:40]
+
+
+class _StubServer:
+    """Threaded HTTP server lifecycle shared by the stub nodes"""
+
+    def __init__(self, host: str, port: int, latency: float):
+        self.latency = latency
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def serve_forever(self):
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count_request(self):
+        with self._lock:
+            self.request_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _make_handler(self):
+        raise NotImplementedError
+
+
+def _send_json(handler: BaseHTTPRequestHandler, payload, status: int = 200):
+    data = json.dumps(payload).encode()
+    handler.send_response(status)
+    handler.send_header('Content-Type', 'application/json')
+    handler.send_header('Content-Length', str(len(data)))
+    handler.end_headers()
+    handler.wfile.write(data)
+
+
+class StubEthereumNode(_StubServer):
+    """
+    Threaded JSON-RPC server producing deterministic Ethereum blocks.
+    Every whale_every-th transaction moves whale_value_eth ETH.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latest_block: int = 20_000_000,
+                 txs_per_block: int = 150, whale_every: int = 50, whale_value_eth: int = 5000,
+                 latency: float = 0.0, accept_batches: bool = True, genesis_time: int = 1_700_000_000):
+        self.latest_block = latest_block
+        self.txs_per_block = txs_per_block
+        self.whale_every = whale_every
+        self.whale_value_eth = whale_value_eth
+        self.accept_batches = accept_batches
+        self.genesis_time = genesis_time
+        self.call_count = 0
+        super().__init__(host, port, latency)
+
+    def block_timestamp(self, number: int) -> int:
+        return self.genesis_time + number * 12
+
+    def make_transaction(self, number: int, index: int) -> dict:
+        value_eth = self.whale_value_eth if index % self.whale_every == 0 else (index % 7) / 10
+        return {
+            'hash': _hash('tx', number, index),
+            'blockHash': _hash('block', number),
+            'blockNumber': _hex(number),
+            'transactionIndex': _hex(index),
+            'from': _address(index % 97),
+            'to': _address(1000 + index % 89),
+            'value': _hex(int(value_eth * WEI_PER_ETH)),
+            'gas': _hex(21000),
+            'gasPrice': _hex(20 * 10 ** 9),
+            'nonce': _hex(number),
+            'input': '0x',
+            'type': '0x0',
+            'chainId': '0x1',
+            'v': '0x25',
+            'r': _hash('r', number, index),
+            's': _hash('s', number, index)
+        }
+
+    def make_block(self, number: int, full_transactions: bool) -> dict:
+        transactions = [self.make_transaction(number, i) for i in range(self.txs_per_block)]
+        return {
+            'number': _hex(number),
+            'hash': _hash('block', number),
+            'parentHash': _hash('block', number - 1),
+            'nonce': '0x0000000000000000',
+            'sha3Uncles': _hash('uncles', number),
+            'logsBloom': '0x' + '00' * 256,
+            'transactionsRoot': _hash('txroot', number),
+            'stateRoot': _hash('state', number),
+            'receiptsRoot': _hash('receipts', number),
+            'miner': _address('miner'),
+            'difficulty': '0x0',
+            'totalDifficulty': '0x0',
+            'extraData': '0x',
+            'size': _hex(1000),
+            'gasLimit': _hex(30_000_000),
+            'gasUsed': _hex(21000 * self.txs_per_block),
+            'timestamp': _hex(self.block_timestamp(number)),
+            'baseFeePerGas': _hex(10 ** 9),
+            'mixHash': _hash('mix', number),
+            'uncles': [],
+            'transactions': transactions if full_transactions else [tx['hash'] for tx in transactions]
+        }
+
+    def make_receipt(self, tx_hash: str) -> dict:
+        return {
+            'transactionHash': tx_hash,
+            'transactionIndex': '0x0',
+            'blockHash': _hash('block', 0),
+            'blockNumber': _hex(self.latest_block),
+            'from': _address(0),
+            'to': _address(1000),
+            'cumulativeGasUsed': _hex(21000),
+            'gasUsed': _hex(21000),
+            'effectiveGasPrice': _hex(20 * 10 ** 9),
+            'contractAddress': None,
+            'logs': [],
+            'logsBloom': '0x' + '00' * 256,
+            'status': '0x1',
+            'type': '0x0'
+        }
+
+    def dispatch(self, method: str, params: list):
+        if method == 'eth_blockNumber':
+            return _hex(self.latest_block)
+        if method == 'eth_chainId':
+            return '0x1'
+        if method == 'eth_getBlockByNumber':
+            number = self.latest_block if params[0] == 'latest' else int(params[0], 16)
+            if number > self.latest_block:
+                return None
+            return self.make_block(number, bool(params[1]))
+        if method == 'eth_getBalance':
+            seed = int(params[0][-8:], 16)
+            return _hex((seed % 100_000) * WEI_PER_ETH)
+        if method == 'eth_getTransactionReceipt':
+            return self.make_receipt(params[0])
+        raise KeyError(method)
+
+    def handle_call(self, call: dict) -> dict:
+        with self._lock:
+            self.call_count += 1
+        response = {'jsonrpc': '2.0', 'id': call.get('id')}
+        try:
+            response['result'] = self.dispatch(call['method'], call.get('params', []))
+        except KeyError:
+            response['error'] = {'code': -32601, 'message': f"Method not found: {call.get('method')}"}
+        return response
+
+    def _make_handler(self):
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                node._count_request()
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+
+                if isinstance(body, list):
+                    if node.accept_batches:
+                        payload = [node.handle_call(call) for call in body]
+                    else:
+                        payload = {'jsonrpc': '2.0', 'id': None,
+                                   'error': {'code': -32600, 'message': 'Batch requests are not supported'}}
+                else:
+                    payload = node.handle_call(body)
+
+                _send_json(self, payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class StubBitcoinNode(_StubServer):
+    """
+    HTTP fixture server mimicking the blockchain.info endpoints the agent uses
+    (/blocks, /rawblock/<hash>, /rawaddr/<address>). Every whale_every-th
+    transaction pays out whale_value_btc BTC.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latest_height: int = 850_000,
+                 block_count: int = 10, txs_per_block: int = 2000, whale_every: int = 100,
+                 whale_value_btc: int = 500, latency: float = 0.0, genesis_time: int = 1_700_000_000):
+        self.latest_height = latest_height
+        self.block_count = block_count
+        self.txs_per_block = txs_per_block
+        self.whale_every = whale_every
+        self.whale_value_btc = whale_value_btc
+        self.genesis_time = genesis_time
+        self.rawblock_requests = 0
+        super().__init__(host, port, latency)
+
+    def block_hash(self, height: int) -> str:
+        return '0000000000000000000' + hashlib.sha256(f'btc-block:{height}'.encode()).hexdigest()[19:]
+
+    def block_heights(self) -> dict:
+        return {self.block_hash(h): h for h in range(self.latest_height - self.block_count + 1, self.latest_height + 1)}
+
+    def make_transaction(self, height: int, index: int) -> dict:
+        whale = index % self.whale_every == 0
+        outputs = [
+            (self.whale_value_btc * SATOSHIS_PER_BTC if whale else 1_000_000 + index * 37) // (k + 1)
+            for k in range(2 + index % 3)
+        ]
+        return {
+            'hash': hashlib.sha256(f'btc-tx:{height}:{index}'.encode()).hexdigest(),
+            'ver': 2,
+            'size': 250,
+            'time': self.genesis_time + height * 600,
+            'block_height': height,
+            'inputs': [
+                {'sequence': 4294967295, 'script': '00' * 36,
+                 'prev_out': {'value': sum(outputs) + 1000, 'addr': f'bc1qinput{index % 53}', 'script': '00' * 22}}
+                for _ in range(1 + index % 2)
+            ],
+            'out': [
+                {'value': value, 'addr': f'bc1qoutput{(index + k) % 61}', 'script': '00' * 22, 'spent': False}
+                for k, value in enumerate(outputs)
+            ]
+        }
+
+    def make_block(self, height: int) -> dict:
+        return {
+            'hash': self.block_hash(height),
+            'ver': 536870912,
+            'prev_block': self.block_hash(height - 1),
+            'time': self.genesis_time + height * 600,
+            'height': height,
+            'n_tx': self.txs_per_block,
+            'main_chain': True,
+            'tx': [self.make_transaction(height, i) for i in range(self.txs_per_block)]
+        }
+
+    def _make_handler(self):
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                node._count_request()
+                path = self.path.split('?')[0].rstrip('/')
+
+                if path == '/blocks':
+                    heights = node.block_heights()
+                    _send_json(self, {'blocks': [
+                        {'hash': block_hash, 'height': height, 'time': node.genesis_time + height * 600}
+                        for block_hash, height in sorted(heights.items(), key=lambda item: -item[1])
+                    ]})
+                elif path.startswith('/rawblock/'):
+                    height = node.block_heights().get(path.rsplit('/', 1)[1])
+                    if height is None:
+                        _send_json(self, {'error': 'Block not found'}, status=404)
+                        return
+                    with node._lock:
+                        node.rawblock_requests += 1
+                    _send_json(self, node.make_block(height))
+                elif path.startswith('/rawaddr/'):
+                    txs = [node.make_transaction(node.latest_height, i) for i in range(5)]
+                    _send_json(self, {'address': path.rsplit('/', 1)[1], 'final_balance': 1200 * SATOSHIS_PER_BTC,
+                                      'n_tx': len(txs), 'txs': txs})
+                else:
+                    _send_json(self, {'error': 'Not found'}, status=404)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    """Run a stub node in the foreground"""
+    parser = argparse.ArgumentParser(description='Run a local stub blockchain node')
+    parser.add_argument('chain', nargs='?', default='ethereum', help='ethereum (JSON-RPC) or bitcoin (blockchain.info API)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8545)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds of delay per HTTP request')
+    parser.add_argument('--no-batches', action='store_true', help='reject JSON-RPC batch requests')
+    args = parser.parse_args()
+
+    if args.chain == 'ethereum':
+        node = StubEthereumNode(args.host, args.port, latency=args.latency, accept_batches=not args.no_batches)
+        print(f"🧪 Stub Ethereum node listening on {node.url} (latest block {node.latest_block})")
+    elif args.chain == 'bitcoin':
+        node = StubBitcoinNode(args.host, args.port, latency=args.latency)
+        print(f"🧪 Stub Bitcoin API listening on {node.url} (latest height {node.latest_height})")
+    else:
+        parser.error(f"unknown chain: {args.chain}")
+
+    node.serve_forever()
+
+
+if __name__ == "__main__":
+    main()